@@ -0,0 +1,289 @@
+"""
+Backtest hors ligne d'un planning Excel contre l'historique du canal de statistiques
+Rejoue les règles du bot (find_close_prediction: tolérance + filtre des consécutifs,
+verify_excel_prediction: offsets 0-2, nul/mauvais gagnant → offset suivant) et
+répartit les balayages de paramètres (tolérance × offsets) sur un pool de processus.
+
+Usage:
+    python backtest.py planning.xlsx historique.csv
+    python backtest.py planning.xlsx historique.txt --tolerance 0-6 --max-offset 1,2,3 --workers 4
+    python backtest.py data/excel_predictions data/results --day 2026-10-18
+
+Planning accepté: fichier Excel/CSV/ODS, ou dossier des partitions du bot (une journée, --day)
+
+Historique accepté:
+    dossier  archive des résultats du bot (data/results, voir results_archive.py)
+    .csv  colonnes numero,joueur,banquier (colonne date optionnelle pour séparer les journées)
+    autre texte brut des messages du canal, un message par ligne (#N620. 1(4♠️7♦️J♣️) - ✅4(9♣️5♠️) #T5)
+Sans colonne date, une nouvelle journée commence quand le numéro de jeu redescend.
+"""
+import os
+import re
+import csv
+import sys
+import json
+import time
+import argparse
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional
+
+from excel_importer import (
+    read_rows, read_partition, read_cold_partition, build_prediction_batch, extract_points, winner_from_points,
+    expected_side, status_for_offset, FAILED_STATUS, OFFSET_STATUSES, UNDATED_PARTITION, COLD_DIR
+)
+from results_archive import ResultsArchive
+
+# Issue d'une partie vue par la vérification
+JOUEUR = "joueur"
+BANQUIER = "banquier"
+TIE = "nul"            # match nul → offset suivant
+NO_RESULT = "absent"   # message sans ✅/🔰 → offset suivant
+CRITICAL = "critique"  # ✅ sans points lisibles → échec immédiat
+
+_GAME_NUMBER_PATTERN = re.compile(r"#N\s*(\d+)\.?", re.IGNORECASE)
+
+Session = List[Tuple[int, str]]
+
+
+def classify_result(message_text: str) -> str:
+    """Issue d'un message de résultat, selon les mêmes règles que verify_excel_prediction"""
+    if not any(tag in message_text for tag in ["✅", "🔰"]):
+        return NO_RESULT
+    joueur_point, banquier_point = extract_points(message_text)
+    if joueur_point is None or banquier_point is None:
+        return CRITICAL if '🔰' not in message_text else NO_RESULT
+    return winner_from_points(joueur_point, banquier_point) or TIE
+
+
+def _outcome_from_points(joueur_point: str, banquier_point: str) -> str:
+    if joueur_point in ("", None) or banquier_point in ("", None):
+        return NO_RESULT
+    return winner_from_points(int(float(joueur_point)), int(float(banquier_point))) or TIE
+
+
+def _split_sessions(entries: List[Tuple[Optional[str], int, str]]) -> List[Session]:
+    """Découpe l'historique en journées: changement de date, ou numéro qui redescend"""
+    sessions: List[Session] = []
+    current: Session = []
+    current_day = None
+    for day, numero, outcome in entries:
+        new_day = day is not None and day != current_day
+        reset = day is None and current and numero < current[-1][0]
+        if current and (new_day or reset):
+            sessions.append(current)
+            current = []
+        current_day = day
+        current.append((numero, outcome))
+    if current:
+        sessions.append(current)
+    return sessions
+
+
+def load_history(file_path: str) -> List[Session]:
+    """Charge l'historique des résultats sous forme de journées [(numero, issue), ...]"""
+    if os.path.isdir(file_path):
+        # Archive du bot: mêmes issues (joueur/banquier/nul), "inconnu" = points illisibles
+        archive = ResultsArchive(file_path)
+        return [[(numero, NO_RESULT if winner == "inconnu" else winner) for numero, winner in session]
+                for _, session in archive.sessions()]
+
+    entries = []
+    if file_path.lower().endswith(".csv"):
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+                try:
+                    numero = int(float(row["numero"]))
+                except (KeyError, ValueError):
+                    continue
+                outcome = _outcome_from_points(row.get("joueur"), row.get("banquier"))
+                entries.append((row.get("date") or None, numero, outcome))
+    else:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                # Partie en cours (⏰/🕐): le bot ne vérifie que le résultat final
+                if "⏰" in line or "🕐" in line:
+                    continue
+                match = _GAME_NUMBER_PATTERN.search(line)
+                if match:
+                    entries.append((None, int(match.group(1)), classify_result(line)))
+    return _split_sessions(entries)
+
+
+def load_schedule(file_path: str, day: Optional[str] = None) -> List[Tuple[int, str]]:
+    """
+    Planning tel que le bot l'importerait (filtre des consécutifs à l'import inclus).
+    Dossier de partitions: seule la journée demandée est lue (par défaut la plus récente)
+    """
+    if os.path.isdir(file_path):
+        # Journée complète: prédictions en attente (niveau chaud) et réglées (niveau froid)
+        cold_dir = os.path.join(file_path, COLD_DIR)
+        days = {name[:-5] for name in os.listdir(file_path) if name.endswith(".yaml")}
+        if os.path.isdir(cold_dir):
+            days.update(name[:-len(".jsonl.gz")] for name in os.listdir(cold_dir) if name.endswith(".jsonl.gz"))
+        days = sorted(days - {UNDATED_PARTITION})
+        if not days:
+            raise ValueError(f"aucune partition dans {file_path}")
+        day = day or days[-1]
+        predictions = read_cold_partition(os.path.join(cold_dir, f"{day}.jsonl.gz"))
+        predictions.update(read_partition(os.path.join(file_path, f"{day}.yaml")))
+        return sorted((pred["numero"], expected_side(pred["victoire"])) for pred in predictions.values())
+    predictions, _ = build_prediction_batch(read_rows(file_path))
+    return sorted((pred["numero"], expected_side(pred["victoire"])) for pred in predictions.values())
+
+
+def simulate_session(schedule: List[Tuple[int, str]], session: Session, tolerance: int = 4, max_offset: int = 2) -> Counter:
+    """
+    Rejoue une journée: lancement puis vérification pour chaque message, dans l'ordre du canal
+    (même ordre que process_stats_message)
+    """
+    numbers = [numero for numero, _ in schedule]
+    done = set()           # lancées ou écartées (consécutives)
+    active = []            # [numero, camp attendu, offset courant]
+    last_launched = None
+    counts = Counter()
+
+    for game_number, outcome in session:
+        # LANCEMENT: fenêtre [n, n + tolérance], le plus petit écart gagne
+        chosen = None
+        for index in range(bisect_left(numbers, game_number), bisect_right(numbers, game_number + tolerance)):
+            numero = numbers[index]
+            if numero in done:
+                continue
+            if last_launched and numero == last_launched + 1:
+                done.add(numero)
+                counts["consécutif"] += 1
+                continue
+            if chosen is None:
+                chosen = index
+        if chosen is not None:
+            numero, side = schedule[chosen]
+            done.add(numero)
+            last_launched = numero
+            active.append([numero, side, 0])
+            counts["lancées"] += 1
+
+        # VÉRIFICATION SÉQUENTIELLE
+        still_active = []
+        for entry in active:
+            numero, side, offset = entry
+            if game_number < numero + offset:
+                still_active.append(entry)
+                continue
+            # Numéro sauté: avancer l'offset jusqu'au jeu reçu
+            while offset <= max_offset and game_number > numero + offset:
+                offset += 1
+            if offset > max_offset or outcome == CRITICAL:
+                counts[FAILED_STATUS] += 1
+                continue
+            if outcome == side:
+                counts[status_for_offset(offset)] += 1
+                continue
+            offset += 1
+            if offset > max_offset:
+                counts[FAILED_STATUS] += 1
+                continue
+            entry[2] = offset
+            still_active.append(entry)
+        active = still_active
+
+    counts["en attente"] += len(active)
+    counts["non lancées"] += len(numbers) - len(done)
+    return counts
+
+
+def run_backtest(schedule: List[Tuple[int, str]], sessions: List[Session], tolerance: int, max_offset: int) -> Dict[str, Any]:
+    totals = Counter()
+    for session in sessions:
+        totals.update(simulate_session(schedule, session, tolerance, max_offset))
+    successes = sum(totals[status] for status in OFFSET_STATUSES)
+    settled = successes + totals[FAILED_STATUS]
+    return {
+        "tolerance": tolerance,
+        "max_offset": max_offset,
+        "sessions": len(sessions),
+        "counts": dict(totals),
+        "hit_rate": round(successes / settled * 100, 2) if settled else 0.0
+    }
+
+
+# Données partagées par les processus du pool (transmises une fois par processus)
+_worker_data: Dict[str, Any] = {}
+
+
+def _init_worker(schedule, sessions):
+    _worker_data["schedule"] = schedule
+    _worker_data["sessions"] = sessions
+
+
+def _run_params(params: Tuple[int, int]) -> Dict[str, Any]:
+    tolerance, max_offset = params
+    return run_backtest(_worker_data["schedule"], _worker_data["sessions"], tolerance, max_offset)
+
+
+def sweep(schedule, sessions, tolerances: List[int], max_offsets: List[int], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Balayage tolérance × offset maximal, une combinaison par tâche du pool"""
+    grid = [(tolerance, max_offset) for tolerance in tolerances for max_offset in max_offsets]
+    if len(grid) == 1 or workers == 1:
+        return [run_backtest(schedule, sessions, tolerance, max_offset) for tolerance, max_offset in grid]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(schedule, sessions)) as pool:
+        return list(pool.map(_run_params, grid))
+
+
+def _parse_values(text: str) -> List[int]:
+    """'4' → [4], '0-6' → [0..6], '2,4,6' → [2, 4, 6]"""
+    values = []
+    for part in text.split(","):
+        if "-" in part:
+            start, end = part.split("-", 1)
+            values.extend(range(int(start), int(end) + 1))
+        else:
+            values.append(int(part))
+    return sorted(set(values))
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    statuses = list(OFFSET_STATUSES) + [FAILED_STATUS]
+    lines = ["tol  off  " + "  ".join(f"{s:>6}" for s in statuses) + "  attente  consécutif  non_lancées  réussite"]
+    for result in results:
+        counts = result["counts"]
+        lines.append(
+            f"{result['tolerance']:>3}  {result['max_offset']:>3}  "
+            + "  ".join(f"{counts.get(s, 0):>6}" for s in statuses)
+            + f"  {counts.get('en attente', 0):>7}  {counts.get('consécutif', 0):>10}"
+            + f"  {counts.get('non lancées', 0):>11}  {result['hit_rate']:>7.2f}%"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest d'un planning Excel contre l'historique des résultats")
+    parser.add_argument("schedule", help="Planning (.xlsx, .xls, .csv, .ods) ou dossier des partitions du bot")
+    parser.add_argument("history", help="Historique des résultats (dossier d'archive, .csv ou texte brut des messages)")
+    parser.add_argument("--tolerance", default="4", help="Tolérance de lancement: 4, 0-6 ou 2,4,6 (défaut: 4)")
+    parser.add_argument("--max-offset", default="2", help="Offset maximal de vérification (défaut: 2)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus du pool (défaut: nombre de CPU)")
+    parser.add_argument("--day", default=None, help="Journée du planning partitionné AAAA-MM-JJ (défaut: la plus récente)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    schedule = load_schedule(args.schedule, args.day)
+    sessions = load_history(args.history)
+    games = sum(len(session) for session in sessions)
+    print(f"📊 Planning: {len(schedule)} prédictions | Historique: {games} parties sur {len(sessions)} journée(s)", file=sys.stderr)
+
+    results = sweep(schedule, sessions, _parse_values(args.tolerance), _parse_values(args.max_offset), args.workers)
+    results.sort(key=lambda r: r["hit_rate"], reverse=True)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(results))
+    print(f"⏱️ {len(results)} combinaison(s) en {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
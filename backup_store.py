@@ -0,0 +1,145 @@
+"""
+Stockage des sauvegardes de prédictions pour le bot Telegram
+Sauvegardes compressées (zstd si disponible, sinon gzip) dans un dossier dédié,
+avec rétention par nombre, âge et taille totale, écrites hors de la boucle asyncio
+"""
+import os
+import gzip
+import glob
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Callable, Union
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # Dépendance optionnelle: gzip est utilisé à défaut
+    zstandard = None
+
+
+class BackupStore:
+    """Sauvegardes compressées et rotatives d'un fichier de données"""
+
+    def __init__(self, backup_dir: str = "data/backups", prefix: str = "excel_predictions",
+                 max_count: int = 20, max_age_days: int = 14, max_total_mb: float = 50):
+        self.backup_dir = Path(backup_dir)
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_count = max_count
+        self.max_age = timedelta(days=max_age_days)
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self.extension = ".yaml.zst" if zstandard else ".yaml.gz"
+        # Un seul thread: les sauvegardes sont écrites dans l'ordre de soumission
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(name: str, data: bytes) -> bytes:
+        if name.endswith(".zst"):
+            if not zstandard:
+                raise ValueError("Sauvegarde zstd illisible: module zstandard absent")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if name.endswith(".gz"):
+            return gzip.decompress(data)
+        return data
+
+    def create(self, data: Union[bytes, Callable[[], bytes]], created_at: Optional[datetime] = None) -> Optional[str]:
+        """
+        Écrit une sauvegarde compressée (écriture atomique) puis applique la rétention.
+        data: contenu, ou fonction qui le sérialise (appelée dans le thread de backup)
+        """
+        try:
+            if callable(data):
+                data = data()
+            created_at = created_at or datetime.now()
+            name = f"{self.prefix}_{created_at.strftime('%Y%m%d_%H%M%S_%f')}{self.extension}"
+            path = self.backup_dir / name
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(self._compress(data))
+            os.replace(tmp_path, path)
+            os.utime(path, (created_at.timestamp(), created_at.timestamp()))
+            print(f"✅ Backup créé: {path} ({len(data) / 1024:.1f} KB → {path.stat().st_size / 1024:.1f} KB)")
+            self.prune()
+            return name
+        except Exception as e:
+            print(f"❌ Erreur création backup: {e}")
+            return None
+
+    def submit(self, data: Union[bytes, Callable[[], bytes]]) -> Future:
+        """Sauvegarde en arrière-plan: sérialisation, compression et écriture hors boucle"""
+        return self._executor.submit(self.create, data, datetime.now())
+
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """Sauvegardes disponibles, de la plus récente à la plus ancienne"""
+        backups = []
+        with os.scandir(self.backup_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.startswith(self.prefix) or entry.name.endswith(".tmp"):
+                    continue
+                stat = entry.stat()
+                backups.append({
+                    "name": entry.name,
+                    "size": stat.st_size,
+                    "created": datetime.fromtimestamp(stat.st_mtime)
+                })
+        return sorted(backups, key=lambda b: b["name"], reverse=True)
+
+    def resolve(self, name_or_index: str) -> Optional[str]:
+        """Accepte un nom de sauvegarde ou son rang dans list_backups (1 = plus récente)"""
+        backups = self.list_backups()
+        if name_or_index.isdigit():
+            index = int(name_or_index) - 1
+            return backups[index]["name"] if 0 <= index < len(backups) else None
+        return name_or_index if any(b["name"] == name_or_index for b in backups) else None
+
+    def read(self, name: str) -> bytes:
+        path = self.backup_dir / os.path.basename(name)
+        with open(path, "rb") as f:
+            return self._decompress(name, f.read())
+
+    def prune(self) -> int:
+        """Supprime les sauvegardes trop anciennes, en surnombre ou au-delà de la taille totale"""
+        removed = 0
+        try:
+            backups = self.list_backups()
+            cutoff = datetime.now() - self.max_age
+            total = 0
+            for index, backup in enumerate(backups):
+                total += backup["size"]
+                # La plus récente est toujours conservée
+                if index > 0 and (index >= self.max_count or backup["created"] < cutoff or total > self.max_total_bytes):
+                    os.remove(self.backup_dir / backup["name"])
+                    removed += 1
+            if removed:
+                print(f"🧹 Backups: {removed} ancienne(s) sauvegarde(s) supprimée(s)")
+        except Exception as e:
+            print(f"❌ Erreur rotation backups: {e}")
+        return removed
+
+    def adopt_legacy_backups(self, pattern: str) -> int:
+        """Compresse dans le dossier dédié les anciennes sauvegardes non compressées puis les supprime"""
+        adopted = 0
+        for legacy_path in sorted(glob.glob(pattern)):
+            try:
+                with open(legacy_path, "rb") as f:
+                    data = f.read()
+                created_at = datetime.fromtimestamp(os.path.getmtime(legacy_path))
+                if self.create(data, created_at):
+                    os.remove(legacy_path)
+                    adopted += 1
+            except Exception as e:
+                print(f"⚠️ Ancien backup ignoré {legacy_path}: {e}")
+        return adopted
+
+    def get_stats(self) -> Dict[str, Any]:
+        backups = self.list_backups()
+        return {
+            "count": len(backups),
+            "total_bytes": sum(b["size"] for b in backups),
+            "compression": "zstd" if zstandard else "gzip"
+        }
@@ -0,0 +1,232 @@
+"""
+Rattrapage des messages du canal de statistiques manqués pendant une coupure
+Mémorise par canal le point de reprise (avant la plus ancienne partie encore en cours),
+relit l'écart page par page et regroupe les éditions sortantes pour ne pas déclencher
+les limites de flood
+"""
+import json
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple, Set, Callable
+from pathlib import Path
+
+from telethon import TelegramClient, types
+from telethon._updates import MessageBox
+
+
+class CatchupState:
+    """
+    Point de reprise par canal, persisté avec écriture limitée dans le temps.
+    Le canal édite chaque partie sur place (⏰/🕐 puis résultat final): le curseur s'arrête
+    juste avant la plus ancienne partie encore en cours, pour que le rattrapage la relise.
+    Les messages déjà finalisés au-delà du curseur sont mémorisés pour ne pas être rejoués.
+    """
+
+    def __init__(self, state_file: str = "data/catchup_state.json", flush_interval: float = 5.0,
+                 max_open_span: int = 200):
+        self.state_file = Path(state_file)
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_open_span = max_open_span  # partie en cours abandonnée (message supprimé) au-delà de cet écart
+        self.last_ids: Dict[str, int] = {}
+        self.open_ids: Dict[str, Set[int]] = {}  # parties en cours au-delà du curseur
+        self.done_ids: Dict[str, Set[int]] = {}  # messages finalisés au-delà du curseur
+        self._dirty = False
+        self._last_flush = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                if "last_ids" not in state:
+                    state = {"last_ids": state}  # ancien format: {canal: dernier id}
+                self.last_ids = {str(k): int(v) for k, v in state["last_ids"].items()}
+                self.open_ids = {str(k): set(v) for k, v in state.get("open_ids", {}).items()}
+                self.done_ids = {str(k): set(v) for k, v in state.get("done_ids", {}).items()}
+        except Exception as e:
+            print(f"❌ Erreur chargement état de rattrapage: {e}")
+
+    def get(self, channel_id: int) -> Optional[int]:
+        return self.last_ids.get(str(channel_id))
+
+    def is_done(self, channel_id: int, message_id: int) -> bool:
+        """Message déjà traité jusqu'à son résultat final (à ne pas rejouer)"""
+        return message_id in self.done_ids.get(str(channel_id), ())
+
+    def advance(self, channel_id: int, message_id: int, final: bool = True):
+        """
+        Enregistre l'état d'un message; le curseur n'avance que jusqu'avant la plus ancienne
+        partie encore en cours (jamais en arrière: les éditions d'anciens messages sont ignorées)
+        """
+        key = str(channel_id)
+        cursor = self.last_ids.get(key, 0)
+        if message_id <= cursor:
+            return
+        open_ids = self.open_ids.setdefault(key, set())
+        done_ids = self.done_ids.setdefault(key, set())
+        if final:
+            open_ids.discard(message_id)
+            done_ids.add(message_id)
+        else:
+            open_ids.add(message_id)
+
+        high = max(open_ids | done_ids)
+        for stale_id in [m for m in open_ids if high - m > self.max_open_span]:
+            open_ids.discard(stale_id)
+            print(f"⚠️ Rattrapage: partie en cours #{stale_id} jamais finalisée, abandonnée")
+        new_cursor = min(open_ids) - 1 if open_ids else high
+        if new_cursor > cursor:
+            self.last_ids[key] = new_cursor
+            done_ids.difference_update([m for m in done_ids if m <= new_cursor])
+        self._dirty = True
+        now = datetime.now().timestamp()
+        if now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if not self._dirty:
+            return
+        try:
+            tmp_path = self.state_file.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "last_ids": self.last_ids,
+                    "open_ids": {k: sorted(v) for k, v in self.open_ids.items() if v},
+                    "done_ids": {k: sorted(v) for k, v in self.done_ids.items() if v}
+                }, f)
+            tmp_path.replace(self.state_file)
+            self._dirty = False
+            self._last_flush = datetime.now().timestamp()
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde état de rattrapage: {e}")
+
+
+class _GapReportingMessageBox(MessageBox):
+    """MessageBox de Telethon qui signale les différences abandonnées (*TooLong)"""
+
+    def __init__(self, log, on_gap: Callable[[str], None]):
+        super().__init__(log)
+        self.on_gap = on_gap
+
+    def apply_difference(self, diff, chat_hashes):
+        if isinstance(diff, types.updates.DifferenceTooLong):
+            self.on_gap("différence trop longue")
+        return super().apply_difference(diff, chat_hashes)
+
+    def apply_channel_difference(self, request, diff, chat_hashes):
+        if isinstance(diff, types.updates.ChannelDifferenceTooLong):
+            self.on_gap(f"différence trop longue du canal {request.channel.channel_id}")
+        return super().apply_channel_difference(request, diff, chat_hashes)
+
+
+class CatchupTelegramClient(TelegramClient):
+    """
+    Client Telethon qui signale les trous que la bibliothèque ne comble pas elle-même:
+    reconnexion automatique du sender (sans rattrapage côté Telethon) et différences
+    « trop longues » après un updatesTooLong/updateChannelTooLong (mises à jour abandonnées).
+    on_gap(raison) est appelé depuis la boucle asyncio du client.
+    """
+
+    def __init__(self, *args, on_gap: Optional[Callable[[str], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_gap = on_gap
+        self._message_box = _GapReportingMessageBox(self._log['messagebox'], self._signal_gap)
+
+    def _signal_gap(self, reason: str):
+        if self.on_gap:
+            try:
+                self.on_gap(reason)
+            except Exception as e:
+                print(f"❌ Erreur signalement de coupure ({reason}): {e}")
+
+    async def _handle_auto_reconnect(self):
+        await super()._handle_auto_reconnect()
+        self._signal_gap("reconnexion automatique")
+
+
+class EditCoalescer:
+    """
+    Pendant un rattrapage, les éditions sortantes sont retenues et fusionnées:
+    seule la dernière version de chaque message est envoyée, à rythme limité
+    """
+
+    def __init__(self, pace_seconds: float = 0.5):
+        self.pace_seconds = pace_seconds
+        self._holders = 0
+        self._pending: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self.coalesced = 0
+
+    @property
+    def active(self) -> bool:
+        return self._holders > 0
+
+    def hold(self):
+        self._holders += 1
+
+    async def edit(self, client, chat_id: int, message_id: int, text: str):
+        """Édite tout de suite, ou retient l'édition si un rattrapage est en cours"""
+        key = (chat_id, message_id)
+        if not self.active:
+            # Une édition en direct rend obsolète la version retenue pour ce message
+            self._pending.pop(key, None)
+            await client.edit_message(chat_id, message_id, text)
+            return
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = text
+        self._pending.move_to_end(key)
+
+    async def release(self, client) -> int:
+        """Fin de rattrapage: envoie les éditions retenues, espacées de pace_seconds"""
+        self._holders = max(0, self._holders - 1)
+        if self.active:
+            return 0
+
+        sent = 0
+        while self._pending:
+            (chat_id, message_id), text = self._pending.popitem(last=False)
+            try:
+                await client.edit_message(chat_id, message_id, text)
+                sent += 1
+            except Exception as e:
+                print(f"❌ Erreur édition différée {message_id}: {e}")
+            if self._pending:
+                await asyncio.sleep(self.pace_seconds)
+        return sent
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "holding": self.active,
+            "pending": len(self._pending),
+            "coalesced": self.coalesced
+        }
+
+
+async def fetch_missed_messages(client, channel_id: int, after_id: int, page_size: int = 100,
+                                max_messages: int = 5000, page_pause: float = 1.0):
+    """
+    Messages postés après after_id, du plus ancien au plus récent, par pages de page_size.
+    Au-delà de max_messages le rattrapage est tronqué (les plus anciens sont gardés) et signalé.
+    """
+    messages = []
+    cursor = after_id
+    while len(messages) < max_messages:
+        limit = min(page_size, max_messages - len(messages))
+        page = await client.get_messages(channel_id, min_id=cursor, reverse=True, limit=limit)
+        if not page:
+            break
+        messages.extend(page)
+        cursor = page[-1].id
+        if len(page) < limit:
+            break
+        print(f"📥 Rattrapage canal {channel_id}: {len(messages)} messages récupérés...")
+        await asyncio.sleep(page_pause)
+    else:
+        if await client.get_messages(channel_id, min_id=cursor, reverse=True, limit=1):
+            print(f"⚠️ Rattrapage canal {channel_id} tronqué à {max_messages} messages: "
+                  f"les messages après #{cursor} ne sont pas rejoués")
+    return messages
+
@@ -0,0 +1,123 @@
+"""
+Pipeline séquentiel par canal pour le traitement des messages de statistiques
+Chaque canal a sa file asyncio bornée et un consommateur unique: les parties #N et #N+1
+sont traitées dans l'ordre, sans verrou autour de l'état des prédictions
+"""
+import asyncio
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+
+class _ChannelWorker:
+    """File bornée + tâche consommatrice d'un canal"""
+
+    def __init__(self, channel_id: int, maxsize: int):
+        self.channel_id = channel_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.task: Optional[asyncio.Task] = None
+        # running: levé = traitement autorisé (baissé pendant un rattrapage)
+        # idle: levé = aucun élément en cours de traitement
+        self.running = asyncio.Event()
+        self.running.set()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.processed = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.backpressure_waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+        self.total_processing = 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "depth": self.queue.qsize(),
+            "paused": not self.running.is_set(),
+            "max_depth": self.max_depth,
+            "capacity": self.queue.maxsize,
+            "processed": self.processed,
+            "errors": self.errors,
+            "backpressure_waits": self.backpressure_waits,
+            "avg_wait_ms": round(self.total_wait / self.processed * 1000, 2) if self.processed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "last_wait_ms": round(self.last_wait * 1000, 2),
+            "avg_processing_ms": round(self.total_processing / self.processed * 1000, 2) if self.processed else 0.0
+        }
+
+
+class ChannelPipeline:
+    """Répartit les éléments par canal vers un consommateur séquentiel dédié"""
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], maxsize: int = 100):
+        self.handler = handler
+        self.maxsize = maxsize
+        self._workers: Dict[int, _ChannelWorker] = {}
+
+    def _get_worker(self, channel_id: int) -> _ChannelWorker:
+        worker = self._workers.get(channel_id)
+        if worker is None:
+            worker = _ChannelWorker(channel_id, self.maxsize)
+            worker.task = asyncio.create_task(self._consume(worker))
+            self._workers[channel_id] = worker
+            print(f"🧵 Pipeline créé pour le canal {channel_id} (capacité {self.maxsize})")
+        return worker
+
+    async def submit(self, channel_id: int, item: Any):
+        """Ajoute un élément à la file du canal; attend si la file est pleine (backpressure)"""
+        worker = self._get_worker(channel_id)
+        if worker.queue.full():
+            worker.backpressure_waits += 1
+            print(f"⚠️ Pipeline {channel_id} saturé ({worker.queue.maxsize}) - attente")
+        loop = asyncio.get_running_loop()
+        await worker.queue.put((loop.time(), item))
+        worker.max_depth = max(worker.max_depth, worker.queue.qsize())
+
+    async def _consume(self, worker: _ChannelWorker):
+        loop = asyncio.get_running_loop()
+        while True:
+            enqueued_at, item = await worker.queue.get()
+            await worker.running.wait()
+            worker.idle.clear()
+            started_at = loop.time()
+            worker.last_wait = started_at - enqueued_at
+            worker.total_wait += worker.last_wait
+            worker.max_wait = max(worker.max_wait, worker.last_wait)
+            try:
+                await self.handler(item)
+            except Exception as e:
+                worker.errors += 1
+                print(f"❌ Erreur pipeline canal {worker.channel_id}: {e}")
+            finally:
+                worker.processed += 1
+                worker.total_processing += loop.time() - started_at
+                worker.idle.set()
+                worker.queue.task_done()
+
+    async def pause(self, channel_id: int):
+        """
+        Suspend le consommateur du canal et attend la fin de l'élément en cours.
+        Les nouveaux éléments continuent d'être mis en file (jusqu'à la capacité).
+        """
+        worker = self._get_worker(channel_id)
+        worker.running.clear()
+        await worker.idle.wait()
+
+    def resume(self, channel_id: int):
+        worker = self._workers.get(channel_id)
+        if worker:
+            worker.running.set()
+
+    async def join(self, channel_id: int):
+        """Attend que tous les éléments déjà soumis pour ce canal soient traités"""
+        worker = self._workers.get(channel_id)
+        if worker:
+            await worker.queue.join()
+
+    def stop(self):
+        for worker in self._workers.values():
+            if worker.task:
+                worker.task.cancel()
+        self._workers.clear()
+
+    def get_metrics(self) -> Dict[int, Dict[str, Any]]:
+        return {channel_id: worker.metrics() for channel_id, worker in self._workers.items()}
@@ -0,0 +1,131 @@
+"""
+Construction du package de déploiement (/deploy) hors de la boucle asyncio
+Les membres compressés sont mis en cache par empreinte SHA-256 de leur contenu:
+seuls les fichiers modifiés (et bot_config.json régénéré) sont recompressés.
+L'archive zip est assemblée en mémoire à partir des blocs deflate déjà prêts.
+"""
+import io
+import os
+import glob
+import zlib
+import struct
+import hashlib
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Optional
+
+# Structures zip (APPNOTE): en-tête local, entrée du répertoire central, fin de répertoire
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_ZIP_VERSION = 20
+_DEFLATED = 8
+_UNIX_FILE_MODE = (0o100644 << 16)
+
+
+def _dos_datetime(moment: datetime) -> Tuple[int, int]:
+    dos_time = moment.hour << 11 | moment.minute << 5 | moment.second // 2
+    dos_date = (moment.year - 1980) << 9 | moment.month << 5 | moment.day
+    return dos_time, dos_date
+
+
+class DeployPackage:
+    """Contenu du package, même interface que zipfile.ZipFile (write/writestr) mais sans compression"""
+
+    def __init__(self):
+        self.members: List[Tuple[str, Optional[str], Optional[bytes]]] = []
+
+    def write(self, file_path: str, arcname: Optional[str] = None):
+        # Fichier lu seulement au moment de la construction (dans le thread)
+        self.members.append((arcname or file_path, file_path, None))
+
+    def writestr(self, arcname: str, data):
+        self.members.append((arcname, None, data.encode("utf-8") if isinstance(data, str) else data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class DeployBuilder:
+    """Assemble les packages zip à partir de membres deflate mis en cache"""
+
+    def __init__(self, compress_level: int = 9, keep_pattern: str = "deploy_render_*.zip"):
+        self.compress_level = compress_level
+        self.keep_pattern = keep_pattern
+        # arcname → (sha256, crc32, taille, données deflate)
+        self._cache: Dict[str, Tuple[bytes, int, int, bytes]] = {}
+        self.last_build: Dict[str, Any] = {}
+
+    def _compressed(self, arcname: str, data: bytes) -> Tuple[int, int, bytes, bool]:
+        digest = hashlib.sha256(data).digest()
+        cached = self._cache.get(arcname)
+        if cached and cached[0] == digest:
+            return cached[1], cached[2], cached[3], True
+        compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, -15)
+        deflated = compressor.compress(data) + compressor.flush()
+        crc = zlib.crc32(data)
+        self._cache[arcname] = (digest, crc, len(data), deflated)
+        return crc, len(data), deflated, False
+
+    def build(self, package: DeployPackage) -> bytes:
+        """Archive zip complète en mémoire (appelé via asyncio.to_thread)"""
+        output = io.BytesIO()
+        central = []
+        manifest = []  # (arcname, taille non compressée) des membres réellement écrits
+        reused = 0
+        dos_time, dos_date = _dos_datetime(datetime.now())
+
+        for arcname, file_path, data in package.members:
+            if file_path is not None:
+                if not os.path.exists(file_path):
+                    continue
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            crc, size, deflated, from_cache = self._compressed(arcname, data)
+            reused += from_cache
+            manifest.append((arcname, size))
+            name = arcname.replace(os.sep, "/").encode("utf-8")
+            flags = 0x800 if not name.isascii() else 0  # noms UTF-8
+
+            offset = output.tell()
+            output.write(_LOCAL_HEADER.pack(b"PK\x03\x04", _ZIP_VERSION, 0, flags, _DEFLATED,
+                                            dos_time, dos_date, crc, len(deflated), size, len(name), 0))
+            output.write(name)
+            output.write(deflated)
+            central.append(_CENTRAL_HEADER.pack(b"PK\x01\x02", _ZIP_VERSION, 3, _ZIP_VERSION, 0, flags, _DEFLATED,
+                                                dos_time, dos_date, crc, len(deflated), size, len(name),
+                                                0, 0, 0, 0, _UNIX_FILE_MODE, offset) + name)
+
+        central_offset = output.tell()
+        for entry in central:
+            output.write(entry)
+        output.write(_END_RECORD.pack(b"PK\x05\x06", 0, 0, len(central), len(central),
+                                      output.tell() - central_offset, central_offset, 0))
+
+        # Membres retirés du package: inutile de les garder en cache
+        names = {arcname for arcname, _, _ in package.members}
+        for arcname in list(self._cache):
+            if arcname not in names:
+                del self._cache[arcname]
+
+        self.last_build = {"members": len(central), "reused": reused, "recompressed": len(central) - reused,
+                           "size": output.tell(), "manifest": manifest}
+        return output.getvalue()
+
+    def keep_latest(self, package_name: str, data: bytes) -> int:
+        """Écrit le dernier package sur disque et supprime les précédents"""
+        removed = 0
+        for old_path in glob.glob(self.keep_pattern):
+            if os.path.basename(old_path) != package_name:
+                try:
+                    os.remove(old_path)
+                    removed += 1
+                except OSError as e:
+                    print(f"⚠️ Ancien package non supprimé {old_path}: {e}")
+        tmp_path = package_name + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, package_name)
+        return removed
@@ -0,0 +1,94 @@
+"""
+Flux d'événements en direct (Server-Sent Events) pour les tableaux de bord
+Lancements, vérifications et expirations sont diffusés à chaque abonné via un tampon
+borné: un abonné trop lent est déconnecté plutôt que de ralentir le traitement des messages
+"""
+import json
+import asyncio
+import itertools
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+from aiohttp import web
+
+
+class _Subscriber:
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+
+class EventBroadcaster:
+    """Diffusion non bloquante des événements vers les abonnés SSE"""
+
+    def __init__(self, buffer_size: int = 100, heartbeat_seconds: float = 15.0):
+        self.buffer_size = buffer_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.snapshot_provider: Optional[Callable[[], Dict[str, Any]]] = None
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Publie un événement; ne bloque jamais (appelé depuis le traitement des messages)"""
+        if not self._subscribers:
+            return
+        self.published += 1
+        payload = self._format(event_type, {**data, "ts": datetime.now().isoformat()})
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _format(self, event_type: str, data: Dict[str, Any]) -> bytes:
+        body = json.dumps(data, ensure_ascii=False, default=str)
+        return f"id: {next(self._ids)}\nevent: {event_type}\ndata: {body}\n\n".encode("utf-8")
+
+    def _drop(self, subscriber: _Subscriber):
+        """Abonné trop lent: tampon vidé et remplacé par un signal de fin"""
+        self._subscribers.discard(subscriber)
+        subscriber.dropped = True
+        self.dropped_subscribers += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+        print("⚠️ Abonné SSE trop lent déconnecté")
+
+    async def handle_sse(self, request: web.Request) -> web.StreamResponse:
+        """GET /events: instantané initial puis événements en direct"""
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        await response.prepare(request)
+
+        subscriber = _Subscriber(self.buffer_size)
+        self._subscribers.add(subscriber)
+        try:
+            if self.snapshot_provider:
+                await response.write(self._format("snapshot", self.snapshot_provider()))
+
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    await response.write(b": ping\n\n")
+                    continue
+                if payload is None:
+                    break
+                await response.write(payload)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+            "buffer_size": self.buffer_size
+        }
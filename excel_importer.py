@@ -1,115 +1,548 @@
 import os
+import io
+import csv
+import gzip
+import json
+import threading
 import yaml
 import re
-from datetime import datetime
-from typing import Dict, Any, Optional, List
-from openpyxl import load_workbook
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from backup_store import BackupStore
+
+# Extensions acceptées à l'import (dispatch par format dans read_rows)
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xlsm', '.xls', '.csv', '.ods')
+
+# Espaces de noms OpenDocument utilisés par le lecteur .ods
+_ODS_TABLE = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+_ODS_OFFICE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+_ODS_TEXT = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+
+def is_supported_file(file_name: str) -> bool:
+    """Indique si le fichier peut être importé (xlsx, xls, csv, ods)"""
+    return bool(file_name) and file_name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def _parse_numero(value) -> int:
+    """Convertit une cellule Numéro (int, float ou texte '881', '881.0') en entier"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(float(str(value).strip().replace(",", ".")))
+
+
+def read_rows(file_path: str, sheet: Optional[str] = None) -> Iterator[Tuple]:
+    """
+    Lit les lignes de données (sans l'en-tête) selon le format du fichier.
+    Chaque ligne est un tuple (date_heure, numero, victoire, ...).
+    Le CSV est le chemin rapide: lecture en flux, sans décompression zip/XML.
+    sheet: nom de la feuille à lire (par défaut la feuille active / la première)
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        return _read_csv_rows(file_path)
+    if extension == '.ods':
+        return _read_ods_rows(file_path, sheet)
+    if extension == '.xls':
+        return _read_xls_rows(file_path, sheet)
+    return _read_xlsx_rows(file_path, sheet)
+
+
+def list_sheets(file_path: str) -> List[Optional[str]]:
+    """Noms des feuilles dans l'ordre du classeur ([None] pour un CSV, à feuille unique)"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        return [None]
+    if extension == '.ods':
+        return _ods_sheet_names(file_path)
+    if extension == '.xls':
+        try:
+            import xlrd
+        except ImportError:
+            raise ValueError("Format .xls non supporté (module xlrd absent) - convertissez le fichier en .xlsx ou .csv")
+        return xlrd.open_workbook(file_path, on_demand=True).sheet_names()
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def compact_rows(file_path: str, sheet: Optional[str] = None) -> List[list]:
+    """Lit le fichier et réduit chaque ligne à [date_heure, numero, victoire] sérialisables (pour le cache d'import)"""
+    compact = []
+    for row in read_rows(file_path, sheet):
+        cells = list(row[:3]) + [None] * (3 - len(row[:3]))
+        if isinstance(cells[0], datetime):
+            cells[0] = cells[0].strftime("%Y-%m-%d %H:%M:%S")
+        cells = [c if c is None or isinstance(c, (str, int, float)) else str(c) for c in cells]
+        compact.append(cells)
+    return compact
+
+
+def _read_xlsx_rows(file_path: str, sheet_name: Optional[str] = None) -> Iterator[Tuple]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+        for row in sheet.iter_rows(min_row=2, values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def _read_xls_rows(file_path: str, sheet_name: Optional[str] = None) -> Iterator[Tuple]:
+    # openpyxl ne lit pas l'ancien format binaire .xls: xlrd est optionnel
+    try:
+        import xlrd
+    except ImportError:
+        raise ValueError("Format .xls non supporté (module xlrd absent) - convertissez le fichier en .xlsx ou .csv")
+
+    book = xlrd.open_workbook(file_path)
+    sheet = book.sheet_by_name(sheet_name) if sheet_name else book.sheet_by_index(0)
+    for row_index in range(1, sheet.nrows):
+        values = []
+        for cell in sheet.row(row_index):
+            if cell.ctype == xlrd.XL_CELL_DATE:
+                values.append(xlrd.xldate_as_datetime(cell.value, book.datemode))
+            else:
+                values.append(cell.value)
+        yield tuple(values)
+
+
+def _read_csv_rows(file_path: str) -> Iterator[Tuple]:
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+
+        reader = csv.reader(f, dialect)
+        next(reader, None)  # En-tête
+        for row in reader:
+            yield tuple(cell.strip() for cell in row)
+
+
+def _read_ods_rows(file_path: str, sheet_name: Optional[str] = None) -> Iterator[Tuple]:
+    """Lit une feuille d'un .ods en flux (content.xml) sans dépendance externe (la première par défaut)"""
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("content.xml") as content:
+            in_sheet = False
+            header_skipped = False
+            for event, element in ET.iterparse(content, events=("start", "end")):
+                if element.tag == f"{_ODS_TABLE}table":
+                    if event == "start":
+                        in_sheet = sheet_name is None or element.get(f"{_ODS_TABLE}name") == sheet_name
+                    elif in_sheet:
+                        break  # Feuille lue (la première par défaut, comme workbook.active)
+                    continue
+                if event != "end" or element.tag != f"{_ODS_TABLE}table-row":
+                    continue
+                if not in_sheet:
+                    element.clear()
+                    continue
+
+                values = []
+                for cell in element:
+                    if cell.tag not in (f"{_ODS_TABLE}table-cell", f"{_ODS_TABLE}covered-table-cell"):
+                        continue
+                    value = _ods_cell_value(cell)
+                    repeat = int(cell.get(f"{_ODS_TABLE}number-columns-repeated", "1"))
+                    values.extend([value] * min(repeat, 3 - len(values)))
+                    if len(values) >= 3:
+                        break
+                element.clear()
+
+                if not header_skipped:
+                    header_skipped = True
+                    continue
+                if any(v not in (None, "") for v in values):
+                    yield tuple(values)
+
+
+def _ods_sheet_names(file_path: str) -> List[str]:
+    names = []
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("content.xml") as content:
+            for event, element in ET.iterparse(content, events=("start", "end")):
+                if event == "start" and element.tag == f"{_ODS_TABLE}table":
+                    names.append(element.get(f"{_ODS_TABLE}name"))
+                elif event == "end" and element.tag == f"{_ODS_TABLE}table-row":
+                    element.clear()
+    return names
+
+
+def _ods_cell_value(cell):
+    value_type = cell.get(f"{_ODS_OFFICE}value-type")
+    if value_type in ("float", "percentage", "currency"):
+        return float(cell.get(f"{_ODS_OFFICE}value"))
+    if value_type == "date":
+        return datetime.fromisoformat(cell.get(f"{_ODS_OFFICE}date-value"))
+    return "".join("".join(p.itertext()) for p in cell.iter(f"{_ODS_TEXT}p")) or None
+
+
+def build_prediction_batch(rows, existing: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+    """
+    Étape commune à tous les formats: validation des lignes et filtre des consécutifs.
+    existing: prédictions actuelles en mode fusion (les lignes déjà lancées sont ignorées)
+
+    Returns:
+        tuple: (predictions, compteurs imported/skipped/consecutive_skipped/invalid)
+    """
+    imported_count = 0
+    skipped_count = 0
+    consecutive_skipped = 0
+    invalid_count = 0
+    predictions = {}
+    last_numero = None
+    last_day = None
+    imported_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    for row in rows:
+        if len(row) < 3 or not row[0] or not row[1] or not row[2]:
+            continue
+
+        date_heure = row[0]
+        numero = row[1]
+        victoire = row[2]
+
+        if isinstance(date_heure, datetime):
+            date_str = date_heure.strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            date_str = str(date_heure).strip()
+
+        try:
+            numero_int = _parse_numero(numero)
+        except (TypeError, ValueError):
+            invalid_count += 1
+            print(f"⚠️ Ligne ignorée: numéro invalide '{numero}'")
+            continue
+
+        victoire_type = str(victoire).strip()
+
+        # Les numéros de jeu repartent chaque jour: clé qualifiée par la date de la partie
+        day = prediction_day(date_str)
+        if day != last_day:
+            last_numero = None
+            last_day = day
+        prediction_key = make_prediction_key(date_str, numero_int)
+
+        # Vérifier si déjà lancé (seulement en mode fusion)
+        if existing is not None and prediction_key in existing and existing[prediction_key].get("launched"):
+            skipped_count += 1
+            continue
+
+        # FILTRE CONSÉCUTIFS: Vérifier si numéro actuel = précédent + 1
+        # Ex: Si on a 56, on ignore 57, mais on garde 59
+        if last_numero is not None and numero_int == last_numero + 1:
+            consecutive_skipped += 1
+            print(f"⚠️ Numéro {numero_int} IGNORÉ À L'IMPORT (consécutif à {last_numero})")
+            # NE PAS mémoriser ce numéro comme last_numero
+            # On continue avec l'ancien last_numero pour détecter le prochain consécutif
+            continue
+
+        predictions[prediction_key] = {
+            "numero": numero_int,
+            "date_heure": date_str,
+            "victoire": victoire_type,
+            "launch_text": launch_text(numero_int, victoire_type),
+            "launched": False,
+            "message_id": None,
+            "chat_id": None,
+            "imported_at": imported_at
+        }
+        imported_count += 1
+        last_numero = numero_int  # Mémoriser UNIQUEMENT les numéros NON consécutifs
+
+    return predictions, {
+        "imported": imported_count,
+        "skipped": skipped_count,
+        "consecutive_skipped": consecutive_skipped,
+        "invalid": invalid_count
+    }
+
+
+def prediction_format(victoire: str) -> str:
+    """Marqueur V1/V2 affiché dans le canal de diffusion"""
+    victoire_lower = str(victoire).lower()
+
+    if "joueur" in victoire_lower or "player" in victoire_lower:
+        return "👗 𝐕𝟏👗"
+    elif "banquier" in victoire_lower or "banker" in victoire_lower:
+        return "👗 𝐕2👗"
+    else:
+        return "👗 𝐕𝟏👗"
+
+
+def launch_text(numero: int, victoire: str) -> str:
+    """Texte du message de lancement, rendu une fois à l'import (envoyé tel quel au lancement)"""
+    return f"🔵{numero} {prediction_format(victoire)}: statut :⏳"
+
+
+# Formats de date_heure rencontrés (cellule date Excel/ODS convertie, ou texte saisi)
+_DATE_HEURE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y - %H:%M",
+    "%d/%m/%Y - %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+)
+
+
+def parse_date_heure(value) -> Optional[datetime]:
+    """Convertit la colonne date_heure en datetime (None si absente ou illisible)"""
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    text = str(value).strip()
+    for fmt in _DATE_HEURE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+# Stockage partitionné par jour de partie (data/excel_predictions/AAAA-MM-JJ.yaml)
+PARTITION_DIR = "data/excel_predictions"
+UNDATED_PARTITION = "sans_date"  # lignes sans date_heure lisible
+
+
+def prediction_day(date_heure) -> Optional[str]:
+    """Jour de la partie (AAAA-MM-JJ) d'après date_heure, None si illisible"""
+    game_time = parse_date_heure(date_heure)
+    return game_time.strftime("%Y-%m-%d") if game_time else None
+
+
+def make_prediction_key(date_heure, numero: int) -> str:
+    """Clé d'une prédiction: '2026-10-19:881' (numéro seul sans date lisible)"""
+    day = prediction_day(date_heure)
+    return f"{day}:{numero}" if day else str(numero)
+
+
+def partition_of(key: str) -> str:
+    """Partition (jour) d'une clé de prédiction"""
+    day, separator, _ = str(key).rpartition(":")
+    return day if separator else UNDATED_PARTITION
+
+
+def read_partition(file_path) -> Dict[str, Dict[str, Any]]:
+    """Contenu d'un fichier de partition (vide s'il n'existe pas)"""
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+# Niveau froid: prédictions réglées (vérifiées ou ignorées), en ajout seul et compressées
+COLD_DIR = "cold"
+
+
+def read_cold_partition(file_path) -> Dict[str, Dict[str, Any]]:
+    """Prédictions réglées d'un jour (cold/AAAA-MM-JJ.jsonl.gz, un membre gzip par ajout)"""
+    if not os.path.exists(file_path):
+        return {}
+    return _read_cold_members(file_path)
+
+
+def _read_cold_members(source) -> Dict[str, Dict[str, Any]]:
+    """source: chemin ou objet fichier binaire contenant des membres gzip de lignes JSON"""
+    predictions = {}
+    try:
+        with gzip.open(source, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                predictions[entry.pop("key")] = entry
+    except (EOFError, gzip.BadGzipFile):
+        pass  # dernier ajout interrompu: les membres complets restent lisibles
+    return predictions
+
+
+# Règles de vérification partagées par le bot et le backtest (backtest.py)
+MAX_OFFSET = 2
+FAILED_STATUS = '⭕✍🏻'
+OFFSET_STATUSES = ('✅0️⃣', '✅1️⃣', '✅2️⃣')
+_POINTS_PATTERN = re.compile(r"(✅)?(\d+)\([^)]+\)")
+
+
+def extract_points(message_text: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Points (joueur, banquier) d'un message de résultat
+    Format: #N620. 1(4♠️7♦️J♣️) - ✅4(9♣️5♠️) #T5
+    """
+    matches = _POINTS_PATTERN.findall(message_text)
+    if len(matches) >= 2:
+        # Premier groupe = Joueur, Deuxième groupe = Banquier
+        return int(matches[0][1]), int(matches[1][1])
+    return None, None
+
+
+def winner_from_points(joueur_point: int, banquier_point: int) -> Optional[str]:
+    """Gagnant réel selon les points (None = match nul)"""
+    if joueur_point > banquier_point:
+        return "joueur"
+    if banquier_point > joueur_point:
+        return "banquier"
+    return None
+
+
+def expected_side(victoire: str) -> str:
+    """Camp attendu d'après la colonne Victoire"""
+    return "banquier" if "banquier" in victoire.lower() else "joueur"
+
+
+def status_for_offset(offset: int) -> str:
+    """Statut de succès pour l'offset réel (plafonné à ✅2️⃣)"""
+    return OFFSET_STATUSES[min(max(offset, 0), len(OFFSET_STATUSES) - 1)]
+
 
 class ExcelPredictionManager:
-    def __init__(self):
-        self.predictions_file = "excel_predictions.yaml"
-        self.predictions = {}  # {key: {numero, date_heure, victoire, launched, message_id, channel_id}}
+    # Autour de minuit, la partition de la veille (ou du lendemain) reste chargée
+    midnight_margin = timedelta(hours=1)
+    # Un lancement par numéro ne vise qu'une partie datée à moins de 12h (numéros répétés d'un jour à l'autre)
+    launch_horizon = timedelta(hours=12)
+
+    def __init__(self, partition_dir: str = PARTITION_DIR, partition_cache_size: int = 7):
+        self.predictions_file = "excel_predictions.yaml"  # ancien fichier unique, migré au chargement
+        self.partition_dir = partition_dir
+        # Jeu de travail: partitions de la fenêtre courante uniquement
+        self.predictions = {}  # {jour:numero: {numero, date_heure, victoire, launched, message_id, channel_id}}
         self.last_launched_numero = None  # Dernier numéro lancé pour éviter les consécutifs
+        self._loaded = set()  # partitions présentes dans self.predictions
+        self._fingerprints = {}  # partition → empreinte du dernier contenu écrit
+        self._window = set()
+        self._partition_cache = {}  # partitions hors fenêtre lues à la demande (stats, backtests)
+        self._cold_indexes = {}  # partition chargée → index du niveau froid {count, verified, skipped_consecutive, by_status, members, keys}
+        self._cold_lock = threading.Lock()  # ajouts (boucle) / compaction (thread de maintenance)
+        self.partition_cache_size = partition_cache_size
+        self.backup_store = BackupStore(prefix="excel_predictions")
+        self.backup_store.adopt_legacy_backups("excel_predictions_backup_*.yaml")
         self.load_predictions()
 
     def backup_predictions(self) -> bool:
-        """Create a backup of current predictions before replacing"""
+        """Create a compressed backup of current predictions before replacing (written off the event loop)"""
         try:
-            if os.path.exists(self.predictions_file):
-                backup_name = f"excel_predictions_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yaml"
-                import shutil
-                shutil.copy2(self.predictions_file, backup_name)
-                print(f"✅ Backup créé: {backup_name}")
+            if self.predictions:
+                # Copie des entrées maintenant (elles changent ensuite); le dump YAML se fait dans le thread de backup
+                snapshot = {key: dict(pred) for key, pred in self.predictions.items()}
+                self.backup_store.submit(
+                    lambda: yaml.dump(snapshot, allow_unicode=True, default_flow_style=False).encode("utf-8")
+                )
                 return True
             return False
         except Exception as e:
             print(f"❌ Erreur création backup: {e}")
             return False
 
-    def import_excel(self, file_path: str, replace_mode: bool = True) -> Dict[str, Any]:
+    def restore_backup(self, name: str) -> Dict[str, Any]:
         """
-        Importer un fichier Excel avec option de remplacement automatique
-
-        Args:
-            file_path: Chemin vers le fichier Excel
-            replace_mode: Si True, remplace toutes les prédictions (avec backup automatique)
-                         Si False, fusionne avec les prédictions existantes
+        Restaure une sauvegarde (l'état actuel est lui-même sauvegardé avant).
+        Seuls les jours présents dans la sauvegarde sont remplacés, comme pour un import:
+        les autres partitions (le planning du jour par exemple) restent intactes.
         """
         try:
-            workbook = load_workbook(file_path, data_only=True)
-            sheet = workbook.active
-
-            imported_count = 0
-            skipped_count = 0
-            consecutive_skipped = 0
-            predictions = {}
-            last_numero = None
+            predictions = yaml.safe_load(self.backup_store.read(name)) or {}
+            if not isinstance(predictions, dict):
+                raise ValueError("contenu de sauvegarde invalide")
 
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if not row[0] or not row[1] or not row[2]:
-                    continue
+            self.backup_predictions()
+            predictions = self._rekey(predictions)
+            days = {partition_of(key) for key in predictions}
+            self._load_partitions(days)
+            old_count = sum(1 for key in self.predictions if partition_of(key) in days)
+            # Prédictions déjà réglées (niveau froid): elles y restent
+            predictions = {key: pred for key, pred in predictions.items() if not self.is_cold(key)}
+            self.predictions = {
+                **{key: pred for key, pred in self.predictions.items() if partition_of(key) not in days},
+                **predictions
+            }
+            self.save_predictions()
+            self._trim_window()
+            print(f"♻️ Backup restauré: {name} ({old_count} → {len(predictions)} prédictions sur {len(days)} jour(s))")
+            return {"success": True, "old_count": old_count, "total": len(predictions), "days": sorted(days)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
-                date_heure = row[0]
-                numero = row[1]
-                victoire = row[2]
+    def read_rows(self, file_path: str) -> Iterator[Tuple]:
+        return read_rows(file_path)
 
-                if isinstance(date_heure, datetime):
-                    date_str = date_heure.strftime("%Y-%m-%d %H:%M:%S")
-                else:
-                    date_str = str(date_heure)
+    def compact_rows(self, file_path: str) -> List[list]:
+        return compact_rows(file_path)
 
-                numero_int = int(numero)
-                victoire_type = str(victoire).strip()
+    def build_predictions(self, rows, replace_mode: bool = True) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+        # Les jours couverts par le fichier rejoignent le jeu de travail (fusion, diff, remplacement)
+        return build_prediction_batch(self._rows_loading_days(rows), None if replace_mode else self.predictions)
 
-                prediction_key = f"{numero_int}"
+    def _rows_loading_days(self, rows) -> Iterator[list]:
+        """Lignes non vides, lues au fil de l'eau: la partition d'un jour est chargée à sa première ligne"""
+        for row in filter(None, rows):
+            day = prediction_day(row[0]) or UNDATED_PARTITION
+            if day not in self._loaded:
+                self._load_partitions({day})
+            yield row
 
-                # Vérifier si déjà lancé (seulement en mode fusion)
-                if not replace_mode and prediction_key in self.predictions and self.predictions[prediction_key].get("launched"):
-                    skipped_count += 1
-                    continue
+    def import_excel(self, file_path: Optional[str], replace_mode: bool = True, rows: Optional[List[list]] = None) -> Dict[str, Any]:
+        """
+        Importer un fichier de prédictions (.xlsx, .xls, .csv, .ods) avec option de remplacement automatique
 
-                # FILTRE CONSÉCUTIFS: Vérifier si numéro actuel = précédent + 1
-                # Ex: Si on a 56, on ignore 57, mais on garde 59
-                if last_numero is not None and numero_int == last_numero + 1:
-                    consecutive_skipped += 1
-                    print(f"⚠️ Numéro {numero_int} IGNORÉ À L'IMPORT (consécutif à {last_numero})")
-                    # NE PAS mémoriser ce numéro comme last_numero
-                    # On continue avec l'ancien last_numero pour détecter le prochain consécutif
-                    continue
+        Args:
+            file_path: Chemin vers le fichier
+            replace_mode: Si True, remplace les prédictions des jours couverts par le fichier (avec backup automatique)
+                         Si False, fusionne avec les prédictions existantes
+            rows: Lignes déjà analysées (cache d'import) - le fichier n'est alors pas relu
+        """
+        try:
+            if rows is None:
+                rows = self.read_rows(file_path)
+            predictions, counts = self.build_predictions(rows, replace_mode)
+            # Lignes déjà réglées (niveau froid): jamais réimportées comme nouvelles
+            for key in [key for key in predictions if self.is_cold(key)]:
+                del predictions[key]
+                counts["imported"] -= 1
+                counts["skipped"] += 1
+            imported_count = counts["imported"]
 
-                predictions[prediction_key] = {
-                    "numero": numero_int,
-                    "date_heure": date_str,
-                    "victoire": victoire_type,
-                    "launched": False,
-                    "message_id": None,
-                    "chat_id": None,
-                    "imported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                imported_count += 1
-                last_numero = numero_int  # Mémoriser UNIQUEMENT les numéros NON consécutifs
-
-            # MODE REMPLACEMENT : Créer backup puis remplacer
+            # MODE REMPLACEMENT : Créer backup puis remplacer les jours couverts par le fichier
             old_count = 0
             if replace_mode:
-                old_count = len(self.predictions)
+                covered = {partition_of(key) for key in predictions}
+                old_keys = [key for key in self.predictions if partition_of(key) in covered]
+                old_count = len(old_keys)
                 if old_count > 0:
                     self.backup_predictions()
                     print(f"🔄 REMPLACEMENT: {old_count} anciennes prédictions → {imported_count} nouvelles prédictions")
-                self.predictions = predictions  # REMPLACER complètement
+                for key in old_keys:
+                    del self.predictions[key]
+                self.predictions.update(predictions)
             else:
                 # MODE FUSION : Ajouter aux prédictions existantes
                 self.predictions.update(predictions)
                 print(f"➕ FUSION: {imported_count} prédictions ajoutées")
 
             self.save_predictions()
+            total = len(self.predictions)
+            self._trim_window()
 
             return {
                 "success": True,
                 "imported": imported_count,
-                "skipped": skipped_count,
-                "consecutive_skipped": consecutive_skipped,
-                "total": len(self.predictions),
+                "skipped": counts["skipped"],
+                "consecutive_skipped": counts["consecutive_skipped"],
+                "invalid": counts["invalid"],
+                "total": total,
                 "mode": "remplacement" if replace_mode else "fusion",
                 "old_count": old_count if replace_mode else None
             }
@@ -120,11 +553,153 @@ class ExcelPredictionManager:
                 "error": str(e)
             }
 
+    @staticmethod
+    def _is_in_flight(pred: Dict[str, Any]) -> bool:
+        """Une prédiction lancée (en vérification, vérifiée ou ignorée) ne doit plus être modifiée par un import"""
+        return bool(pred.get("launched"))
+
+    def diff_predictions(self, imported: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Compare les lignes importées avec le stock actuel des jours couverts par le fichier.
+
+        Returns:
+            dict: clés added / removed / changed / unchanged / protected
+                  (protected = lignes retirées ou modifiées mais déjà lancées, conservées telles quelles)
+        """
+        diff = {"added": [], "removed": [], "changed": [], "unchanged": [], "protected": []}
+
+        for key, new_pred in imported.items():
+            current = self.predictions.get(key)
+            if current is None and self.is_cold(key):
+                diff["protected"].append(key)  # déjà réglée (niveau froid)
+            elif current is None:
+                diff["added"].append(key)
+            elif (current.get("date_heure"), current.get("victoire")) == (new_pred["date_heure"], new_pred["victoire"]):
+                diff["unchanged"].append(key)
+            elif self._is_in_flight(current):
+                diff["protected"].append(key)
+            else:
+                diff["changed"].append(key)
+
+        covered = {partition_of(key) for key in imported}
+        for key, current in self.predictions.items():
+            if key in imported or partition_of(key) not in covered:
+                continue
+            if self._is_in_flight(current):
+                diff["protected"].append(key)
+            else:
+                diff["removed"].append(key)
+
+        sort_key = lambda k: self.predictions.get(k, imported.get(k, {})).get("numero", 0)
+        for keys in diff.values():
+            keys.sort(key=sort_key)
+        return diff
+
+    def import_diff(self, file_path: Optional[str], rows: Optional[List[list]] = None) -> Dict[str, Any]:
+        """
+        Ré-import incrémental: applique uniquement les lignes ajoutées, retirées ou modifiées.
+        Les prédictions déjà lancées gardent leur état (message, offset, vérification).
+        Rien n'est réécrit si le fichier est identique au stock actuel.
+        """
+        try:
+            if rows is None:
+                rows = self.read_rows(file_path)
+            imported, counts = self.build_predictions(rows, replace_mode=True)
+            diff = self.diff_predictions(imported)
+            has_changes = bool(diff["added"] or diff["removed"] or diff["changed"])
+
+            if has_changes:
+                if diff["removed"] or diff["changed"]:
+                    self.backup_predictions()
+
+                for key in diff["removed"]:
+                    del self.predictions[key]
+                for key in diff["changed"]:
+                    self.predictions[key].update(
+                        date_heure=imported[key]["date_heure"],
+                        victoire=imported[key]["victoire"],
+                        launch_text=imported[key]["launch_text"],
+                        imported_at=imported[key]["imported_at"]
+                    )
+                for key in diff["added"]:
+                    self.predictions[key] = imported[key]
+
+                self.save_predictions()
+                print(f"🧮 DIFF: +{len(diff['added'])} / -{len(diff['removed'])} / ~{len(diff['changed'])} ({len(diff['protected'])} protégées)")
+            else:
+                print("🧮 DIFF: aucun changement, rien à sauvegarder")
+            total = len(self.predictions)
+            self._trim_window()
+
+            return {
+                "success": True,
+                "imported": len(imported),
+                "skipped": counts["skipped"],
+                "consecutive_skipped": counts["consecutive_skipped"],
+                "invalid": counts["invalid"],
+                "total": total,
+                "mode": "diff",
+                "diff": diff,
+                "has_changes": has_changes
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def _partition_path(self, day: str) -> str:
+        return os.path.join(self.partition_dir, f"{day}.yaml")
+
+    @staticmethod
+    def _fingerprint(predictions: Dict[str, Dict[str, Any]]) -> str:
+        return json.dumps(predictions, sort_keys=True, default=str)
+
+    @staticmethod
+    def _rekey(predictions: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Clés jour:numero pour un contenu à l'ancien format (clé = numéro seul)"""
+        return {make_prediction_key(pred.get("date_heure"), pred["numero"]): pred for pred in predictions.values()}
+
+    def _group_by_partition(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        groups = {}
+        for key, pred in self.predictions.items():
+            groups.setdefault(partition_of(key), {})[key] = pred
+        return groups
+
+    def _write_partition(self, day: str, predictions: Dict[str, Dict[str, Any]]):
+        path = self._partition_path(day)
+        if not predictions:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            yaml.dump(predictions, f, allow_unicode=True, default_flow_style=False)
+        os.replace(tmp_path, path)
+
     def save_predictions(self):
+        """
+        Écrit uniquement les partitions dont le contenu a changé depuis la dernière écriture.
+        Les prédictions réglées quittent d'abord le jeu de travail pour le niveau froid.
+        """
         try:
-            with open(self.predictions_file, "w", encoding="utf-8") as f:
-                yaml.dump(self.predictions, f, allow_unicode=True, default_flow_style=False)
-            print(f"✅ Prédictions Excel sauvegardées: {len(self.predictions)} entrées")
+            os.makedirs(self.partition_dir, exist_ok=True)
+            self._move_settled_to_cold()
+            groups = self._group_by_partition()
+            written = 0
+            for day in set(groups) | self._loaded:
+                predictions = groups.get(day, {})
+                fingerprint = self._fingerprint(predictions)
+                if self._fingerprints.get(day) == fingerprint:
+                    continue
+                self._write_partition(day, predictions)
+                self._fingerprints[day] = fingerprint
+                self._partition_cache.pop(day, None)
+                written += 1
+            self._loaded |= set(groups)
+            if written:
+                print(f"✅ Prédictions Excel sauvegardées: {len(self.predictions)} entrées ({written} partition(s) écrite(s))")
         except Exception as e:
             print(f"❌ Erreur sauvegarde prédictions: {e}")
 
@@ -132,32 +707,286 @@ class ExcelPredictionManager:
         """Alias pour compatibilité avec main.py"""
         self.save_predictions()
 
+    def _migrate_legacy_file(self):
+        """Répartit l'ancien fichier unique excel_predictions.yaml dans les partitions par jour"""
+        if not os.path.exists(self.predictions_file):
+            return
+        with open(self.predictions_file, "r", encoding="utf-8") as f:
+            legacy = self._rekey(yaml.safe_load(f) or {})
+        groups = {}
+        for key, pred in legacy.items():
+            groups.setdefault(partition_of(key), {})[key] = pred
+        os.makedirs(self.partition_dir, exist_ok=True)
+        for day, predictions in groups.items():
+            merged = read_partition(self._partition_path(day))
+            merged.update(predictions)
+            self._write_partition(day, merged)
+        os.replace(self.predictions_file, self.predictions_file + ".migrated")
+        print(f"📦 {len(legacy)} prédiction(s) migrée(s) vers {len(groups)} partition(s) journalière(s)")
+
     def load_predictions(self):
         try:
-            if os.path.exists(self.predictions_file):
-                with open(self.predictions_file, "r", encoding="utf-8") as f:
-                    self.predictions = yaml.safe_load(f) or {}
-                print(f"✅ Prédictions chargées: {len(self.predictions)} entrées")
+            self.predictions = {}
+            self._loaded = set()
+            self._fingerprints = {}
+            self._window = set()
+            self._partition_cache = {}
+            self._cold_indexes = {}
+            self._migrate_legacy_file()
+            self.roll_window()
+            if any(self._is_settled(pred) for pred in self.predictions.values()):
+                self.save_predictions()  # partitions antérieures au niveau froid
+            if self.predictions:
+                print(f"✅ Prédictions chargées: {len(self.predictions)} entrées ({', '.join(sorted(self._loaded))})")
             else:
-                self.predictions = {}
-                print("ℹ️ Aucun fichier de prédictions Excel existant")
+                print("ℹ️ Aucune prédiction Excel pour aujourd'hui")
         except Exception as e:
             print(f"❌ Erreur chargement prédictions: {e}")
             self.predictions = {}
 
-    def find_close_prediction(self, current_number: int, tolerance: int = 4):
+    def current_window(self, now: Optional[datetime] = None) -> set:
+        """Partitions à garder en mémoire: aujourd'hui, la veille/le lendemain à moins d'une heure de minuit"""
+        now = now or datetime.now()
+        days = {moment.strftime("%Y-%m-%d") for moment in (now - self.midnight_margin, now, now + self.midnight_margin)}
+        return days | {UNDATED_PARTITION}
+
+    def _load_partitions(self, days):
+        for day in days:
+            if day in self._loaded:
+                continue
+            predictions = self._partition_cache.pop(day, None)
+            if predictions is None:
+                predictions = read_partition(self._partition_path(day))
+            self.predictions.update(predictions)
+            self._fingerprints[day] = self._fingerprint(predictions)
+            self._cold_indexes[day] = self._read_cold_index(day)
+            self._loaded.add(day)
+
+    # --- Niveau froid ---
+
+    @staticmethod
+    def _is_settled(pred: Dict[str, Any]) -> bool:
+        return bool(pred.get("verified") or pred.get("skipped_consecutive"))
+
+    def _cold_path(self, day: str, suffix: str = ".jsonl.gz") -> str:
+        return os.path.join(self.partition_dir, COLD_DIR, f"{day}{suffix}")
+
+    def _read_cold_index(self, day: str) -> Dict[str, Any]:
+        index = {"count": 0, "verified": 0, "skipped_consecutive": 0, "by_status": {}, "members": 0, "keys": []}
+        path = self._cold_path(day, ".index.json")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                index.update(json.load(f))
+        index["keys"] = set(index["keys"])
+        return index
+
+    def _write_cold_index(self, day: str, index: Dict[str, Any]):
+        path = self._cold_path(day, ".index.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({**index, "keys": sorted(index["keys"])}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def is_cold(self, key: str) -> bool:
+        index = self._cold_indexes.get(partition_of(key))
+        return index is not None and key in index["keys"]
+
+    def _move_settled_to_cold(self) -> int:
+        """Déplace les prédictions réglées vers cold/<jour>.jsonl.gz (ajout d'un membre gzip) + index du jour"""
+        settled = [key for key, pred in self.predictions.items() if self._is_settled(pred)]
+        if not settled:
+            return 0
+        groups = {}
+        for key in settled:
+            groups.setdefault(partition_of(key), {})[key] = self.predictions.pop(key)
+        os.makedirs(os.path.join(self.partition_dir, COLD_DIR), exist_ok=True)
+        for day, predictions in groups.items():
+            lines = "".join(json.dumps({"key": key, **pred}, ensure_ascii=False, default=str) + "\n"
+                            for key, pred in predictions.items())
+            with self._cold_lock:
+                with gzip.open(self._cold_path(day), "at", encoding="utf-8") as f:
+                    f.write(lines)
+                index = self._cold_indexes.get(day) or self._read_cold_index(day)
+                index["members"] += 1
+                for key, pred in predictions.items():
+                    index["keys"].add(key)
+                    index["count"] += 1
+                    index["skipped_consecutive" if pred.get("skipped_consecutive") else "verified"] += 1
+                    if pred.get("status"):
+                        index["by_status"][pred["status"]] = index["by_status"].get(pred["status"], 0) + 1
+                self._write_cold_index(day, index)
+                if day in self._loaded:
+                    self._cold_indexes[day] = index
+        return len(settled)
+
+    def get_cold(self, day: str) -> Dict[str, Dict[str, Any]]:
+        """Prédictions réglées d'un jour (décompression à la demande: rapports, backtests)"""
+        return read_cold_partition(self._cold_path(day))
+
+    def compact_cold(self, day: str) -> int:
+        """
+        Réécrit le fichier froid d'un jour en un seul membre gzip; retourne les octets gagnés.
+        La décompression et la recompression se font sans verrou: il n'est pris que pour
+        relever la taille de départ puis pour le remplacement final, où les membres ajoutés
+        entre-temps par save_predictions sont recopiés tels quels à la suite.
+        """
+        path = self._cold_path(day)
+        with self._cold_lock:
+            if not os.path.exists(path):
+                return 0
+            before = os.path.getsize(path)  # toujours en fin de membre: les ajouts se font sous verrou
+            members_before = (self._cold_indexes.get(day) or self._read_cold_index(day))["members"]
+
+        with open(path, "rb") as f:
+            predictions = _read_cold_members(io.BytesIO(f.read(before)))
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=9) as f:
+            for key, pred in predictions.items():
+                f.write(json.dumps({"key": key, **pred}, ensure_ascii=False, default=str) + "\n")
+
+        with self._cold_lock:
+            with open(path, "rb") as f:
+                f.seek(before)
+                appended = f.read()
+            if appended:
+                with open(tmp_path, "ab") as f:
+                    f.write(appended)
+            os.replace(tmp_path, path)
+            index = self._cold_indexes.get(day) or self._read_cold_index(day)
+            index["members"] = 1 + max(0, index["members"] - members_before)
+            self._write_cold_index(day, index)
+            return before + len(appended) - os.path.getsize(path)
+
+    def compact_cold_archive(self, budget=None, before_day: Optional[str] = None) -> Dict[str, int]:
+        """
+        Compacte les jours froids terminés (avant before_day, par défaut hier) écrits en plusieurs ajouts.
+        budget (maintenance): arrêt entre deux jours quand il est épuisé, octets lus et écrits comptés.
+        """
+        before_day = before_day or (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        summary = {"days": 0, "saved_bytes": 0}
+        for day in self.list_cold_partitions():
+            if budget is not None and budget.exhausted:
+                break
+            if day >= before_day or self._read_cold_index(day)["members"] <= 1:
+                continue
+            size = os.path.getsize(self._cold_path(day))
+            saved = self.compact_cold(day)
+            summary["days"] += 1
+            summary["saved_bytes"] += saved
+            if budget is not None:
+                budget.spend(2 * size - saved)
+        return summary
+
+    def list_cold_partitions(self) -> List[str]:
+        cold_dir = os.path.join(self.partition_dir, COLD_DIR)
+        if not os.path.isdir(cold_dir):
+            return []
+        return sorted(name[:-len(".jsonl.gz")] for name in os.listdir(cold_dir) if name.endswith(".jsonl.gz"))
+
+    @staticmethod
+    def _is_pending_verification(pred: Dict[str, Any]) -> bool:
+        return bool(pred.get("launched")) and not pred.get("verified") and not pred.get("skipped_consecutive")
+
+    def _trim_window(self):
+        """Décharge les partitions hors fenêtre (sauf celles qui ont encore une prédiction en vérification)"""
+        stale = self._loaded - self._window
+        if not stale:
+            return
+        self.save_predictions()
+        groups = self._group_by_partition()
+        for day in stale:
+            predictions = groups.get(day, {})
+            if any(self._is_pending_verification(pred) for pred in predictions.values()):
+                continue
+            for key in predictions:
+                del self.predictions[key]
+            self._loaded.discard(day)
+            self._fingerprints.pop(day, None)
+            self._cold_indexes.pop(day, None)
+
+    def roll_window(self, now: Optional[datetime] = None) -> bool:
+        """
+        Fait glisser le jeu de travail au changement de jour (appel peu coûteux, à chaque message).
+        Returns:
+            bool: True si des partitions ont été chargées (planification horaire à refaire)
+        """
+        window = self.current_window(now)
+        if window == self._window:
+            return False
+        self._window = window
+        missing = window - self._loaded
+        self._load_partitions(missing)
+        self._trim_window()
+        return bool(missing)
+
+    def list_partitions(self) -> List[str]:
+        """Jours disponibles sur disque (AAAA-MM-JJ, et sans_date), niveau chaud ou froid"""
+        days = set(self.list_cold_partitions())
+        if os.path.isdir(self.partition_dir):
+            days.update(name[:-5] for name in os.listdir(self.partition_dir) if name.endswith(".yaml"))
+        return sorted(days)
+
+    def get_partition(self, day: str, include_cold: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Prédictions d'un jour. Hors fenêtre, la partition est lue à la demande (lecture seule)
+        et gardée dans un petit cache, sans rejoindre le jeu de travail.
+        include_cold: ajoute les prédictions réglées (lecture du niveau froid)
+        """
+        if day in self._loaded:
+            predictions = {key: pred for key, pred in self.predictions.items() if partition_of(key) == day}
+        else:
+            if day not in self._partition_cache:
+                if len(self._partition_cache) >= self.partition_cache_size:
+                    self._partition_cache.pop(next(iter(self._partition_cache)))
+                self._partition_cache[day] = read_partition(self._partition_path(day))
+            predictions = self._partition_cache[day]
+        if include_cold:
+            return {**self.get_cold(day), **predictions}
+        return predictions
+
+    def iter_predictions(self, start_day: Optional[str] = None, end_day: Optional[str] = None,
+                         include_cold: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(clé, prédiction) de toutes les partitions entre start_day et end_day inclus, jour par jour"""
+        for day in self.list_partitions():
+            if (start_day and day < start_day) or (end_day and day > end_day):
+                continue
+            yield from self.get_partition(day, include_cold).items()
+
+    def skip_if_consecutive(self, key: str) -> bool:
+        """
+        FILTRE PRINCIPAL: une prédiction consécutive au dernier numéro lancé n'est jamais lancée.
+        Elle est marquée comme lancée (skipped_consecutive) pour ne plus être proposée.
+        """
+        pred = self.predictions[key]
+        if self.last_launched_numero and pred["numero"] == self.last_launched_numero + 1:
+            print(f"⚠️ Numéro {pred['numero']} IGNORÉ AU LANCEMENT (consécutif à {self.last_launched_numero})")
+            # Marquer comme lancé pour éviter de le relancer plus tard
+            pred["launched"] = True
+            pred["skipped_consecutive"] = True
+            self.save_predictions()
+            return True
+        return False
+
+    def find_close_prediction(self, current_number: int, tolerance: int = 4, exclude=()):
         """
         Trouve une prédiction à lancer quand le canal source affiche un numéro proche AVANT le numéro cible.
         Exemple: Excel #881, Canal source #879 → Lance #881 (diff = +2)
-        Tolérance: 0 à 4 parties d'écart
+        Tolérance: 0 à tolerance parties d'écart (4 par défaut, adaptée à la cadence de la table par l'appelant)
         IMPORTANT: Ignore les numéros consécutifs (ex: 56→57 ignoré, on passe directement à 59)
+        exclude: clés dont le lancement est déjà en cours (ex: déclenché par le planificateur horaire)
         """
         try:
             closest_pred = None
             min_diff = float('inf')
+            now = datetime.now()
 
-            for key, pred in self.predictions.items():
-                if pred["launched"]:
+            # Copie: skip_if_consecutive sauvegarde, ce qui déplace la prédiction vers le niveau froid
+            for key, pred in list(self.predictions.items()):
+                if pred["launched"] or key in exclude:
+                    continue
+                # Autour de minuit deux journées sont chargées: même numéro, jour différent
+                game_time = parse_date_heure(pred.get("date_heure"))
+                if game_time is not None and abs(game_time - now) > self.launch_horizon:
                     continue
 
                 pred_numero = pred["numero"]
@@ -165,15 +994,9 @@ class ExcelPredictionManager:
                 # Si canal=879 et pred=881, diff=+2 (canal est 2 parties AVANT)
                 diff = pred_numero - current_number
 
-                # Vérifier si le canal source est entre 0 et 4 parties AVANT le numéro cible
+                # Vérifier si le canal source est entre 0 et tolerance parties AVANT le numéro cible
                 if 0 <= diff <= tolerance:
-                    # FILTRE PRINCIPAL: Vérifier si ce n'est pas un numéro consécutif du dernier prédit
-                    if self.last_launched_numero and pred_numero == self.last_launched_numero + 1:
-                        print(f"⚠️ Numéro {pred_numero} IGNORÉ AU LANCEMENT (consécutif à {self.last_launched_numero})")
-                        # Marquer comme lancé pour éviter de le relancer plus tard
-                        pred["launched"] = True
-                        pred["skipped_consecutive"] = True
-                        self.save_predictions()
+                    if self.skip_if_consecutive(key):
                         continue
 
                     # Garder la prédiction la plus proche (priorité au plus petit écart)
@@ -187,6 +1010,17 @@ class ExcelPredictionManager:
             print(f"Erreur find_close_prediction: {e}")
             return None
 
+    def get_launch_times(self, lead_minutes: int) -> List[Tuple[str, datetime, datetime]]:
+        """(clé, heure de lancement = date_heure - avance, date_heure) des prédictions non lancées datées"""
+        launch_times = []
+        for key, pred in self.predictions.items():
+            if pred["launched"]:
+                continue
+            game_time = parse_date_heure(pred.get("date_heure"))
+            if game_time is not None:
+                launch_times.append((key, game_time - timedelta(minutes=lead_minutes), game_time))
+        return launch_times
+
     def mark_as_launched(self, key: str, message_id: int, channel_id: int):
         """Marque une prédiction comme lancée"""
         if key in self.predictions:
@@ -204,36 +1038,7 @@ class ExcelPredictionManager:
         Le ✅ indique le gagnant réel
         """
         try:
-            # Chercher les groupes de points avec leurs symboles
-            # Format: [symbole optionnel]point(cartes)
-            pattern = r"(✅)?(\d+)\([^)]+\)"
-            matches = re.findall(pattern, message_text)
-
-            if len(matches) >= 2:
-                # Premier groupe = Joueur, Deuxième groupe = Banquier
-                joueur_win_symbol, joueur_point_str = matches[0]
-                banquier_win_symbol, banquier_point_str = matches[1]
-
-                joueur_point = int(joueur_point_str)
-                banquier_point = int(banquier_point_str)
-
-                # Le gagnant est indiqué par le symbole ✅
-                if joueur_win_symbol:
-                    actual_winner = "joueur"
-                elif banquier_win_symbol:
-                    actual_winner = "banquier"
-                else:
-                    # Fallback: comparer les points si pas de ✅
-                    if joueur_point > banquier_point:
-                        actual_winner = "joueur"
-                    elif banquier_point > joueur_point:
-                        actual_winner = "banquier"
-                    else:
-                        actual_winner = None  # Égalité
-
-                return joueur_point, banquier_point
-
-            return None, None
+            return extract_points(message_text)
         except Exception as e:
             print(f"Erreur extraction points: {e}")
             return None, None
@@ -264,9 +1069,9 @@ class ExcelPredictionManager:
                 return None, True
 
             # Si l'offset est trop grand, c'est un échec définitif
-            if real_offset_from_game > 2:
-                print(f"❌ Prédiction Excel #{predicted_numero}: offset {real_offset_from_game} > 2, échec définitif")
-                return '⭕✍🏻', False
+            if real_offset_from_game > MAX_OFFSET:
+                print(f"❌ Prédiction Excel #{predicted_numero}: offset {real_offset_from_game} > {MAX_OFFSET}, échec définitif")
+                return FAILED_STATUS, False
 
             # Vérifier que l'offset passé correspond à l'offset réel
             if current_offset != real_offset_from_game:
@@ -296,24 +1101,21 @@ class ExcelPredictionManager:
                 # Si c'est une incohérence critique (✅ mal placé), marquer comme échec
                 if '✅' in message_text and not '🔰' in message_text:
                     print(f"❌ CRITIQUE: Message avec ✅ incohérent - échec de la prédiction #{predicted_numero}")
-                    return '⭕✍🏻', False
+                    return FAILED_STATUS, False
                 else:
                     # Sinon, continuer à attendre (peut-être un message incomplet)
                     print(f"⚠️ Impossible d'extraire les points, on continue")
                     return None, True
 
             # Déterminer le gagnant réel selon les points
-            if joueur_point > banquier_point:
-                actual_winner = "joueur"
-            elif banquier_point > joueur_point:
-                actual_winner = "banquier"
-            else:
+            actual_winner = winner_from_points(joueur_point, banquier_point)
+            if actual_winner is None:
                 # Match nul - traiter comme échec pour les prédictions
                 print(f"⚠️ Match nul détecté (J:{joueur_point} = B:{banquier_point}), passage à offset suivant")
                 return None, True
 
             # Comparer avec le gagnant attendu
-            expected = "banquier" if "banquier" in expected_winner.lower() else "joueur"
+            expected = expected_side(expected_winner)
 
             print(f"📊 Points: Joueur={joueur_point}, Banquier={banquier_point} → Gagnant réel: {actual_winner}, Attendu: {expected}")
 
@@ -329,29 +1131,14 @@ class ExcelPredictionManager:
             print(f"   Gagnant réel: {actual_winner}, Attendu: {expected}")
             print(f"   Offset: {real_offset}")
 
-            if real_offset == 0:
-                return '✅0️⃣', False
-            elif real_offset == 1:
-                return '✅1️⃣', False
-            elif real_offset == 2:
-                return '✅2️⃣', False
-            else:
-                # Si offset > 2, on ne devrait pas arriver ici, mais par sécurité
-                return '✅2️⃣', False
+            return status_for_offset(real_offset), False
 
         except Exception as e:
             print(f"Erreur verify_excel_prediction: {e}")
             return None, True
 
     def get_prediction_format(self, victoire: str) -> str:
-        victoire_lower = victoire.lower()
-
-        if "joueur" in victoire_lower or "player" in victoire_lower:
-            return "👗 𝐕𝟏👗"
-        elif "banquier" in victoire_lower or "banker" in victoire_lower:
-            return "👗 𝐕2👗"
-        else:
-            return "👗 𝐕𝟏👗"
+        return prediction_format(victoire)
 
     def get_pending_predictions(self) -> List[Dict[str, Any]]:
         pending = []
@@ -366,17 +1153,30 @@ class ExcelPredictionManager:
         return sorted(pending, key=lambda x: x["numero"])
 
     def get_stats(self) -> Dict[str, int]:
-        total = len(self.predictions)
-        launched = sum(1 for p in self.predictions.values() if p["launched"])
+        # Prédictions réglées: compteurs de l'index du niveau froid, sans décompression
+        settled = sum(self._cold_indexes[day]["count"] for day in self._loaded if day in self._cold_indexes)
+        total = len(self.predictions) + settled
+        launched = sum(1 for p in self.predictions.values() if p["launched"]) + settled
         pending = total - launched
 
         return {
             "total": total,
             "launched": launched,
-            "pending": pending
+            "pending": pending,
+            "settled": settled
         }
 
     def clear_predictions(self):
+        """
+        Efface le jeu de travail (partitions chargées), y compris leurs prédictions réglées du niveau froid;
+        l'historique des jours précédents reste sur disque
+        """
         self.predictions = {}
         self.save_predictions()
+        with self._cold_lock:
+            for day in self._loaded:
+                for suffix in (".jsonl.gz", ".index.json"):
+                    if os.path.exists(self._cold_path(day, suffix)):
+                        os.remove(self._cold_path(day, suffix))
+                self._cold_indexes[day] = self._read_cold_index(day)
         print("🗑️ Toutes les prédictions Excel ont été effacées")
\ No newline at end of file
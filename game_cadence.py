@@ -0,0 +1,134 @@
+"""
+Cadence des parties mesurée sur le canal de statistiques
+Chaque première apparition d'un numéro de jeu donne un échantillon (secondes par partie,
+d'après l'horodatage des messages): moyenne mobile exponentielle (EWMA) et percentiles
+sur les derniers échantillons. La cadence sert à:
+- estimer l'heure de début d'une partie à venir (envois programmés)
+- adapter la fenêtre de lancement par numéro pour viser une avance en secondes
+- mesurer l'avance réellement obtenue entre le lancement et l'apparition de la partie
+"""
+import math
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple, List
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _local(moment: datetime) -> datetime:
+    """Horodatage Telegram (UTC) → heure locale naïve, comme date_heure"""
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+class CadenceEstimator:
+    """Secondes par partie (EWMA + percentiles), fenêtre de lancement adaptative et avances observées"""
+
+    def __init__(self, window: int = 50, alpha: float = 0.2, max_gap: int = 20, min_samples: int = 3,
+                 max_seconds: float = 600.0, lead_window: int = 200):
+        self.alpha = alpha
+        self.max_gap = max_gap          # écart de numéros au-delà duquel l'intervalle n'est pas significatif
+        self.min_samples = min_samples
+        self.max_seconds = max_seconds  # pause de la table: échantillon ignoré
+        self._samples: deque = deque(maxlen=window)
+        self._ewma: Optional[float] = None
+        self._last: Optional[Tuple[int, datetime]] = None
+        self._awaiting: Dict[int, datetime] = {}  # numéro lancé → heure du lancement
+        self._leads: deque = deque(maxlen=lead_window)
+
+    def observe(self, game_number: int, seen_at: Optional[datetime] = None) -> Optional[float]:
+        """
+        Première apparition d'un numéro de jeu (horodatage du message).
+        Returns:
+            float: avance observée en secondes si ce numéro avait été lancé, sinon None
+        """
+        seen_at = _local(seen_at) if seen_at else datetime.now()
+        if self._last is not None:
+            last_number, last_seen = self._last
+            gap = game_number - last_number
+            if gap == 0:
+                return None
+            if 0 < gap <= self.max_gap:
+                seconds = (seen_at - last_seen).total_seconds() / gap
+                if 0 < seconds <= self.max_seconds:
+                    self._samples.append(seconds)
+                    self._ewma = seconds if self._ewma is None else self.alpha * seconds + (1 - self.alpha) * self._ewma
+            # gap < 0: nouvelle journée, la numérotation repart de zéro
+        self._last = (game_number, seen_at)
+        return self._settle_lead(game_number, seen_at)
+
+    def launched(self, numero: int, launched_at: Optional[datetime] = None):
+        """Prédiction lancée: l'avance sera mesurée à l'apparition de son numéro"""
+        self._awaiting[numero] = _local(launched_at) if launched_at else datetime.now()
+
+    def _settle_lead(self, game_number: int, seen_at: datetime) -> Optional[float]:
+        lead = None
+        launched_at = self._awaiting.pop(game_number, None)
+        if launched_at is not None:
+            lead = (seen_at - launched_at).total_seconds()
+            self._leads.append(lead)
+        # Numéros sautés ou d'une autre journée: plus rien à mesurer
+        for numero in [n for n in self._awaiting if n < game_number or n > game_number + 10 * self.max_gap]:
+            del self._awaiting[numero]
+        return lead
+
+    @property
+    def ready(self) -> bool:
+        return len(self._samples) >= self.min_samples
+
+    @property
+    def seconds_per_game(self) -> Optional[float]:
+        return self._ewma if self.ready else None
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        if not self.ready:
+            return {"p10": None, "p50": None, "p90": None}
+        ordered = sorted(self._samples)
+        return {name: round(_percentile(ordered, q), 1) for name, q in (("p10", 0.10), ("p50", 0.50), ("p90", 0.90))}
+
+    def estimate_time(self, game_number: int) -> Optional[datetime]:
+        """Heure estimée d'apparition du numéro de jeu (None tant que la cadence est inconnue)"""
+        seconds = self.seconds_per_game
+        if seconds is None or self._last is None:
+            return None
+        last_number, last_seen = self._last
+        return last_seen + timedelta(seconds=(game_number - last_number) * seconds)
+
+    def tolerance_for(self, target_seconds: Optional[float], default: int = 4, minimum: int = 1, maximum: int = 10) -> int:
+        """
+        Fenêtre de lancement (en parties) pour obtenir au moins target_seconds d'avance.
+        Dimensionnée sur les parties rapides (p10): la cible reste tenue quand la table accélère.
+        Sans avance visée (None) ou tant que la cadence est inconnue: fenêtre par défaut.
+        """
+        if not target_seconds or not self.ready:
+            return default
+        fast = _percentile(sorted(self._samples), 0.10)
+        return max(minimum, min(maximum, math.ceil(target_seconds / fast)))
+
+    def lead_metrics(self, target_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Avances observées (s) entre le lancement et l'apparition de la partie"""
+        if not self._leads:
+            return {"count": 0, "p10": None, "p50": None, "p90": None, "min": None, "below_target": 0}
+        ordered = sorted(self._leads)
+        return {
+            "count": len(ordered),
+            "p10": round(_percentile(ordered, 0.10), 1),
+            "p50": round(_percentile(ordered, 0.50), 1),
+            "p90": round(_percentile(ordered, 0.90), 1),
+            "min": round(ordered[0], 1),
+            "below_target": sum(1 for lead in ordered if target_seconds is not None and lead < target_seconds)
+        }
+
+    def get_status(self, target_seconds: Optional[float] = None) -> Dict[str, Any]:
+        seconds = self.seconds_per_game
+        return {
+            "samples": len(self._samples),
+            "seconds_per_game": round(seconds, 1) if seconds is not None else None,
+            "percentiles": self.percentiles(),
+            "last_game": self._last[0] if self._last else None,
+            "last_seen": self._last[1].strftime("%Y-%m-%d %H:%M:%S") if self._last else None,
+            "target_lead": target_seconds,
+            "tolerance": self.tolerance_for(target_seconds),
+            "leads": self.lead_metrics(target_seconds)
+        }
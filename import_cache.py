@@ -0,0 +1,128 @@
+"""
+Cache d'import adressé par contenu pour le bot Telegram de prédiction
+Associe l'empreinte SHA-256 d'un fichier importé à ses lignes déjà analysées,
+pour qu'un fichier renvoyé à l'identique soit reconnu sans repasser par openpyxl
+"""
+import os
+import json
+import hashlib
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+from pathlib import Path
+
+
+class ImportCache:
+    """Cache disque {empreinte du contenu: lignes compactes} avec éviction LRU"""
+
+    def __init__(self, cache_dir: str = "data/import_cache", max_entries: int = 16):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.json"
+        self.max_entries = max_entries
+        # entries: {empreinte: {file_name, rows_count, last_used}}
+        # file_keys: {identifiant Telegram du document: empreinte}
+        self.index = {"entries": {}, "file_keys": {}, "last_imported": None}
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    self.index.update(json.load(f))
+        except Exception as e:
+            print(f"❌ Erreur chargement cache d'import: {e}")
+
+    def _save_index(self):
+        try:
+            with open(self.index_file, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde cache d'import: {e}")
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def telegram_file_key(message) -> Optional[str]:
+        """Identifiant stable du document Telegram (id + access_hash + taille), si disponible"""
+        document = getattr(message, "document", None)
+        if document is None or not getattr(document, "id", None):
+            return None
+        return f"{document.id}:{getattr(document, 'access_hash', 0)}:{getattr(document, 'size', 0)}"
+
+    def lookup_file_key(self, file_key: Optional[str]) -> Optional[str]:
+        """Retourne l'empreinte connue pour ce document Telegram (évite le téléchargement)"""
+        if not file_key:
+            return None
+        content_hash = self.index["file_keys"].get(file_key)
+        if content_hash and content_hash in self.index["entries"]:
+            return content_hash
+        return None
+
+    def get_rows(self, content_hash: str) -> Optional[List[list]]:
+        """Lignes compactes déjà analysées pour ce contenu, ou None"""
+        entry = self.index["entries"].get(content_hash)
+        if entry is None:
+            return None
+        try:
+            with open(self.cache_dir / f"{content_hash}.json", "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Entrée de cache illisible {content_hash[:12]}: {e}")
+            self._evict(content_hash)
+            return None
+
+        entry["last_used"] = datetime.now().isoformat()
+        self._save_index()
+        return rows
+
+    def store(self, content_hash: str, rows: List[list], file_name: str = "", file_key: Optional[str] = None):
+        """Enregistre les lignes analysées d'un fichier et applique la limite LRU"""
+        try:
+            with open(self.cache_dir / f"{content_hash}.json", "w", encoding="utf-8") as f:
+                json.dump(rows, f, ensure_ascii=False, separators=(",", ":"))
+        except Exception as e:
+            print(f"❌ Erreur écriture cache d'import: {e}")
+            return
+
+        self.index["entries"][content_hash] = {
+            "file_name": file_name,
+            "rows_count": len(rows),
+            "last_used": datetime.now().isoformat()
+        }
+        if file_key:
+            self.index["file_keys"][file_key] = content_hash
+
+        while len(self.index["entries"]) > self.max_entries:
+            oldest = min(self.index["entries"], key=lambda h: self.index["entries"][h]["last_used"])
+            self._evict(oldest)
+
+        self._save_index()
+
+    def remember_file_key(self, file_key: Optional[str], content_hash: str):
+        if file_key and content_hash in self.index["entries"]:
+            self.index["file_keys"][file_key] = content_hash
+            self._save_index()
+
+    def is_last_imported(self, content_hash: str) -> bool:
+        return self.index.get("last_imported") == content_hash
+
+    def mark_imported(self, content_hash: str):
+        self.index["last_imported"] = content_hash
+        self._save_index()
+
+    def _evict(self, content_hash: str):
+        self.index["entries"].pop(content_hash, None)
+        self.index["file_keys"] = {k: h for k, h in self.index["file_keys"].items() if h != content_hash}
+        try:
+            os.remove(self.cache_dir / f"{content_hash}.json")
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.index["entries"]),
+            "file_keys": len(self.index["file_keys"]),
+            "max_entries": self.max_entries
+        }
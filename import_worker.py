@@ -0,0 +1,186 @@
+"""
+Analyse des fichiers importés dans des processus dédiés (openpyxl/XML hors de la boucle asyncio)
+Chaque processus exécute ce module comme script: il n'importe qu'excel_importer, jamais le module
+principal du bot (le spawn de multiprocessing le réimporterait et recréerait le client Telegram,
+la session et les gestionnaires de données). Les processus, en nombre limité, restent disponibles
+entre deux analyses puis s'arrêtent après inactivité.
+Protocole: trames (longueur sur 4 octets + pickle) sur stdin/stdout du processus.
+"""
+import os
+import sys
+import pickle
+import struct
+import asyncio
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from excel_importer import list_sheets, compact_rows
+
+_HEADER = struct.Struct("<I")
+
+
+@contextmanager
+def uploaded_copy(file_name: str, file_bytes: bytes):
+    """Copie temporaire d'un fichier reçu en mémoire (les lecteurs travaillent sur un chemin)"""
+    suffix = os.path.splitext(file_name)[1].lower()
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        tmp.write(file_bytes)
+        tmp_path = tmp.name
+    try:
+        yield tmp_path
+    finally:
+        os.remove(tmp_path)
+
+
+# Tâches exécutées dans les processus d'analyse (appelées par nom)
+def uploaded_sheet_names(file_name: str, file_bytes: bytes) -> List[Optional[str]]:
+    with uploaded_copy(file_name, file_bytes) as tmp_path:
+        return list_sheets(tmp_path)
+
+
+def compact_uploaded_sheet(file_name: str, file_bytes: bytes, sheet: Optional[str] = None) -> List[list]:
+    with uploaded_copy(file_name, file_bytes) as tmp_path:
+        return compact_rows(tmp_path, sheet)
+
+
+_TASKS = {
+    "sheet_names": uploaded_sheet_names,
+    "compact_sheet": compact_uploaded_sheet,
+}
+
+
+def _serve():
+    """Boucle d'un processus d'analyse: une requête (tâche, arguments) → une réponse (succès, valeur)"""
+    requests = sys.stdin.buffer
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())  # les print() des lecteurs ne corrompent pas les trames
+    while True:
+        header = requests.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return  # stdin fermé: arrêt demandé par le pool
+        task, args = pickle.loads(requests.read(_HEADER.unpack(header)[0]))
+        try:
+            reply = pickle.dumps((True, _TASKS[task](*args)))
+        except Exception as e:
+            try:
+                reply = pickle.dumps((False, e))
+            except Exception:
+                reply = pickle.dumps((False, RuntimeError(f"{type(e).__name__}: {e}")))
+        replies.write(_HEADER.pack(len(reply)) + reply)
+        replies.flush()
+
+
+class ImportWorkerPool:
+    """Processus d'analyse démarrés à la demande (max_workers au plus), arrêtés après idle_seconds sans import"""
+
+    def __init__(self, max_workers: int = 4, idle_seconds: float = 120.0):
+        self.max_workers = max_workers
+        self.idle_seconds = idle_seconds
+        self._slots = asyncio.Semaphore(max_workers)
+        self._idle: List[asyncio.subprocess.Process] = []
+        self._workers: set = set()
+        self._users = 0
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self.counters = {"started": 0, "tasks": 0, "errors": 0}
+
+    async def _acquire_worker(self) -> asyncio.subprocess.Process:
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.returncode is None:
+                return worker
+            self._workers.discard(worker)
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+        )
+        self._workers.add(worker)
+        self.counters["started"] += 1
+        return worker
+
+    def _discard_worker(self, worker: asyncio.subprocess.Process):
+        self._workers.discard(worker)
+        if worker.returncode is None:
+            worker.kill()
+
+    async def run(self, task: str, *args):
+        """Exécute une tâche dans un processus libre (l'exception levée dans le processus est relancée ici)"""
+        async with self._slots:
+            worker = await self._acquire_worker()
+            try:
+                request = pickle.dumps((task, args))
+                worker.stdin.write(_HEADER.pack(len(request)) + request)
+                await worker.stdin.drain()
+                size, = _HEADER.unpack(await worker.stdout.readexactly(_HEADER.size))
+                ok, value = pickle.loads(await worker.stdout.readexactly(size))
+            except BaseException:
+                # Processus mort ou tâche annulée au milieu d'un échange: on ne le réutilise pas
+                self._discard_worker(worker)
+                self.counters["errors"] += 1
+                raise
+            self._idle.append(worker)
+        self.counters["tasks"] += 1
+        if not ok:
+            raise value
+        return value
+
+    async def parse_uploads(self, files: list, all_sheets: bool = False) -> Tuple[List[list], int]:
+        """
+        Analyse des fichiers reçus en mémoire: une tâche par feuille, réparties sur les processus.
+        Les lignes sont fusionnées dans l'ordre fichier → feuille (le filtre des consécutifs s'applique ensuite).
+
+        Returns:
+            tuple: (lignes compactes, nombre de feuilles lues)
+        """
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        self._users += 1
+        try:
+            if all_sheets:
+                sheet_lists = await asyncio.gather(*(self.run("sheet_names", name, data) for name, data in files))
+            else:
+                sheet_lists = [[None]] * len(files)
+
+            jobs = [(name, data, sheet) for (name, data), sheets in zip(files, sheet_lists) for sheet in sheets]
+            batches = await asyncio.gather(*(self.run("compact_sheet", *job) for job in jobs))
+        finally:
+            self._users -= 1
+            if self._users == 0 and self._workers:
+                self._idle_handle = asyncio.get_running_loop().call_later(self.idle_seconds, self._close_idle)
+        return [row for batch in batches for row in batch], len(jobs)
+
+    def _close_idle(self):
+        self._idle_handle = None
+        if self._users == 0 and self._workers:
+            asyncio.ensure_future(self.close())
+            print("💤 Processus d'analyse des fichiers arrêtés (inactifs)")
+
+    async def close(self, timeout: float = 5.0):
+        """Ferme stdin des processus (fin de boucle) et attend leur sortie, kill au-delà de timeout"""
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        workers, self._workers, self._idle = list(self._workers), set(), []
+        for worker in workers:
+            if worker.returncode is None:
+                worker.stdin.close()
+        for worker in workers:
+            try:
+                await asyncio.wait_for(worker.wait(), timeout)
+            except asyncio.TimeoutError:
+                worker.kill()
+                await worker.wait()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "idle": len(self._idle),
+            "max_workers": self.max_workers,
+            "busy": self._users > 0,
+            **self.counters
+        }
+
+
+if __name__ == "__main__":
+    _serve()
@@ -0,0 +1,115 @@
+"""
+Planificateur horaire des lancements de prédictions Excel
+Min-tas des prédictions ordonnées par heure de lancement (date_heure - intervalle):
+insertion O(log n), annulation O(1) par suppression paresseuse
+"""
+import asyncio
+import heapq
+import itertools
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+_REMOVED = object()  # Marqueur d'entrée annulée restant dans le tas
+
+
+class LaunchScheduler:
+    """Déclenche un callback asynchrone à l'heure de lancement de chaque prédiction"""
+
+    def __init__(self, launch_callback: Callable[[str], Awaitable[Any]]):
+        self.launch_callback = launch_callback
+        self._heap = []  # [timestamp, seq, key]
+        self._entries: Dict[str, list] = {}
+        self._counter = itertools.count()
+        self._removed_count = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.fired_count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, key: str, launch_at: datetime):
+        """Planifie (ou replanifie) le lancement d'une prédiction"""
+        self.cancel(key)
+        entry = [launch_at.timestamp(), next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wakeup.set()  # Nouvelle échéance la plus proche
+
+    def cancel(self, key: str) -> bool:
+        """Annule le lancement planifié (l'entrée est retirée du tas plus tard)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[-1] = _REMOVED
+        self._removed_count += 1
+        # Compactage quand le tas est majoritairement composé d'entrées annulées
+        if self._removed_count > 64 and self._removed_count > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if e[-1] is not _REMOVED]
+            heapq.heapify(self._heap)
+            self._removed_count = 0
+        return True
+
+    def clear(self):
+        self._heap.clear()
+        self._entries.clear()
+        self._removed_count = 0
+        self._wakeup.set()
+
+    def next_launch(self) -> Optional[Tuple[str, datetime]]:
+        self._drop_removed()
+        if not self._heap:
+            return None
+        timestamp, _, key = self._heap[0]
+        return key, datetime.fromtimestamp(timestamp)
+
+    def _drop_removed(self):
+        while self._heap and self._heap[0][-1] is _REMOVED:
+            heapq.heappop(self._heap)
+            self._removed_count -= 1
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            print("⏰ Planificateur horaire des lancements démarré")
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            self._drop_removed()
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - datetime.now().timestamp()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            self._entries.pop(key, None)
+            self.fired_count += 1
+            try:
+                await self.launch_callback(key)
+            except Exception as e:
+                print(f"❌ Erreur lancement planifié {key}: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        next_launch = self.next_launch()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "scheduled": len(self._entries),
+            "fired": self.fired_count,
+            "next_key": next_launch[0] if next_launch else None,
+            "next_at": next_launch[1].strftime("%Y-%m-%d %H:%M:%S") if next_launch else None
+        }
@@ -0,0 +1,142 @@
+"""
+Suivi de l'avance réelle des lancements de prédictions Excel (SLO)
+Pour chaque prédiction lancée: heure de publication du message déclencheur (canal stats),
+début et fin de l'envoi, puis arrivée du résultat de la partie visée. On en tire:
+- latence de traitement: message déclencheur publié → début de l'envoi
+- latence d'envoi: durée de l'appel send_message
+- avance effective: fin de l'envoi → résultat de la partie visée
+Histogrammes cumulés (façon Prometheus) et compteur de dépassements: prédictions publiées
+moins de slo_seconds avant le résultat de leur partie.
+"""
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+HANDLER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+SEND_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+LEAD_BUCKETS = (0.0, 15.0, 30.0, 60.0, 120.0, 180.0, 300.0, 600.0)
+
+
+def _epoch(moment) -> Optional[float]:
+    if moment is None:
+        return None
+    return moment.timestamp() if isinstance(moment, datetime) else float(moment)
+
+
+class _Histogram:
+    """Histogramme à bornes fixes: compte par borne (≤), somme, min et max"""
+
+    __slots__ = ("bounds", "counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # dernière case: au-delà de la dernière borne
+        self.count = 0
+        self.total = 0.0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+
+    def observe(self, value: float):
+        index = next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets, cumulative = {}, 0
+        for bound, count in zip(list(self.bounds) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "min": round(self.minimum, 3) if self.minimum is not None else None,
+            "max": round(self.maximum, 3) if self.maximum is not None else None,
+            "buckets": buckets
+        }
+
+
+class LaunchSLOTracker:
+    """Latences de lancement et avance effective par prédiction, avec compteur de dépassements du SLO"""
+
+    def __init__(self, slo_seconds: float = 60.0, recent_size: int = 50, max_pending: int = 500):
+        self.slo_seconds = slo_seconds
+        self.max_pending = max_pending
+        self.handler = _Histogram(HANDLER_BUCKETS)
+        self.send = _Histogram(SEND_BUCKETS)
+        self.lead = _Histogram(LEAD_BUCKETS)
+        self.breaches = 0
+        self.missed = 0  # résultat de la partie visée jamais reçu (numéro sauté)
+        self._pending: Dict[int, Dict[str, Any]] = {}  # numéro → horodatages du lancement
+        self.recent: deque = deque(maxlen=recent_size)
+
+    def record_launch(self, numero: int, trigger: str, triggered_at=None, send_started=None, send_completed=None):
+        """
+        Lancement terminé. triggered_at: publication du message déclencheur (None pour l'horaire);
+        send_started/send_completed: epoch ou datetime (send_started None pour un message programmé)
+        """
+        triggered_at, send_started = _epoch(triggered_at), _epoch(send_started)
+        send_completed = _epoch(send_completed) or time.time()
+        if triggered_at is not None and send_started is not None:
+            self.handler.observe(max(0.0, send_started - triggered_at))
+        if send_started is not None:
+            self.send.observe(max(0.0, send_completed - send_started))
+        if len(self._pending) >= self.max_pending:
+            self._pending.pop(next(iter(self._pending)))
+            self.missed += 1
+        self._pending[numero] = {
+            "numero": numero,
+            "trigger": trigger,
+            "triggered_at": triggered_at,
+            "send_started": send_started,
+            "send_completed": send_completed
+        }
+
+    def record_result(self, game_number: int, result_at=None) -> Optional[float]:
+        """
+        Résultat final d'une partie reçu. Returns: avance effective (s) si une prédiction visait ce numéro
+        """
+        result_at = _epoch(result_at) or time.time()
+        lead = None
+        entry = self._pending.pop(game_number, None)
+        if entry is not None:
+            lead = result_at - entry["send_completed"]
+            self.lead.observe(lead)
+            breached = lead < self.slo_seconds
+            self.breaches += breached
+            entry.update(result_at=result_at, lead=round(lead, 3), breached=breached)
+            self.recent.append(entry)
+        # Partie visée dépassée sans résultat (numéro sauté) ou journée terminée
+        for numero in [n for n in self._pending if n < game_number]:
+            del self._pending[numero]
+            self.missed += 1
+        return lead
+
+    def reset(self):
+        self.handler = _Histogram(HANDLER_BUCKETS)
+        self.send = _Histogram(SEND_BUCKETS)
+        self.lead = _Histogram(LEAD_BUCKETS)
+        self.breaches = 0
+        self.missed = 0
+        self.recent.clear()
+
+    def get_report(self) -> Dict[str, Any]:
+        settled = self.lead.count
+        return {
+            "slo_seconds": self.slo_seconds,
+            "launches_pending_result": len(self._pending),
+            "settled": settled,
+            "breaches": self.breaches,
+            "breach_rate": round(self.breaches / settled * 100, 1) if settled else 0.0,
+            "missed": self.missed,
+            "handler_latency": self.handler.to_dict(),
+            "send_latency": self.send.to_dict(),
+            "lead": self.lead.to_dict(),
+            "recent": [
+                {key: value for key, value in entry.items() if key in ("numero", "trigger", "lead", "breached")}
+                for entry in list(self.recent)[-10:]
+            ]
+        }
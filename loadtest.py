@@ -0,0 +1,316 @@
+"""
+Test de charge du serveur de monitoring (aiohttp) pendant le traitement des messages
+Le serveur web partage la boucle asyncio du client Telegram: ce test mesure la latence
+HTTP sous charge et la dégradation du traitement des messages du canal stats qui en résulte.
+
+La surveillance de la boucle du bot (loop_monitor.py) est active pendant les deux phases:
+les blocages détectés sont rapportés avec leur site, et --max-stall-ms fait échouer le test
+(code de sortie 1) si la boucle reste bloquée plus longtemps, pour attraper les régressions.
+
+Tout tourne en local, dans un dossier temporaire: le client Telegram est remplacé par un
+faux client (main.client), le flux du canal stats est synthétique (⏰ puis résultat final)
+et les requêtes HTTP partent d'un thread séparé, comme un moniteur externe.
+
+Usage:
+    python loadtest.py
+    python loadtest.py --concurrency 50 --duration 20 --rate 20 --endpoints /status,/health
+    python loadtest.py --max-stall-ms 250
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import contextlib
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+
+import aiohttp
+from aiohttp import web
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+STAT_CHANNEL = -1000000000001
+DISPLAY_CHANNEL = -1000000000002
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max en millisecondes"""
+    if not values:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"count": len(ordered), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99),
+            "max": round(ordered[-1] * 1000, 2)}
+
+
+class FakeMessage:
+    """Message du canal stats tel que le pipeline le reçoit (id, chat_id, message, date)"""
+
+    def __init__(self, message_id: int, text: str):
+        self.id = message_id
+        self.chat_id = STAT_CHANNEL
+        self.message = text
+        self.date = datetime.now(timezone.utc)
+        self.submitted_at = 0.0
+
+
+class FakeClient:
+    """Remplace TelegramClient: chaque appel réseau coûte rtt secondes"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self._ids = 0
+        self.calls = {"send_message": 0, "edit_message": 0}
+
+    async def send_message(self, entity, text, **kwargs):
+        self.calls["send_message"] += 1
+        await asyncio.sleep(self.rtt)
+        self._ids += 1
+        return FakeMessage(self._ids, text)
+
+    async def edit_message(self, entity, message_id, text=None, **kwargs):
+        self.calls["edit_message"] += 1
+        await asyncio.sleep(self.rtt)
+        return FakeMessage(message_id, text)
+
+    async def get_messages(self, entity, **kwargs):
+        await asyncio.sleep(self.rtt)
+        return []
+
+
+def synthetic_game(game_number: int) -> List[str]:
+    """Partie en cours puis résultat final, comme le canal stats les édite"""
+    joueur, banquier = random.randint(0, 9), random.randint(0, 9)
+    mark_j = "✅" if joueur > banquier else ""
+    mark_b = "✅" if banquier > joueur else ""
+    tag = "✅" if joueur != banquier else "🔰"
+    return [
+        f"#N{game_number}. ⏰{joueur}(4♠️{joueur}♦️) - {banquier}(K♣️{banquier}♠️) #T{joueur + banquier}",
+        f"#N{game_number}. {mark_j}{joueur}(4♠️{joueur}♦️) - {mark_b}{banquier}(K♣️{banquier}♠️) #T{joueur + banquier} {tag}"
+    ]
+
+
+def http_load(base_url: str, endpoints: List[str], concurrency: int, stop: threading.Event, results: Dict[str, Any]):
+    """Moniteur externe: concurrency requêtes en parallèle dans sa propre boucle (thread dédié)"""
+
+    async def worker(session, latencies, errors):
+        index = random.randrange(len(endpoints))
+        while not stop.is_set():
+            endpoint = endpoints[index % len(endpoints)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url + endpoint) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors[endpoint] = errors.get(endpoint, 0) + 1
+                        continue
+            except Exception:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+                continue
+            latencies.setdefault(endpoint, []).append(time.perf_counter() - started)
+
+    async def run():
+        latencies, errors = {}, {}
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(worker(session, latencies, errors) for _ in range(concurrency)))
+        results["latencies"] = latencies
+        results["errors"] = errors
+
+    asyncio.run(run())
+
+
+async def measure_phase(pipeline, latencies: List[float], duration: float, rate: float, game_start: int,
+                        monitor=None) -> Dict[str, Any]:
+    """Flux synthétique pendant duration secondes; retourne latences de traitement et retard de boucle"""
+    loop = asyncio.get_running_loop()
+    latencies.clear()
+    if monitor:
+        monitor.reset()
+    loop_lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        # Retard de la boucle: écart entre le réveil prévu et le réveil réel
+        while not stop.is_set():
+            expected = loop.time() + 0.01
+            await asyncio.sleep(0.01)
+            loop_lags.append(max(0.0, loop.time() - expected))
+
+    ticker_task = asyncio.create_task(ticker())
+    interval = 1.0 / rate
+    game_number = game_start
+    deadline = loop.time() + duration
+    submitted = 0
+    while loop.time() < deadline:
+        for text in synthetic_game(game_number):
+            message = FakeMessage(game_number, text)
+            message.submitted_at = loop.time()
+            await pipeline.submit(STAT_CHANNEL, message)
+            submitted += 1
+            await asyncio.sleep(interval)
+        game_number += 1
+
+    await pipeline.join(STAT_CHANNEL)
+    stop.set()
+    await ticker_task
+    phase = {
+        "messages": submitted,
+        "games": game_number - game_start,
+        "next_game": game_number,
+        "handling": percentiles(latencies),
+        "loop_lag": percentiles(loop_lags)
+    }
+    if monitor:
+        report = monitor.get_report()
+        phase["loop_monitor"] = {key: report[key] for key in ("slow_ticks", "max_lag_ms", "stalls", "blocking_sites")}
+    return phase
+
+
+async def run_loadtest(args) -> Dict[str, Any]:
+    import main as bot
+    from channel_pipeline import ChannelPipeline
+    from excel_importer import build_prediction_batch
+
+    fake_client = FakeClient(args.rtt / 1000)
+    bot.client = fake_client
+    bot.detected_stat_channel = STAT_CHANNEL
+    bot.detected_display_channel = DISPLAY_CHANNEL
+
+    # Planning synthétique: une prédiction toutes les 5 parties
+    total_games = int(args.rate * args.duration) + 100
+    today = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = [(today, n, random.choice(["Joueur", "Banquier"])) for n in range(5, total_games, 5)]
+    bot.excel_manager.predictions, _ = build_prediction_batch(rows)
+
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+
+    async def timed_handler(message):
+        await bot.process_stats_message(message)
+        latencies.append(loop.time() - message.submitted_at)
+
+    pipeline = ChannelPipeline(timed_handler, maxsize=100)
+    bot.loop_monitor.start()
+
+    runner = web.AppRunner(bot.create_web_app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    base_url = f"http://{host}:{port}"
+
+    report: Dict[str, Any] = {"params": vars(args)}
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            # Phase 1: flux seul (référence)
+            report["baseline"] = await measure_phase(pipeline, latencies, args.duration, args.rate, 1, bot.loop_monitor)
+
+            # Phase 2: flux + moniteur HTTP dans un thread séparé
+            stop = threading.Event()
+            http_results: Dict[str, Any] = {}
+            thread = threading.Thread(target=http_load, daemon=True, args=(
+                base_url, args.endpoints, args.concurrency, stop, http_results))
+            thread.start()
+            started = time.perf_counter()
+            report["loaded"] = await measure_phase(pipeline, latencies, args.duration, args.rate,
+                                                   report["baseline"]["next_game"], bot.loop_monitor)
+            stop.set()
+            await asyncio.to_thread(thread.join)
+            elapsed = time.perf_counter() - started
+    finally:
+        bot.loop_monitor.stop()
+        pipeline.stop()
+        await runner.cleanup()
+
+    report["http"] = {
+        endpoint: {**percentiles(values), "rps": round(len(values) / elapsed, 1)}
+        for endpoint, values in http_results.get("latencies", {}).items()
+    }
+    report["http_errors"] = http_results.get("errors", {})
+    report["telegram_calls"] = fake_client.calls
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    def row(label, p):
+        return f"{label:<28} n={p['count']:<7} p50={p['p50']:>8} ms  p95={p['p95']:>8} ms  p99={p['p99']:>8} ms  max={p['max']:>8} ms"
+
+    params = report["params"]
+    lines = [
+        f"🔧 Concurrence HTTP {params['concurrency']} | flux {params['rate']} msg/s | {params['duration']} s par phase | RTT simulé {params['rtt']} ms",
+        "",
+        "📨 Traitement des messages du canal stats",
+        row("Référence (sans HTTP)", report["baseline"]["handling"]),
+        row("Sous charge HTTP", report["loaded"]["handling"]),
+        "",
+        "⏱️ Retard de la boucle asyncio",
+        row("Référence (sans HTTP)", report["baseline"]["loop_lag"]),
+        row("Sous charge HTTP", report["loaded"]["loop_lag"]),
+        "",
+        "🌐 Latence HTTP"
+    ]
+    for endpoint, p in report["http"].items():
+        lines.append(row(f"{endpoint} ({p['rps']} req/s)", p))
+    if report["http_errors"]:
+        lines.append(f"❌ Erreurs HTTP: {report['http_errors']}")
+
+    lines.append("")
+    lines.append("🩺 Blocages de la boucle (loop_monitor)")
+    for label, phase in (("Référence (sans HTTP)", report["baseline"]), ("Sous charge HTTP", report["loaded"])):
+        monitor = phase["loop_monitor"]
+        lines.append(f"{label:<28} retard max {monitor['max_lag_ms']} ms | ticks lents {monitor['slow_ticks']} | blocages {monitor['stalls']}")
+        for site, count in monitor["blocking_sites"].items():
+            lines.append(f"    {count}× {site}")
+
+    base, loaded = report["baseline"]["handling"], report["loaded"]["handling"]
+    if base["p95"]:
+        lines.append("")
+        lines.append(f"📉 Dégradation p95 du traitement: x{loaded['p95'] / base['p95']:.2f} "
+                     f"({base['p95']} → {loaded['p95']} ms)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge du serveur de monitoring pendant le traitement des messages")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requêtes HTTP simultanées (défaut: 20)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de chaque phase en secondes (défaut: 10)")
+    parser.add_argument("--rate", type=float, default=20.0, help="Messages du canal stats par seconde (défaut: 20)")
+    parser.add_argument("--endpoints", default="/status,/health", help="Routes interrogées (défaut: /status,/health)")
+    parser.add_argument("--rtt", type=float, default=5.0, help="Latence simulée des appels Telegram en ms (défaut: 5)")
+    parser.add_argument("--max-stall-ms", type=float, default=None,
+                        help="Échec (code 1) si la boucle reste bloquée plus longtemps (ms)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    parser.add_argument("--verbose", action="store_true", help="Afficher les logs du bot")
+    args = parser.parse_args(argv)
+    args.endpoints = [e if e.startswith("/") else f"/{e}" for e in args.endpoints.split(",") if e]
+
+    # Le bot lit/écrit ses fichiers (config, prédictions, data/) dans le dossier courant:
+    # le test tourne dans un dossier temporaire avec des identifiants factices
+    for name, value in (("API_ID", "1"), ("API_HASH", "loadtest"), ("BOT_TOKEN", "loadtest"), ("ADMIN_ID", "1")):
+        os.environ.setdefault(name, value)
+    sys.path.insert(0, REPO_DIR)
+    with tempfile.TemporaryDirectory(prefix="loadtest_") as work_dir:
+        os.chdir(work_dir)
+        report = asyncio.run(run_loadtest(args))
+        os.chdir(REPO_DIR)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.json else format_report(report))
+
+    if args.max_stall_ms is not None:
+        worst = max(report[phase]["loop_monitor"]["max_lag_ms"] for phase in ("baseline", "loaded"))
+        if worst > args.max_stall_ms:
+            print(f"❌ Boucle bloquée {worst} ms (> {args.max_stall_ms} ms)", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
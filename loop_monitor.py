@@ -0,0 +1,175 @@
+"""
+Surveillance de la boucle asyncio: retard de la boucle et appels bloquants
+- une tâche se réveille toutes les interval secondes et mesure l'écart entre le réveil prévu et réel
+- un thread de garde vérifie que cette tâche progresse: si la boucle est bloquée depuis plus de
+  stall_threshold secondes, la pile du thread de la boucle est capturée (sys._current_frames),
+  ce qui désigne le code synchrone fautif (dump YAML, analyse Excel, zip, print...)
+Compteurs et derniers blocages exportés en JSON (/loop, /status) et utilisés par loadtest.py.
+"""
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque, Counter
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+_REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _blocking_site(frame) -> str:
+    """Frame du projet la plus profonde (sinon la plus profonde tout court): 'fichier:ligne fonction'"""
+    innermost, own = frame, None
+    while frame is not None:
+        if own is None and frame.f_code.co_filename.startswith(_REPO_DIR) and \
+                frame.f_code.co_filename != __file__:
+            own = frame
+        frame = frame.f_back
+    chosen = own or innermost
+    return f"{os.path.basename(chosen.f_code.co_filename)}:{chosen.f_lineno} {chosen.f_code.co_name}"
+
+
+class LoopMonitor:
+    """Retard de la boucle (tâche périodique) + détection des blocages avec pile (thread de garde)"""
+
+    def __init__(self, interval: float = 0.1, lag_threshold: float = 0.1, stall_threshold: float = 0.25,
+                 window: int = 600, max_stalls: int = 20, stack_limit: int = 12):
+        self.interval = interval
+        self.lag_threshold = lag_threshold      # retard compté comme "lent"
+        self.stall_threshold = stall_threshold  # blocage dont la pile est capturée
+        self.stack_limit = stack_limit
+        self._lags: deque = deque(maxlen=window)
+        self._bucket_counts = [0] * (len(LAG_BUCKETS) + 1)
+        self.ticks = 0
+        self.slow_ticks = 0
+        self.max_lag = 0.0
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self.blocking_sites: Counter = Counter()
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._current_stall: Optional[Dict[str, Any]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """À appeler depuis la boucle surveillée"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._ticker())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"🩺 Surveillance de la boucle démarrée (tick {self.interval * 1000:.0f} ms, blocage > {self.stall_threshold * 1000:.0f} ms)")
+
+    def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _ticker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._record(lag)
+
+    def _record(self, lag: float):
+        with self._lock:
+            self._heartbeat = time.monotonic()
+            self.ticks += 1
+            self._lags.append(lag)
+            self._bucket_counts[next((i for i, bound in enumerate(LAG_BUCKETS) if lag <= bound), len(LAG_BUCKETS))] += 1
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.lag_threshold:
+                self.slow_ticks += 1
+            if self._current_stall is not None:
+                # Fin du blocage: durée réelle connue au premier réveil qui suit
+                self._current_stall["duration_ms"] = round(lag * 1000, 1)
+                self._current_stall = None
+
+    def _watch(self):
+        """Thread de garde: capture la pile de la boucle quand elle ne progresse plus"""
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                blocked_for = time.monotonic() - self._heartbeat - self.interval
+                if blocked_for < self.stall_threshold or self._current_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                site = _blocking_site(frame)
+                stall = {
+                    "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "blocked_ms": round(blocked_for * 1000, 1),
+                    "duration_ms": None,  # complété à la reprise de la boucle
+                    "site": site,
+                    "stack": [line.rstrip() for line in traceback.format_stack(frame)[-self.stack_limit:]]
+                }
+                del frame
+                self._current_stall = stall
+                self.stalls.append(stall)
+                self.stall_count += 1
+                self.blocking_sites[site] += 1
+            print(f"🐢 Boucle bloquée depuis {stall['blocked_ms']:.0f} ms: {site}")
+
+    def lag_percentiles(self) -> Dict[str, float]:
+        with self._lock:
+            ordered = sorted(self._lags)
+        if not ordered:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "p50": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(_percentile(ordered, 0.99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2)
+        }
+
+    def get_report(self, stacks: bool = True) -> Dict[str, Any]:
+        lag = self.lag_percentiles()
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip([f"{b * 1000:g}ms" for b in LAG_BUCKETS] + ["+Inf"], self._bucket_counts):
+                cumulative += count
+                buckets[bound] = cumulative
+            return {
+                "running": self.running,
+                "interval_ms": self.interval * 1000,
+                "ticks": self.ticks,
+                "slow_ticks": self.slow_ticks,
+                "max_lag_ms": round(self.max_lag * 1000, 2),
+                "lag_ms": lag,
+                "lag_buckets": buckets,
+                "stalls": self.stall_count,
+                "blocking_sites": dict(self.blocking_sites.most_common(10)),
+                "recent_stalls": [
+                    stall if stacks else {k: v for k, v in stall.items() if k != "stack"}
+                    for stall in list(self.stalls)[-5:]
+                ]
+            }
+
+    def reset(self):
+        with self._lock:
+            self._lags.clear()
+            self._bucket_counts = [0] * (len(LAG_BUCKETS) + 1)
+            self.ticks = self.slow_ticks = self.stall_count = 0
+            self.max_lag = 0.0
+            self.stalls.clear()
+            self.blocking_sites.clear()
@@ -1,17 +1,33 @@
 import os
 import asyncio
 import re
+import io
 import json
-import zipfile
-import tempfile
 import shutil
-from datetime import datetime
-from telethon import TelegramClient, events
+import hmac
+from datetime import datetime, timedelta
+from telethon import events
 from telethon.events import ChatAction
 from dotenv import load_dotenv
 from predictor import CardPredictor
 from yaml_manager import init_database, db
-from excel_importer import ExcelPredictionManager
+from excel_importer import ExcelPredictionManager, is_supported_file, launch_text
+from import_worker import ImportWorkerPool
+from import_cache import ImportCache
+from launch_scheduler import LaunchScheduler
+from game_cadence import CadenceEstimator
+from scheduled_sends import ScheduledSendManager
+from launch_slo import LaunchSLOTracker
+from message_tracker import MessageStateTracker
+from channel_pipeline import ChannelPipeline
+from catchup import CatchupState, CatchupTelegramClient, EditCoalescer, fetch_missed_messages
+from event_stream import EventBroadcaster
+from results_archive import ResultsArchive
+from prediction_stats import PredictionStats
+from memory_tracker import MemoryTracker
+from loop_monitor import LoopMonitor
+from maintenance import MaintenanceScheduler, MaintenanceJob, prune_session_files
+from deploy_builder import DeployBuilder, DeployPackage
 from aiohttp import web
 import threading
 
@@ -26,6 +42,7 @@ try:
     ADMIN_ID = int(os.getenv('ADMIN_ID') or '0') if os.getenv('ADMIN_ID') else None
     PORT = int(os.getenv('PORT') or '5000')
     DISPLAY_CHANNEL = int(os.getenv('DISPLAY_CHANNEL') or '-1002999811353')
+    MEMORY_TOKEN = os.getenv('MEMORY_TOKEN') or ''  # route web /memory désactivée sans jeton
 
     # Validation des variables requises
     if not API_ID or API_ID == 0:
@@ -43,16 +60,26 @@ except Exception as e:
 
 # Fichier de configuration persistante
 CONFIG_FILE = 'bot_config.json'
+DEPLOY_OFFLINE_TOOLS = ('backtest.py', 'loadtest.py')  # outils hors ligne, absents du package /deploy
 
 # Variables d'état
 detected_stat_channel = None
 detected_display_channel = None
+display_peer = None  # (id du canal d'affichage, InputPeer résolu) pour un envoi sans résolution
 confirmation_pending = {}
 prediction_interval = 5  # Intervalle en minutes avant de chercher "A" (défaut: 5 min)
+import_mode = 'diff'  # Mode d'import des fichiers: diff, remplacement ou fusion
+IMPORT_MODES = ('diff', 'remplacement', 'fusion')
+import_all_sheets = False  # Importer toutes les feuilles du classeur (sinon la feuille active)
+import_batch = None  # Fichiers reçus pendant un lot /import_batch (None = pas de lot ouvert)
+# Processus d'analyse des fichiers (import_worker), créés au premier import et arrêtés après inactivité
+import_workers = ImportWorkerPool(max_workers=min(4, os.cpu_count() or 2), idle_seconds=120)
+scheduled_sends_mode = False  # Lancements déposés à l'avance en messages programmés Telegram
+launch_target_lead = None  # Avance visée (secondes) du lancement par numéro, None = fenêtre fixe de 4 parties (/avance)
 
 def load_config():
     """Load configuration with priority: JSON > Database > Environment"""
-    global detected_stat_channel, detected_display_channel, prediction_interval
+    global detected_stat_channel, detected_display_channel, prediction_interval, import_mode, import_all_sheets, scheduled_sends_mode, launch_target_lead
     try:
         # Toujours essayer JSON en premier (source de vérité)
         if os.path.exists(CONFIG_FILE):
@@ -61,6 +88,10 @@ def load_config():
                 detected_stat_channel = config.get('stat_channel')
                 detected_display_channel = config.get('display_channel', DISPLAY_CHANNEL)
                 prediction_interval = config.get('prediction_interval', 1)
+                import_mode = config.get('import_mode', 'diff')
+                import_all_sheets = bool(config.get('import_all_sheets', False))
+                scheduled_sends_mode = bool(config.get('scheduled_sends', False))
+                launch_target_lead = config.get('launch_target_lead')
                 print(f"✅ Configuration chargée depuis JSON: Stats={detected_stat_channel}, Display={detected_display_channel}, Intervalle={prediction_interval}min")
                 return
 
@@ -69,6 +100,10 @@ def load_config():
             detected_stat_channel = db.get_config('stat_channel')
             detected_display_channel = db.get_config('display_channel') or DISPLAY_CHANNEL
             interval_config = db.get_config('prediction_interval')
+            import_mode = db.get_config('import_mode') or 'diff'
+            import_all_sheets = str(db.get_config('import_all_sheets')) == 'True'
+            scheduled_sends_mode = str(db.get_config('scheduled_sends')) == 'True'
+            launch_target_lead = db.get_config('launch_target_lead')
             if detected_stat_channel:
                 detected_stat_channel = int(detected_stat_channel)
             if detected_display_channel:
@@ -88,6 +123,18 @@ def load_config():
         detected_display_channel = DISPLAY_CHANNEL
         prediction_interval = 1
 
+def current_config() -> dict:
+    """Configuration persistée (bot_config.json et package /deploy)"""
+    return {
+        'stat_channel': detected_stat_channel,
+        'display_channel': detected_display_channel,
+        'prediction_interval': prediction_interval,
+        'import_mode': import_mode,
+        'import_all_sheets': import_all_sheets,
+        'scheduled_sends': scheduled_sends_mode,
+        'launch_target_lead': launch_target_lead
+    }
+
 def save_config():
     """Save configuration to database and JSON backup"""
     try:
@@ -96,20 +143,37 @@ def save_config():
             db.set_config('stat_channel', detected_stat_channel)
             db.set_config('display_channel', detected_display_channel)
             db.set_config('prediction_interval', prediction_interval)
+            db.set_config('import_mode', import_mode)
+            db.set_config('import_all_sheets', import_all_sheets)
+            db.set_config('scheduled_sends', scheduled_sends_mode)
+            db.set_config('launch_target_lead', launch_target_lead)
             print("💾 Configuration sauvegardée en base de données")
 
         # Sauvegarde JSON de secours
-        config = {
-            'stat_channel': detected_stat_channel,
-            'display_channel': detected_display_channel,
-            'prediction_interval': prediction_interval
-        }
         with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+            json.dump(current_config(), f, indent=2)
         print(f"💾 Configuration sauvegardée: Stats={detected_stat_channel}, Display={detected_display_channel}, Intervalle={prediction_interval}min")
     except Exception as e:
         print(f"❌ Erreur sauvegarde configuration: {e}")
 
+async def refresh_display_peer():
+    """Résout et met en cache l'InputPeer du canal d'affichage (démarrage et changement de canal)"""
+    global display_peer
+    display_peer = None
+    if not detected_display_channel:
+        return
+    try:
+        display_peer = (detected_display_channel, await client.get_input_entity(detected_display_channel))
+        print(f"📌 Canal d'affichage résolu: {detected_display_channel}")
+    except Exception as e:
+        print(f"⚠️ Canal d'affichage {detected_display_channel} non résolu: {e}")
+
+def display_target():
+    """InputPeer en cache s'il correspond au canal configuré, sinon l'id brut (résolu par Telethon)"""
+    if display_peer and display_peer[0] == detected_display_channel:
+        return display_peer[1]
+    return detected_display_channel
+
 def update_channel_config(source_id: int, target_id: int):
     """Update channel configuration"""
     global detected_stat_channel, detected_display_channel
@@ -126,10 +190,89 @@ predictor = CardPredictor()
 # Gestionnaire d'importation Excel
 excel_manager = ExcelPredictionManager()
 
+# Cache d'import (fichiers déjà analysés)
+import_cache = ImportCache()
+
+# Planificateur horaire: lance chaque prédiction à date_heure - prediction_interval
+launch_scheduler = LaunchScheduler(lambda key: launch_excel_prediction(key, "horaire"))
+launches_in_progress = set()  # Clés en cours d'envoi (évite un double lancement horaire/numéro)
+
+# Cadence mesurée des parties (fenêtre de lancement adaptative, /avance) et envois programmés (/envoi_programme)
+game_cadence = CadenceEstimator()
+scheduled_sends = ScheduledSendManager()
+MAX_CADENCE_DRIFT = timedelta(minutes=15)  # au-delà, l'estimation par cadence n'est pas crédible
+
+# Latences de lancement et avance effective sur le résultat de la partie (/slo)
+launch_slo = LaunchSLOTracker(slo_seconds=60)
+
+# Dernier état traité des messages du canal stats (éditions ⏰/🕐 → résultat final)
+message_tracker = MessageStateTracker()
+
+# Une file bornée et un consommateur séquentiel par canal stats
+stats_pipeline = ChannelPipeline(lambda message: process_stats_message(message), maxsize=100)
+
+# Rattrapage après coupure: dernier message traité par canal + éditions regroupées
+catchup_state = CatchupState()
+edit_coalescer = EditCoalescer()
+catchup_task = None
+
+# Flux SSE pour les tableaux de bord (lancements, vérifications, expirations)
+live_events = EventBroadcaster(buffer_size=100)
+STATUS_OFFSETS = {'✅0️⃣': 0, '✅1️⃣': 1, '✅2️⃣': 2}
+
+# Archive en colonnes de tous les résultats finaux (un segment par jour)
+results_archive = ResultsArchive()
+
+# Taux de réussite glissants des prédictions Excel (mis à jour à chaque vérification)
+prediction_stats = PredictionStats()
+
+# Package /deploy: membres compressés en cache, assemblage hors de la boucle
+deploy_builder = DeployBuilder()
+
+# Retard de la boucle asyncio et pile des appels bloquants (/loop)
+loop_monitor = LoopMonitor()
+
 # Initialize Telegram client with unique session name
 import time
 session_name = f'bot_session_{int(time.time())}'
-client = TelegramClient(session_name, API_ID, API_HASH)
+# Reconnexion automatique et différences trop longues de Telethon → rattrapage du canal stats
+client = CatchupTelegramClient(session_name, API_ID, API_HASH, on_gap=lambda reason: start_catch_up(reason))
+
+# Maintenance pendant les périodes calmes du canal stats: nettoyage, rotation, compaction (/maintenance)
+MAINTENANCE_LAUNCH_GUARD = timedelta(minutes=2)  # pas de maintenance juste avant un lancement horaire
+
+def maintenance_busy_reason():
+    """Activité qui repousse la maintenance (None: rien ne s'y oppose)"""
+    if any(metrics["depth"] for metrics in stats_pipeline.get_metrics().values()):
+        return "file du canal stats non vide"
+    if catchup_task and not catchup_task.done():
+        return "rattrapage en cours"
+    if launches_in_progress:
+        return "lancement en cours"
+    next_launch = launch_scheduler.next_launch()
+    if next_launch and next_launch[1] - datetime.now() < MAINTENANCE_LAUNCH_GUARD:
+        return f"lancement imminent ({next_launch[0]})"
+    return None
+
+maintenance = MaintenanceScheduler(busy_check=maintenance_busy_reason)
+maintenance.add_job(MaintenanceJob("cleanup_old_data", lambda budget: database.cleanup_old_data() if database else 0, interval_hours=24))
+maintenance.add_job(MaintenanceJob("backups", lambda budget: excel_manager.backup_store.prune(), interval_hours=6))
+maintenance.add_job(MaintenanceJob("sessions", lambda budget: prune_session_files(".", session_name, budget=budget), interval_hours=12))
+maintenance.add_job(MaintenanceJob("cold_compaction", excel_manager.compact_cold_archive, interval_hours=24,
+                                   budget_seconds=10, io_budget_mb=50))
+
+# Diagnostic mémoire à la demande (/memoire, /memory): tailles des structures qui peuvent grossir
+memory_tracker = MemoryTracker({
+    "excel_predictions": lambda: len(excel_manager.predictions),
+    "predictor.prediction_status": lambda: len(predictor.prediction_status),
+    "predictor.status_log": lambda: len(predictor.status_log),
+    "predictor.processed_messages": lambda: len(predictor.processed_messages),
+    "predictor.prediction_messages": lambda: len(predictor.prediction_messages),
+    "message_tracker": lambda: message_tracker.get_stats()["tracked"],
+    "launch_scheduler": lambda: launch_scheduler.get_status()["scheduled"],
+    "telethon_entity_cache": lambda: len(client._mb_entity_cache.hash_map),
+    "session_files": lambda: sum(1 for name in os.listdir(".") if name.startswith("bot_session_")),
+})
 
 async def start_bot():
     """Start the bot with proper error handling"""
@@ -144,6 +287,10 @@ async def start_bot():
         me = await client.get_me()
         username = getattr(me, 'username', 'Unknown') or f"ID:{getattr(me, 'id', 'Unknown')}"
         print(f"Bot connecté: @{username}")
+        if me.bot:
+            # Les comptes bot ne peuvent pas programmer de messages: inutile d'attendre le premier refus
+            scheduled_sends.disable("SCHEDULE_BOT_NOT_ALLOWED")
+        await refresh_display_peer()
 
     except Exception as e:
         print(f"Erreur lors du démarrage du bot: {e}")
@@ -310,6 +457,7 @@ async def set_display_channel(event):
 
         # Save configuration
         save_config()
+        await refresh_display_peer()
 
         try:
             chat = await client.get_entity(channel_id)
@@ -342,6 +490,7 @@ async def force_set_display_channel(event):
 
         # Save configuration
         save_config()
+        await refresh_display_peer()
 
         try:
             chat = await client.get_entity(channel_id)
@@ -357,6 +506,132 @@ async def force_set_display_channel(event):
         await event.respond(f"❌ Erreur: {e}")
 
 
+async def launch_excel_prediction(pred_key: str, trigger: str, game_number: int = None, triggered_at: datetime = None) -> bool:
+    """
+    Lance une prédiction Excel dans le canal d'affichage.
+    Point d'entrée commun au déclenchement par numéro (canal stats) et au planificateur horaire:
+    une prédiction déjà lancée ou en cours d'envoi n'est jamais relancée.
+    triggered_at: heure de publication du message déclencheur (mesure de latence /slo)
+    """
+    pred_data = excel_manager.predictions.get(pred_key)
+    if not pred_data or pred_data["launched"] or pred_key in launches_in_progress:
+        return False
+    if not detected_display_channel:
+        print(f"⚠️ Lancement #{pred_data['numero']} impossible: canal d'affichage non configuré")
+        return False
+
+    # Message déjà programmé chez Telegram: publié à son heure, le déclenchement horaire n'a rien à faire
+    if trigger == "horaire" and scheduled_sends.is_pending(pred_key):
+        return False
+
+    launch_scheduler.cancel(pred_key)
+    # Le déclenchement par numéro applique déjà le filtre dans find_close_prediction
+    if game_number is None and excel_manager.skip_if_consecutive(pred_key):
+        return False
+
+    pred_numero = pred_data["numero"]
+    victoire_type = pred_data["victoire"]
+    # Texte rendu à l'import (les prédictions plus anciennes sont rendues ici)
+    prediction_text = pred_data.get("launch_text") or launch_text(pred_numero, victoire_type)
+
+    launches_in_progress.add(pred_key)
+    try:
+        if scheduled_sends.is_pending(pred_key):
+            # Lancement réactif avant l'heure programmée: le message programmé est supprimé avant l'envoi
+            if not await scheduled_sends.cancel(client, display_target(), pred_key):
+                print(f"⚠️ Message programmé {pred_key} non annulé: sa publication lancera la prédiction")
+                return False
+        send_started = time.time()
+        sent_message = await client.send_message(display_target(), prediction_text)
+        launch_slo.record_launch(pred_numero, trigger, triggered_at, send_started, time.time())
+        excel_manager.mark_as_launched(pred_key, sent_message.id, detected_display_channel)
+        game_cadence.launched(pred_numero)
+        live_events.publish("launch", {
+            "key": pred_key,
+            "numero": pred_numero,
+            "victoire": victoire_type,
+            "trigger": trigger,
+            "game_number": game_number,
+            "message_id": sent_message.id
+        })
+
+        if game_number is not None:
+            ecart = pred_numero - game_number
+            print(f"✅ Prédiction Excel lancée: {prediction_text} | Canal source: #{game_number} (écart: +{ecart} parties)")
+        else:
+            print(f"✅ Prédiction Excel lancée: {prediction_text} | Déclenchement: {trigger} ({pred_data.get('date_heure')})")
+        return True
+    except Exception as e:
+        print(f"❌ Erreur envoi prédiction Excel: {e}")
+        return False
+    finally:
+        launches_in_progress.discard(pred_key)
+
+def rebuild_launch_schedule():
+    """Replanifie toutes les prédictions non lancées à date_heure - prediction_interval"""
+    launch_scheduler.clear()
+    now = datetime.now()
+    scheduled = 0
+    for key, launch_at, game_time in excel_manager.get_launch_times(prediction_interval):
+        if game_time <= now:
+            continue  # Partie déjà passée: seul le déclenchement par numéro peut encore s'appliquer
+        launch_scheduler.schedule(key, max(launch_at, now))
+        scheduled += 1
+    print(f"⏰ Planification horaire: {scheduled} lancement(s) programmé(s) (avance {prediction_interval} min)")
+    request_scheduled_sync(force=True)
+
+def upcoming_launches() -> dict:
+    """{clé: (heure d'envoi, texte)}: date_heure - intervalle, décalée de la dérive mesurée par la cadence"""
+    launches = {}
+    last_launched = excel_manager.last_launched_numero
+    for key, launch_at, game_time in excel_manager.get_launch_times(prediction_interval):
+        pred = excel_manager.predictions[key]
+        if last_launched and pred["numero"] == last_launched + 1:
+            continue  # consécutif au dernier lancement: ne sera jamais lancé
+        estimated = game_cadence.estimate_time(pred["numero"])
+        if estimated is not None and abs(estimated - game_time) <= MAX_CADENCE_DRIFT:
+            launch_at += estimated - game_time
+        launches[key] = (launch_at, pred.get("launch_text") or launch_text(pred["numero"], pred["victoire"]))
+    return launches
+
+async def sync_scheduled_sends(force: bool = False):
+    """Dépose, reporte ou annule les messages programmés selon les lancements prévus"""
+    if not scheduled_sends_mode or not detected_display_channel:
+        return
+    try:
+        summary = await scheduled_sends.sync(client, display_target(), detected_display_channel, upcoming_launches(), force)
+        if any(summary.values()):
+            print(f"🗓️ Envois programmés: +{summary['submitted']} / ~{summary['rescheduled']} / -{summary['cancelled']}")
+    except Exception as e:
+        print(f"❌ Erreur synchronisation des envois programmés: {e}")
+
+def request_scheduled_sync(force: bool = False):
+    if scheduled_sends_mode and scheduled_sends.available:
+        asyncio.create_task(sync_scheduled_sends(force))
+
+def on_scheduled_delivery(message):
+    """Message programmé publié par Telegram: la prédiction est lancée avec l'id du message réel"""
+    resolved = scheduled_sends.resolve_delivered(message.message or "")
+    if not resolved:
+        return
+    key, entry = resolved
+    pred = excel_manager.predictions.get(key)
+    if not pred or pred["launched"]:
+        return
+    launch_scheduler.cancel(key)
+    excel_manager.mark_as_launched(key, message.id, detected_display_channel)
+    game_cadence.launched(pred["numero"], message.date)
+    launch_slo.record_launch(pred["numero"], "programmé", send_completed=message.date)
+    live_events.publish("launch", {
+        "key": key,
+        "numero": pred["numero"],
+        "victoire": pred["victoire"],
+        "trigger": "programmé",
+        "game_number": None,
+        "message_id": message.id
+    })
+    print(f"✅ Prédiction Excel lancée: {entry['text']} | Déclenchement: programmé ({entry['send_at'].strftime('%H:%M:%S')})")
+
 async def verify_excel_predictions(game_number: int, message_text: str):
     """Fonction consolidée pour vérifier toutes les prédictions Excel en attente"""
     for key, pred in list(excel_manager.predictions.items()):
@@ -410,14 +685,45 @@ async def update_prediction_status(pred: dict, numero: int, winner: str, status:
         new_text = f"🔵{numero} {v_format}statut :{status}"
 
         try:
-            await client.edit_message(channel_id, msg_id, new_text)
+            await edit_coalescer.edit(client, channel_id, msg_id, new_text)
             pred["verified"] = verified
-            excel_manager.save_predictions()
+            pred["status"] = status
+            excel_manager.save_predictions()  # vérifiée: passe au niveau froid
+            if verified:
+                prediction_stats.record(status, winner, pred.get("date_heure"))
+            live_events.publish("verification" if status in STATUS_OFFSETS else "expiry", {
+                "numero": numero,
+                "victoire": winner,
+                "status": status,
+                "offset": STATUS_OFFSETS.get(status)
+            })
             print(f"✅ Prédiction #{numero} mise à jour: {status}")
         except Exception as e:
             print(f"❌ Erreur mise à jour #{numero}: {e}")
 
 
+def format_rolling_stats() -> str:
+    """Bloc de taux de réussite glissants pour /sta et /excel_status"""
+    summary = prediction_stats.get_summary()
+    labels = [("50", "50 dernières"), ("200", "200 dernières"), ("1000", "1000 dernières"),
+              ("today", "Aujourd'hui"), ("7d", "7 jours")]
+    text = "🏆 **Taux de réussite**:"
+    for key, label in labels:
+        s = summary[key]
+        if not s["total"]:
+            text += f"\n• {label}: -"
+            continue
+        offsets = " ".join(f"{status}{s['by_offset'][i]}" for i, status in enumerate(STATUS_OFFSETS))
+        text += f"\n• {label}: {s['win_rate']}% ({s['wins']}/{s['total']}) {offsets} ⭕✍🏻{s['failed']}"
+
+    week = summary["7d"]
+    if week["total"]:
+        sides = " | ".join(f"{side} {v['win_rate']}% ({v['total']})" for side, v in week["by_side"].items() if v["total"])
+        text += f"\n• Par type (7 j): {sides}"
+        hours = sorted(week["by_hour"].items(), key=lambda item: (-item[1]["win_rate"], -item[1]["total"]))[:3]
+        text += "\n• Meilleures heures (7 j): " + ", ".join(f"{hour}h {v['win_rate']}% ({v['total']})" for hour, v in hours)
+    return text
+
 # --- COMMANDES DE BASE ---
 @client.on(events.NewMessage(pattern='/start'))
 async def start_command(event):
@@ -437,7 +743,7 @@ async def start_command(event):
 1. Ajoutez-moi dans vos canaux
 2. Je vous enverrai automatiquement une invitation privée
 3. Répondez avec `/set_stat [ID]` ou `/set_display [ID]`
-4. Envoyez votre fichier Excel (.xlsx) pour importer les prédictions
+4. Envoyez votre fichier Excel (.xlsx, .xls), .csv ou .ods pour importer les prédictions
 
 **Commandes** :
 • `/start` - Ce message
@@ -445,6 +751,17 @@ async def start_command(event):
 • `/excel_status` - Statut des prédictions Excel (admin)
 • `/excel_clear` - Effacer les prédictions Excel (admin)
 • `/sta` - Statistiques Excel (admin)
+• `/import_mode [mode]` - Mode d'import diff/remplacement/fusion (admin)
+• `/import_sheets [on|off]` - Importer toutes les feuilles (admin)
+• `/import_batch` - Importer plusieurs fichiers en une fois (admin)
+• `/envoi_programme [on|off]` - Lancements en messages programmés (admin)
+• `/avance [secondes|off]` - Avance visée et cadence mesurée (admin)
+• `/slo [secondes|reset]` - Latences de lancement et SLO d'avance (admin)
+• `/backups` - Sauvegardes des prédictions (admin)
+• `/restore_backup [n]` - Restaurer une sauvegarde (admin)
+• `/resultats [n]` - Derniers résultats archivés (admin)
+• `/memoire [start|stop|reset|export]` - Diagnostic mémoire (admin)
+• `/maintenance [run]` - Tâches de nettoyage et compaction (admin)
 • `/reset` - Réinitialiser (admin)
 
 **Format Excel** :
@@ -610,6 +927,8 @@ async def show_excel_stats(event):
 • En attente: {stats['pending']}
 • Lancées: {stats['launched']}
 
+{format_rolling_stats()}
+
 📈 **Configuration actuelle**:
 • Canal stats configuré: {'✅' if detected_stat_channel else '❌'} ({detected_stat_channel or 'Aucun'})
 • Canal affichage configuré: {'✅' if detected_display_channel else '❌'} ({detected_display_channel or 'Aucun'})
@@ -716,6 +1035,7 @@ async def manage_scheduler_disabled(event):
 
             # Met à jour la configuration globale
             update_channel_config(source_id, target_id)
+            await refresh_display_peer()
 
             await event.respond(f"""✅ **Configuration mise à jour**
 
@@ -768,7 +1088,7 @@ async def schedule_info_disabled(event):
 
 @client.on(events.NewMessage(pattern='/intervalle'))
 async def set_prediction_interval(event):
-    """Configure l'intervalle avant que le système cherche 'A' (admin uniquement)"""
+    """Configure l'avance de lancement des prédictions avant leur date_heure (admin uniquement)"""
     global prediction_interval
     try:
         if event.sender_id != ADMIN_ID:
@@ -785,12 +1105,12 @@ async def set_prediction_interval(event):
 **Intervalle actuel**: {prediction_interval} minutes
 
 **Description**:
-Définit le temps d'attente en minutes avant que le système commence à analyser les messages pour chercher la lettre 'A' dans les parenthèses et déclencher les prédictions.
+Définit l'avance en minutes avec laquelle chaque prédiction est lancée avant l'heure indiquée dans la colonne Date & Heure du fichier Excel (même si le canal source est silencieux). Le déclenchement par numéro (0-4 parties avant) reste actif.
 
 **Exemples**:
-• `/intervalle 3` - Attendre 3 minutes
-• `/intervalle 10` - Attendre 10 minutes
-• `/intervalle 1` - Attendre 1 minute
+• `/intervalle 3` - Lancer 3 minutes avant
+• `/intervalle 10` - Lancer 10 minutes avant
+• `/intervalle 1` - Lancer 1 minute avant
 
 **Recommandé**: Entre 1 et 15 minutes""")
             return
@@ -806,13 +1126,14 @@ Définit le temps d'attente en minutes avant que le système commence à analyse
 
             # Sauvegarder la configuration
             save_config()
+            rebuild_launch_schedule()
 
             await event.respond(f"""✅ **Intervalle mis à jour**
 
 ⏱️ **Ancien intervalle**: {old_interval} minutes
 ⏱️ **Nouvel intervalle**: {prediction_interval} minutes
 
-Le système attendra maintenant {prediction_interval} minute(s) avant de commencer l'analyse des messages pour la détection des 'A' dans les parenthèses.
+Les prédictions seront lancées {prediction_interval} minute(s) avant leur heure prévue ({len(launch_scheduler)} lancement(s) replanifié(s)).
 
 Configuration sauvegardée automatiquement.""")
 
@@ -834,6 +1155,9 @@ async def excel_status(event):
 
         stats = excel_manager.get_stats()
         pending = excel_manager.get_pending_predictions()
+        schedule = launch_scheduler.get_status()
+        next_launch = f"#{excel_manager.predictions[schedule['next_key']]['numero']} à {schedule['next_at']}" if schedule['next_key'] in excel_manager.predictions else "Aucun"
+        number_window = f"pour {launch_target_lead}s d'avance" if launch_target_lead else "(fixe)"
 
         msg = f"""📊 **Statut Prédictions Excel**
 
@@ -842,6 +1166,14 @@ async def excel_status(event):
 • En attente: {stats['pending']}
 • Lancées: {stats['launched']}
 
+{format_rolling_stats()}
+
+⏰ **Lancements horaires** (avance {prediction_interval} min):
+• Programmés: {schedule['scheduled']}
+• Prochain: {next_launch}
+
+🎯 **Lancement par numéro**: fenêtre {game_cadence.tolerance_for(launch_target_lead)} partie(s) {number_window} (`/avance`)
+
 📋 **Prochaines prédictions en attente** (max 10):
 """
 
@@ -859,7 +1191,7 @@ async def excel_status(event):
 • Quand un numéro proche est détecté, la prédiction est lancée automatiquement
 • Format V1 pour victoire Joueur, V2 pour victoire Banquier
 
-📤 **Pour importer**: Envoyez simplement votre fichier Excel (.xlsx)"""
+📤 **Pour importer**: Envoyez simplement votre fichier Excel (.xlsx), CSV (.csv) ou ODS (.ods)"""
 
         await event.respond(msg)
         print(f"Statut Excel envoyé à l'admin")
@@ -876,6 +1208,11 @@ async def excel_clear(event):
             return
 
         excel_manager.clear_predictions()
+        launch_scheduler.clear()
+        if scheduled_sends.pending and detected_display_channel:
+            # Sinon Telegram publierait encore les prédictions effacées
+            cancelled = await scheduled_sends.cancel_all(client, display_target())
+            print(f"🗓️ {cancelled} message(s) programmé(s) annulé(s)")
         await event.respond("🗑️ **Toutes les prédictions Excel ont été effacées**\n\nVous pouvez maintenant importer un nouveau fichier Excel.")
         print("✅ Prédictions Excel effacées par l'admin")
 
@@ -883,6 +1220,473 @@ async def excel_clear(event):
         print(f"Erreur dans excel_clear: {e}")
         await event.respond(f"❌ Erreur: {e}")
 
+@client.on(events.NewMessage(pattern=r'/import_mode'))
+async def set_import_mode(event):
+    """Configure le mode d'import des fichiers de prédictions (admin uniquement)"""
+    global import_mode
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        if len(message_parts) < 2 or message_parts[1].lower() not in IMPORT_MODES:
+            await event.respond(f"""📥 **Mode d'import des fichiers**
+
+**Usage**: `/import_mode [diff|remplacement|fusion]`
+
+**Mode actuel**: {import_mode}
+
+• `diff` - Applique seulement les lignes ajoutées/retirées/modifiées, conserve l'état des prédictions lancées
+• `remplacement` - Remplace toutes les prédictions (backup automatique)
+• `fusion` - Ajoute les lignes aux prédictions existantes""")
+            return
+
+        import_mode = message_parts[1].lower()
+        save_config()
+        await event.respond(f"✅ **Mode d'import**: {import_mode}\n💾 Configuration sauvegardée automatiquement")
+        print(f"✅ Mode d'import mis à jour: {import_mode}")
+
+    except Exception as e:
+        print(f"Erreur dans set_import_mode: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/import_sheets'))
+async def set_import_sheets(event):
+    """Active/désactive l'import de toutes les feuilles d'un classeur (admin uniquement)"""
+    global import_all_sheets
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        if len(message_parts) < 2 or message_parts[1].lower() not in ('on', 'off'):
+            await event.respond(f"""📑 **Import multi-feuilles**
+
+**Usage**: `/import_sheets [on|off]`
+
+**Actuel**: {'on - toutes les feuilles' if import_all_sheets else 'off - feuille active uniquement'}
+
+Avec `on`, chaque feuille est analysée dans un processus séparé et les lignes sont fusionnées dans l'ordre des feuilles.""")
+            return
+
+        import_all_sheets = message_parts[1].lower() == 'on'
+        save_config()
+        await event.respond(f"✅ **Import multi-feuilles**: {'on' if import_all_sheets else 'off'}\n💾 Configuration sauvegardée automatiquement")
+
+    except Exception as e:
+        print(f"Erreur dans set_import_sheets: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+def format_histogram(histogram: dict, unit: str = "s") -> str:
+    if not histogram['count']:
+        return "aucune mesure"
+    previous, parts = 0, []
+    for bound, cumulative in histogram['buckets'].items():
+        if cumulative - previous:
+            parts.append(f"≤{bound}{unit if bound != '+Inf' else ''}: {cumulative - previous}")
+        previous = cumulative
+    return f"n={histogram['count']} | moy {histogram['mean']}{unit} | max {histogram['max']}{unit}\n   " + " · ".join(parts)
+
+@client.on(events.NewMessage(pattern=r'/slo'))
+async def show_launch_slo(event):
+    """Latences de lancement, avance effective et dépassements du SLO (admin uniquement)"""
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        if len(message_parts) >= 2:
+            if message_parts[1].lower() == 'reset':
+                launch_slo.reset()
+            elif message_parts[1].isdigit() and 0 < int(message_parts[1]) <= 1800:
+                launch_slo.slo_seconds = float(message_parts[1])
+            else:
+                await event.respond("**Usage**: `/slo [secondes|reset]`")
+                return
+
+        report = launch_slo.get_report()
+        recent = "\n".join(
+            f"• 🔵{entry['numero']} ({entry['trigger']}): {entry['lead']:.0f}s {'⚠️' if entry['breached'] else '✅'}"
+            for entry in reversed(report['recent'])
+        ) or "Aucun"
+        await event.respond(f"""⏱️ **SLO de lancement** (objectif: publiée ≥ {report['slo_seconds']:.0f}s avant le résultat)
+
+**Dépassements**: {report['breaches']} / {report['settled']} ({report['breach_rate']}%)
+**En attente du résultat**: {report['launches_pending_result']} | **Résultat jamais reçu**: {report['missed']}
+
+📨 **Latence de traitement** (message stats → envoi):
+   {format_histogram(report['handler_latency'])}
+📤 **Latence d'envoi**:
+   {format_histogram(report['send_latency'])}
+🎯 **Avance effective** (envoi → résultat):
+   {format_histogram(report['lead'])}
+
+**Derniers lancements**:
+{recent}""")
+
+    except Exception as e:
+        print(f"Erreur dans show_launch_slo: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/avance'))
+async def set_launch_target_lead(event):
+    """Avance visée pour le lancement par numéro + cadence et avances observées (admin uniquement)"""
+    global launch_target_lead
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        if len(message_parts) >= 2:
+            if message_parts[1].lower() == "off":
+                launch_target_lead = None
+                save_config()
+            elif not message_parts[1].isdigit() or not 10 <= int(message_parts[1]) <= 1800:
+                await event.respond("❌ **Avance invalide**: nombre de secondes entre 10 et 1800, ou `off`")
+                return
+            else:
+                launch_target_lead = int(message_parts[1])
+                save_config()
+
+        status = game_cadence.get_status(launch_target_lead)
+        percentiles = status['percentiles']
+        leads = status['leads']
+        cadence = (f"{status['seconds_per_game']} s/partie (EWMA) | p10 {percentiles['p10']} s | p50 {percentiles['p50']} s | p90 {percentiles['p90']} s"
+                   if status['seconds_per_game'] else f"inconnue ({status['samples']} échantillon(s)) - fenêtre par défaut")
+        observed = (f"{leads['count']} lancement(s) | p10 {leads['p10']} s | p50 {leads['p50']} s | min {leads['min']} s | {leads['below_target']} sous la cible"
+                    if leads['count'] else "aucune mesure")
+        target = f"{launch_target_lead}s" if launch_target_lead else "désactivée (fenêtre fixe de 4 parties)"
+
+        await event.respond(f"""🎯 **Avance de lancement**
+
+**Usage**: `/avance [secondes|off]`
+
+**Avance visée**: {target}
+**Fenêtre actuelle**: {status['tolerance']} partie(s) avant le numéro prédit
+**Cadence de la table**: {cadence}
+**Avances observées**: {observed}
+
+Avec une avance visée, la fenêtre est recalculée à chaque partie d'après les parties rapides (p10) pour la tenir.""")
+
+    except Exception as e:
+        print(f"Erreur dans set_launch_target_lead: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/envoi_programme'))
+async def set_scheduled_sends(event):
+    """Active/désactive le dépôt des lancements en messages programmés Telegram (admin uniquement)"""
+    global scheduled_sends_mode
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        if len(message_parts) < 2 or message_parts[1].lower() not in ('on', 'off'):
+            status = scheduled_sends.get_status()
+            cadence = game_cadence.get_status()
+            availability = "✅ disponible" if status['available'] else f"❌ refusé par Telegram ({status['disabled_reason']})"
+            next_send = f"{status['next_key']} à {status['next_at']}" if status['next_key'] else "Aucun"
+            await event.respond(f"""🗓️ **Envois programmés**
+
+**Usage**: `/envoi_programme [on|off]`
+
+**Actuel**: {'on' if scheduled_sends_mode else 'off'} - {availability}
+**En attente chez Telegram**: {status['pending']} (prochain: {next_send})
+**Déposés / reportés / annulés / publiés**: {status['submitted']} / {status['rescheduled']} / {status['cancelled']} / {status['delivered']}
+**Cadence mesurée**: {f"{cadence['seconds_per_game']} s/partie" if cadence['seconds_per_game'] else 'inconnue'} ({cadence['samples']} échantillon(s))
+
+Avec `on`, chaque prédiction des 2 prochaines heures est déposée à l'avance comme message programmé (date_heure - intervalle, corrigée par la cadence). Le lancement par numéro reste actif en secours. Les comptes bot ne peuvent pas programmer de messages: le mode est alors refusé.""")
+            return
+
+        if message_parts[1].lower() == 'on' and not scheduled_sends.available:
+            await event.respond(f"❌ **Envois programmés indisponibles pour ce compte** ({scheduled_sends.disabled_reason})\n🔁 Le lancement réactif reste actif")
+            return
+
+        scheduled_sends_mode = message_parts[1].lower() == 'on'
+        save_config()
+        if scheduled_sends_mode:
+            await sync_scheduled_sends(force=True)
+        else:
+            await scheduled_sends.cancel_all(client, display_target())
+
+        status = scheduled_sends.get_status()
+        if scheduled_sends_mode and not status['available']:
+            await event.respond(f"⚠️ **Envois programmés refusés par Telegram** ({status['disabled_reason']})\n🔁 Lancement réactif uniquement")
+        else:
+            await event.respond(f"✅ **Envois programmés**: {'on' if scheduled_sends_mode else 'off'} ({status['pending']} en attente)\n💾 Configuration sauvegardée automatiquement")
+
+    except Exception as e:
+        print(f"Erreur dans set_scheduled_sends: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/import_batch'))
+async def manage_import_batch(event):
+    """Lot de fichiers importés ensemble, analysés en parallèle (admin uniquement)"""
+    global import_batch
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        action = message_parts[1].lower() if len(message_parts) > 1 else None
+
+        if action == 'annuler':
+            count = len(import_batch or [])
+            import_batch = None
+            await event.respond(f"🗑️ Lot annulé ({count} fichier(s) ignoré(s))")
+            return
+
+        if action == 'valider':
+            if not import_batch:
+                await event.respond("ℹ️ Aucun fichier dans le lot. Utilisez `/import_batch` puis envoyez vos fichiers.")
+                return
+            files, import_batch = import_batch, None
+            await event.respond(f"⚙️ **Analyse de {len(files)} fichier(s) en parallèle...**")
+            try:
+                rows, sheet_count = await import_workers.parse_uploads(files, import_all_sheets)
+            except Exception as e:
+                await event.respond(f"❌ **Erreur lors de l'import**: {e}")
+                print(f"❌ Erreur import par lot: {e}")
+                return
+            await event.respond(f"📑 {len(files)} fichier(s), {sheet_count} feuille(s), {len(rows)} ligne(s) fusionnées")
+            await apply_import(event, rows)
+            return
+
+        if import_batch is None:
+            import_batch = []
+        await event.respond(f"""📦 **Import par lot ouvert** ({len(import_batch)} fichier(s))
+
+Envoyez vos fichiers (.xlsx, .xls, .csv, .ods) puis:
+• `/import_batch valider` - Analyse en parallèle et import en une fois (mode {import_mode})
+• `/import_batch annuler` - Abandonner le lot""")
+
+    except Exception as e:
+        print(f"Erreur dans manage_import_batch: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/backups'))
+async def list_backups(event):
+    """Liste les sauvegardes de prédictions disponibles (admin uniquement)"""
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        store = excel_manager.backup_store
+        backups = await asyncio.to_thread(store.list_backups)
+        stats = store.get_stats()
+
+        msg = f"""💾 **Sauvegardes des prédictions**
+
+📁 Dossier: `{store.backup_dir}`
+• Nombre: {stats['count']} (max {store.max_count})
+• Taille totale: {stats['total_bytes'] / 1024:.1f} KB
+• Compression: {stats['compression']}
+"""
+        for i, backup in enumerate(backups[:15]):
+            msg += f"\n{i+1}. `{backup['name']}` - {backup['created'].strftime('%d/%m %H:%M:%S')} ({backup['size'] / 1024:.1f} KB)"
+
+        if not backups:
+            msg += "\nℹ️ Aucune sauvegarde"
+        else:
+            msg += "\n\n♻️ **Restaurer**: `/restore_backup [numéro ou nom]`"
+
+        await event.respond(msg)
+
+    except Exception as e:
+        print(f"Erreur dans list_backups: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/restore_backup'))
+async def restore_backup(event):
+    """Restaure une sauvegarde de prédictions (admin uniquement)"""
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        if len(message_parts) < 2:
+            await event.respond("**Usage**: `/restore_backup [numéro ou nom]`\n\nUtilisez `/backups` pour voir la liste.")
+            return
+
+        name = excel_manager.backup_store.resolve(message_parts[1])
+        if not name:
+            await event.respond("❌ Sauvegarde introuvable. Utilisez `/backups` pour voir la liste.")
+            return
+
+        result = excel_manager.restore_backup(name)
+        if result["success"]:
+            rebuild_launch_schedule()
+            stats = excel_manager.get_stats()
+            await event.respond(f"""♻️ **Sauvegarde restaurée**
+
+📁 `{name}`
+• Jours restaurés: {', '.join(result['days']) or 'aucun'}
+• Prédictions avant (ces jours): {result['old_count']}
+• Prédictions restaurées: {result['total']}
+• En attente: {stats['pending']}
+• Lancées: {stats['launched']}
+
+💾 L'état précédent a été sauvegardé automatiquement""")
+        else:
+            await event.respond(f"❌ **Erreur de restauration**: {result['error']}")
+
+    except Exception as e:
+        print(f"Erreur dans restore_backup: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/pipeline'))
+async def show_pipeline(event):
+    """Affiche les métriques des files de traitement par canal (admin uniquement)"""
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        metrics = stats_pipeline.get_metrics()
+        msg = "🧵 **Pipelines de traitement**\n"
+        for channel_id, m in metrics.items():
+            msg += f"""
+📡 **Canal {channel_id}**
+• File: {m['depth']}/{m['capacity']} (max {m['max_depth']})
+• Traités: {m['processed']} (erreurs: {m['errors']})
+• Attente: moy {m['avg_wait_ms']} ms / max {m['max_wait_ms']} ms
+• Traitement moyen: {m['avg_processing_ms']} ms
+• Saturations (backpressure): {m['backpressure_waits']}
+"""
+        if not metrics:
+            msg += "\nℹ️ Aucun message du canal stats traité pour l'instant"
+
+        await event.respond(msg)
+
+    except Exception as e:
+        print(f"Erreur dans show_pipeline: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/resultats'))
+async def show_results(event):
+    """Affiche les derniers résultats archivés et la répartition du jour (admin uniquement)"""
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        parts = event.message.message.split()
+        count = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 10
+        count = min(max(count, 1), 50)
+
+        results = results_archive.last(count)
+        if not results:
+            await event.respond("📭 Aucun résultat archivé pour l'instant")
+            return
+
+        today = datetime.now().date()
+        counts = results_archive.winner_counts(start=today, end=today)
+        stats = results_archive.get_stats()
+
+        msg = f"🗄️ **Derniers résultats archivés** ({len(results)})\n\n"
+        for r in results:
+            joueur = "?" if r["joueur"] is None else r["joueur"]
+            banquier = "?" if r["banquier"] is None else r["banquier"]
+            msg += f"#{r['numero']} {r['timestamp'].strftime('%d/%m %H:%M')} • J {joueur} - B {banquier} → {r['winner']}\n"
+        msg += f"""
+📊 **Aujourd'hui**: Joueur {counts['joueur']} | Banquier {counts['banquier']} | Nul {counts['nul']} | Inconnu {counts['inconnu']}
+💾 **Archive**: {stats['games']} parties sur {stats['days']} jour(s), {stats['total_bytes'] / 1024:.1f} KB"""
+
+        await event.respond(msg)
+
+    except Exception as e:
+        print(f"Erreur dans show_results: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/maintenance'))
+async def show_maintenance(event):
+    """État des tâches de maintenance; `run` les rend toutes échues (admin uniquement)"""
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        message_parts = event.message.message.split()
+        if len(message_parts) >= 2:
+            if message_parts[1].lower() != 'run':
+                await event.respond("**Usage**: `/maintenance [run]`")
+                return
+            maintenance.run_now()
+
+        status = maintenance.get_status()
+        jobs = "\n".join(
+            f"• `{name}` (toutes les {job['interval_hours']:g} h): {job['last_run'] or 'jamais'}"
+            f"{' ⏳ échue' if job['due'] else ''}{' ⏸️ ' + str(job['interrupted']) + ' interruption(s)' if job['interrupted'] else ''}"
+            f"\n   → {job['last_error'] or job['last_result']}"
+            for name, job in status['jobs'].items()
+        )
+        waiting = f"⏳ En attente: {status['waiting_for']}" if status['waiting_for'] else "✅ Période calme"
+        await event.respond(f"""🧹 **Maintenance** {'(en cours: ' + status['current_job'] + ')' if status['current_job'] else ''}
+
+{waiting}
+**Passages reportés**: {status['deferred']}
+
+{jobs}""")
+
+    except Exception as e:
+        print(f"Erreur dans show_maintenance: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+@client.on(events.NewMessage(pattern=r'/memoire'))
+async def memory_command(event):
+    """Diagnostic mémoire tracemalloc à la demande (admin uniquement)"""
+    try:
+        if event.sender_id != ADMIN_ID:
+            return
+
+        parts = event.message.message.split()
+        action = parts[1].lower() if len(parts) > 1 else "rapport"
+
+        if action == "start":
+            memory_tracker.start()
+            await event.respond("🧠 **Traçage mémoire activé**\n\nRéférence prise. Utilisez `/memoire` pour voir la croissance, `/memoire stop` pour arrêter.")
+            return
+        if action == "stop":
+            memory_tracker.stop()
+            await event.respond("🧠 Traçage mémoire désactivé")
+            return
+        if action == "reset":
+            if not memory_tracker.tracing:
+                await event.respond("ℹ️ Traçage inactif. Utilisez `/memoire start`.")
+                return
+            memory_tracker.reset_baseline()
+            await event.respond("🧠 Nouvelle référence mémoire prise")
+            return
+        if action == "export":
+            result = memory_tracker.export()
+            if result["success"]:
+                await event.respond(f"💾 **Export mémoire** ({result['size'] / 1024:.1f} KB)\n" + "\n".join(f"• `{path}`" for path in result["files"]))
+            else:
+                await event.respond(f"❌ Erreur export: {result['error']}")
+            return
+
+        report = memory_tracker.report(top=5)
+        rss = report["rss_bytes"]
+        msg = f"🧠 **Mémoire** (RSS: {rss / 1024 / 1024:.1f} MB)\n" if rss else "🧠 **Mémoire**\n"
+        msg += "\n📦 **Structures**:\n"
+        for name, value in report["structures"].items():
+            delta = f" ({value['delta']:+d})" if value["delta"] else ""
+            msg += f"• {name}: {value['size']}{delta}\n"
+
+        if not report["tracing"]:
+            msg += "\nℹ️ Traçage inactif (aucun surcoût). `/memoire start` pour suivre les allocations."
+        else:
+            msg += f"\n📈 **Tracé**: {report['traced_bytes'] / 1024:.0f} KB (pic {report['peak_bytes'] / 1024:.0f} KB)\n"
+            msg += "\n🔺 **Croissance depuis la référence**:\n"
+            for stat in report.get("growth", []):
+                msg += f"• `{os.path.basename(stat['site'])}` +{stat['size_diff'] / 1024:.1f} KB ({stat['count_diff']:+d} objets)\n"
+            msg += "\n🏷️ **Principaux sites d'allocation**:\n"
+            for stat in report["top_sites"]:
+                msg += f"• `{os.path.basename(stat['site'])}` {stat['size'] / 1024:.1f} KB ({stat['count']} objets)\n"
+
+        await event.respond(msg)
+
+    except Exception as e:
+        print(f"Erreur dans memory_command: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
 @client.on(events.NewMessage(pattern='/deploy'))
 async def generate_deploy_package(event):
     """Génère le package de déploiement Replit complet et prêt à déployer (admin uniquement)"""
@@ -900,26 +1704,18 @@ async def generate_deploy_package(event):
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             package_name = f'deploy_render_{timestamp}.zip'
 
-            with zipfile.ZipFile(package_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # 1. Fichiers Python essentiels du projet
-                python_files = [
-                    'main.py',
-                    'predictor.py',
-                    'yaml_manager.py',
-                    'excel_importer.py'
-                ]
-
-                for file_path in python_files:
-                    if os.path.exists(file_path):
-                        zipf.write(file_path)
-                        print(f"  ✅ Ajouté: {file_path}")
-
-                # 2. Créer bot_config.json avec la configuration ACTUELLE
-                config_data = {
-                    'stat_channel': detected_stat_channel,
-                    'display_channel': detected_display_channel,
-                    'prediction_interval': prediction_interval
-                }
+            with DeployPackage() as zipf:
+                # 1. Fichiers Python du projet (tous les modules, sauf les outils hors ligne)
+                source_dir = os.path.dirname(os.path.abspath(__file__))
+                python_files = sorted(name for name in os.listdir(source_dir)
+                                      if name.endswith('.py') and name not in DEPLOY_OFFLINE_TOOLS)
+
+                for file_name in python_files:
+                    zipf.write(os.path.join(source_dir, file_name), arcname=file_name)
+                    print(f"  ✅ Ajouté: {file_name}")
+
+                # 2. Créer bot_config.json avec la configuration ACTUELLE (même contenu que save_config)
+                config_data = current_config()
                 zipf.writestr('bot_config.json', json.dumps(config_data, indent=2))
                 print(f"  ✅ Créé: bot_config.json (Stats: {detected_stat_channel}, Display: {detected_display_channel})")
 
@@ -1029,7 +1825,25 @@ Ce package contient **TOUS** les fichiers nécessaires pour déployer le bot sur
 - `main.py` - Bot principal avec toutes les fonctionnalités
 - `predictor.py` - Moteur de prédiction Excel
 - `yaml_manager.py` - Gestionnaire de données YAML
+- `message_log.py` - Journal segmenté des messages traités
 - `excel_importer.py` - Import et gestion Excel
+- `import_worker.py` - Processus d'analyse des fichiers importés
+- `import_cache.py` - Cache des fichiers déjà importés
+- `backup_store.py` - Sauvegardes compressées et rotatives
+- `launch_scheduler.py` - Lancements planifiés selon Date & Heure
+- `game_cadence.py` - Cadence mesurée des parties du canal stats
+- `scheduled_sends.py` - Lancements déposés en messages programmés (/envoi_programme)
+- `launch_slo.py` - Latences de lancement et SLO d'avance (/slo)
+- `message_tracker.py` - Suivi des messages édités du canal stats
+- `channel_pipeline.py` - File de traitement séquentielle par canal
+- `catchup.py` - Rattrapage des messages manqués après une coupure
+- `event_stream.py` - Flux d'événements en direct (/events)
+- `results_archive.py` - Archive des résultats par jour (/resultats)
+- `prediction_stats.py` - Taux de réussite glissants des prédictions Excel
+- `memory_tracker.py` - Diagnostic mémoire à la demande (/memoire)
+- `loop_monitor.py` - Retard de la boucle et appels bloquants (/loop)
+- `maintenance.py` - Nettoyage et compaction en période calme (/maintenance)
+- `deploy_builder.py` - Construction du package /deploy avec cache de compression
 
 ### Configuration (✅ Auto-configurée)
 - `.replit` - Configuration Replit
@@ -1093,7 +1907,7 @@ Si vous voulez changer les canaux après déploiement:
 ## 🔧 Fonctionnalités Déployées
 
 ### ✅ Prédictions Excel Automatiques
-- Import fichiers Excel (.xlsx)
+- Import fichiers Excel (.xlsx), CSV (.csv) et ODS (.ods)
 - Surveillance du canal source
 - Lancement anticipé (tolérance 0-4 parties)
 - **Filtrage automatique des numéros consécutifs**
@@ -1164,36 +1978,6 @@ Si vous voulez changer les canaux après déploiement:
                 zipf.writestr('data/.gitkeep', '# Dossier pour fichiers YAML\n# Créé automatiquement par le bot\n')
                 print("  ✅ Créé: data/.gitkeep")
 
-                # 10. Créer render_main.py optimisé pour Render.com
-                render_main_content = f'''#!/usr/bin/env python3
-"""
-Bot Telegram - Version Render.com
-Port: 10000 (configuré automatiquement)
-Auto-configuration des canaux depuis bot_config.json
-"""
-import os
-import sys
-
-# Forcer le port 10000 pour Render.com
-os.environ['PORT'] = '10000'
-
-# Charger les variables depuis Render (si définies)
-if not os.getenv('API_ID'):
-    print("⚠️ Variables d'environnement manquantes sur Render!")
-    print("Configurez: API_ID, API_HASH, BOT_TOKEN, ADMIN_ID")
-    sys.exit(1)
-
-# Lancer le bot principal
-print("🚀 Démarrage sur Render.com (Port 10000)...")
-from main import main
-import asyncio
-
-if __name__ == "__main__":
-    asyncio.run(main())
-'''
-                zipf.writestr('render_main.py', render_main_content)
-                print("  ✅ Créé: render_main.py (Port 10000)")
-
                 # 11. Procfile pour Render.com
                 procfile_content = "web: python render_main.py"
                 zipf.writestr('Procfile', procfile_content)
@@ -1216,13 +2000,37 @@ if __name__ == "__main__":
                 zipf.writestr('render.yaml', render_yaml_content)
                 print("  ✅ Créé: render.yaml")
 
-            file_size = os.path.getsize(package_name) / 1024
+            # Compression (membres modifiés uniquement) et écriture dans un thread
+            package_bytes = await asyncio.to_thread(deploy_builder.build, zipf)
+            await asyncio.to_thread(deploy_builder.keep_latest, package_name, package_bytes)
+            build_info = deploy_builder.last_build
+            file_size = len(package_bytes) / 1024
 
             # Recharger les valeurs depuis config_data pour garantir l'exactitude
             config_stats = config_data.get('stat_channel', 'Non configuré')
             config_display = config_data.get('display_channel', 'Non configuré')
             config_interval = config_data.get('prediction_interval', 1)
             
+            # Contenu réel du package (manifeste du builder), descriptions pour les fichiers connus
+            deploy_descriptions = {
+                'render_main.py': "Entry point Render (Port 10000) 🆕",
+                'render.yaml': "Config déploiement auto 🆕",
+                'Procfile': "Commande de démarrage",
+                'requirements.txt': "Dépendances",
+                'bot_config.json': "**Configuration pré-enregistrée** 🆕",
+                '.env.example': "Template variables",
+                '.gitignore': "Sécurité",
+                'README.md': "Guide complet",
+                'data/.gitkeep': "Structure dossiers"
+            }
+            manifest = build_info['manifest']
+            source_files = [name for name, _ in manifest if name.endswith('.py') and name != 'render_main.py']
+            content_lines = "\n".join(
+                [f"✅ Code source complet ({len(source_files)} fichiers Python)"] +
+                [f"✅ {name} - {deploy_descriptions[name]}" if name in deploy_descriptions else f"✅ {name}"
+                 for name, _ in manifest if name not in source_files]
+            )
+
             canal_stats_info = f"• Canal Stats: {config_stats} ✅" if config_stats and config_stats != 'Non configuré' else "• Canal Stats: À configurer ⚠️"
             canal_display_info = f"• Canal Display: {config_display} ✅" if config_display and config_display != 'Non configuré' else "• Canal Display: À configurer ⚠️"
 
@@ -1230,6 +2038,7 @@ if __name__ == "__main__":
 
 📦 **Fichier:** {package_name} ({file_size:.1f} KB)
 🕐 **Généré:** {timestamp}
+♻️ **Compression:** {build_info['recompressed']} fichier(s) recompressé(s), {build_info['reused']} depuis le cache
 
 **Package optimisé pour Render.com:**
 • Nom unique: deploy_render_{timestamp}.zip
@@ -1237,17 +2046,8 @@ if __name__ == "__main__":
 • render_main.py: Entry point optimisé
 • render.yaml: Configuration déploiement auto
 
-📋 **Contenu (13 fichiers):**
-✅ Code source complet (4 fichiers Python)
-✅ render_main.py - Entry point Render (Port 10000) 🆕
-✅ render.yaml - Config déploiement auto 🆕
-✅ Procfile - Commande de démarrage
-✅ requirements.txt - Dépendances
-✅ bot_config.json - **Configuration pré-enregistrée** 🆕
-✅ .env.example - Template variables
-✅ .gitignore - Sécurité
-✅ README.md - Guide complet
-✅ data/ - Structure dossiers
+📋 **Contenu ({len(manifest)} fichiers):**
+{content_lines}
 
 🔧 **Configuration Automatique:**
 {canal_stats_info}
@@ -1279,10 +2079,12 @@ Le bot utilise `bot_config.json` au démarrage - **aucune configuration manuelle
 
 Le package est 100% prêt avec auto-configuration! 🎉""")
 
-            # Envoyer le fichier avec les valeurs réelles du config_data
+            # Envoyer le fichier depuis la mémoire avec les valeurs réelles du config_data
+            package_file = io.BytesIO(package_bytes)
+            package_file.name = package_name
             await client.send_file(
                 event.chat_id,
-                package_name,
+                package_file,
                 caption=f"📦 **Render.com {timestamp}** | Port: 10000 | Stats: {config_stats} | Display: {config_display} | {file_size:.1f} KB"
             )
 
@@ -1295,6 +2097,88 @@ Le package est 100% prêt avec auto-configuration! 🎉""")
     except Exception as e:
         print(f"Erreur /deploy: {e}")
 
+async def apply_import(event, rows: list, content_hash: str = None):
+    """Applique les lignes analysées selon le mode d'import et envoie le rapport à l'admin"""
+    # MODE DIFF par défaut : n'applique que les lignes modifiées (état des prédictions lancées conservé)
+    if import_mode == 'diff':
+        result = excel_manager.import_diff(None, rows=rows)
+    else:
+        result = excel_manager.import_excel(None, replace_mode=(import_mode == 'remplacement'), rows=rows)
+
+    if result["success"]:
+        if content_hash:
+            import_cache.mark_imported(content_hash)
+        rebuild_launch_schedule()
+
+    if result["success"] and result.get('mode') == 'diff':
+        await event.respond(format_diff_report(result))
+        print(f"✅ Import Excel (diff) réussi: {len(result['diff']['added'])} ajoutées, {len(result['diff']['removed'])} retirées, {len(result['diff']['changed'])} modifiées")
+    elif result["success"]:
+        stats = excel_manager.get_stats()
+        consecutive_info = f"\n• Numéros consécutifs ignorés: {result.get('consecutive_skipped', 0)}" if result.get('consecutive_skipped', 0) > 0 else ""
+        invalid_info = f"\n• Lignes invalides ignorées: {result.get('invalid', 0)}" if result.get('invalid', 0) > 0 else ""
+
+        # Information sur le mode d'import
+        mode_info = ""
+        if result.get('mode') == 'remplacement':
+            old_count = result.get('old_count', 0)
+            if old_count > 0:
+                mode_info = f"\n🔄 **Mode**: Remplacement automatique ({old_count} anciennes prédictions remplacées)\n💾 **Backup**: Ancien fichier sauvegardé automatiquement"
+            else:
+                mode_info = "\n🆕 **Mode**: Première importation"
+
+        msg = f"""✅ **Import Excel réussi!**
+
+📊 **Résumé**:
+• Prédictions importées: {result['imported']}
+• Prédictions ignorées (déjà lancées): {result['skipped']}{consecutive_info}{invalid_info}
+• Total en base: {stats['total']}{mode_info}
+
+📋 **Statistiques**:
+• En attente: {stats['pending']}
+• Lancées: {stats['launched']}
+
+⚠️ **Note**: Les numéros consécutifs (ex: 23→24) sont automatiquement filtrés pour éviter les doublons.
+
+Le système surveillera maintenant le canal source et lancera les prédictions automatiquement quand les numéros seront proches."""
+        await event.respond(msg)
+        print(f"✅ Import Excel réussi: {result['imported']} prédictions importées, {result.get('consecutive_skipped', 0)} consécutifs ignorés")
+    else:
+        await event.respond(f"❌ **Erreur lors de l'import**: {result['error']}")
+        print(f"❌ Erreur import Excel: {result['error']}")
+
+def format_diff_report(result: dict) -> str:
+    """Construit le rapport d'un import diff pour l'admin"""
+    diff = result['diff']
+    stats = excel_manager.get_stats()
+
+    def preview(keys):
+        numeros = [str(excel_manager.predictions[k]['numero']) if k in excel_manager.predictions else k for k in keys[:10]]
+        suffix = f" … (+{len(keys) - 10})" if len(keys) > 10 else ""
+        return f": {', '.join(numeros)}{suffix}" if numeros else ""
+
+    if not result.get('has_changes'):
+        header = "ℹ️ **Fichier identique au stock actuel** - aucune modification appliquée"
+    else:
+        header = "✅ **Import Excel (diff) réussi!**"
+
+    consecutive_info = f"\n• Numéros consécutifs ignorés: {result['consecutive_skipped']}" if result.get('consecutive_skipped', 0) > 0 else ""
+    invalid_info = f"\n• Lignes invalides ignorées: {result['invalid']}" if result.get('invalid', 0) > 0 else ""
+
+    return f"""{header}
+
+🧮 **Différences**:
+• ➕ Ajoutées: {len(diff['added'])}{preview(diff['added'])}
+• ➖ Retirées: {len(diff['removed'])}{preview(diff['removed'])}
+• ✏️ Modifiées: {len(diff['changed'])}{preview(diff['changed'])}
+• 🔒 Conservées (déjà lancées): {len(diff['protected'])}{preview(diff['protected'])}
+• = Inchangées: {len(diff['unchanged'])}{consecutive_info}{invalid_info}
+
+📋 **Statistiques**:
+• Total en base: {stats['total']}
+• En attente: {stats['pending']}
+• Lancées: {stats['launched']}"""
+
 # --- TRAITEMENT DES MESSAGES DU CANAL DE STATISTIQUES ---
 @client.on(events.NewMessage())
 @client.on(events.MessageEdited())
@@ -1307,51 +2191,55 @@ async def handle_messages(event):
         
         if event.message.media and event.message.file:
             file_name = event.message.file.name
-            if file_name and (file_name.endswith('.xlsx') or file_name.endswith('.xls')):
+            if is_supported_file(file_name):
                 # Allow only admin or bot itself to import Excel files
                 if event.sender_id != ADMIN_ID and event.sender_id != me_id:
                     print(f"⚠️ Fichier Excel refusé de {event.sender_id} (ni admin ni bot)")
                     return
-                await event.respond("📥 **Téléchargement du fichier Excel...**")
-                file_path = await event.message.download_media()
-                await event.respond("⚙️ **Importation des prédictions...**")
-
-                # MODE REMPLACEMENT AUTOMATIQUE : remplace toutes les anciennes prédictions
-                result = excel_manager.import_excel(file_path, replace_mode=True)
-                os.remove(file_path)
-
-                if result["success"]:
-                    stats = excel_manager.get_stats()
-                    consecutive_info = f"\n• Numéros consécutifs ignorés: {result.get('consecutive_skipped', 0)}" if result.get('consecutive_skipped', 0) > 0 else ""
-                    
-                    # Information sur le mode d'import
-                    mode_info = ""
-                    if result.get('mode') == 'remplacement':
-                        old_count = result.get('old_count', 0)
-                        if old_count > 0:
-                            mode_info = f"\n🔄 **Mode**: Remplacement automatique ({old_count} anciennes prédictions remplacées)\n💾 **Backup**: Ancien fichier sauvegardé automatiquement"
-                        else:
-                            mode_info = "\n🆕 **Mode**: Première importation"
-                    
-                    msg = f"""✅ **Import Excel réussi!**
-
-📊 **Résumé**:
-• Prédictions importées: {result['imported']}
-• Prédictions ignorées (déjà lancées): {result['skipped']}{consecutive_info}
-• Total en base: {stats['total']}{mode_info}
-
-📋 **Statistiques**:
-• En attente: {stats['pending']}
-• Lancées: {stats['launched']}
-
-⚠️ **Note**: Les numéros consécutifs (ex: 23→24) sont automatiquement filtrés pour éviter les doublons.
+                # LOT EN COURS (/import_batch): le fichier est mis de côté jusqu'à validation
+                if import_batch is not None:
+                    file_bytes = await event.message.download_media(file=bytes)
+                    import_batch.append((file_name, file_bytes))
+                    await event.respond(f"📥 **Ajouté au lot**: {file_name} ({len(import_batch)} fichier(s))\n`/import_batch valider` pour tout importer")
+                    return
 
-Le système surveillera maintenant le canal source et lancera les prédictions automatiquement quand les numéros seront proches."""
-                    await event.respond(msg)
-                    print(f"✅ Import Excel réussi: {result['imported']} prédictions importées, {result.get('consecutive_skipped', 0)} consécutifs ignorés")
-                else:
-                    await event.respond(f"❌ **Erreur lors de l'import**: {result['error']}")
-                    print(f"❌ Erreur import Excel: {result['error']}")
+                # CACHE D'IMPORT: document Telegram déjà vu → pas de téléchargement ni d'analyse
+                # (entrées distinctes quand toutes les feuilles sont importées)
+                cache_suffix = "-sheets" if import_all_sheets else ""
+                file_key = import_cache.telegram_file_key(event.message)
+                if file_key:
+                    file_key += cache_suffix
+                content_hash = import_cache.lookup_file_key(file_key)
+                rows = import_cache.get_rows(content_hash) if content_hash else None
+                from_cache = rows is not None
+
+                if rows is None:
+                    await event.respond("📥 **Téléchargement du fichier Excel...**")
+                    file_bytes = await event.message.download_media(file=bytes)
+                    content_hash = import_cache.hash_bytes(file_bytes) + cache_suffix
+                    rows = import_cache.get_rows(content_hash)
+                    from_cache = rows is not None
+
+                    if rows is None:
+                        await event.respond("⚙️ **Importation des prédictions...**")
+                        try:
+                            rows, sheet_count = await import_workers.parse_uploads([(file_name, file_bytes)], import_all_sheets)
+                            if import_all_sheets:
+                                await event.respond(f"📑 **{sheet_count} feuille(s) analysée(s)** en parallèle")
+                        except Exception as e:
+                            await event.respond(f"❌ **Erreur lors de l'import**: {e}")
+                            print(f"❌ Erreur import Excel: {e}")
+                            return
+                        import_cache.store(content_hash, rows, file_name, file_key)
+                    else:
+                        import_cache.remember_file_key(file_key, content_hash)
+
+                if from_cache:
+                    already = " (identique au dernier import)" if import_cache.is_last_imported(content_hash) else ""
+                    await event.respond(f"♻️ **Fichier déjà connu{already}** - restauration depuis le cache, sans nouvelle analyse")
+                    print(f"♻️ Import depuis le cache: {content_hash[:12]} ({len(rows)} lignes)")
+
+                await apply_import(event, rows, content_hash)
                 return
 
         # Debug: Log ALL incoming messages first
@@ -1365,6 +2253,11 @@ Le système surveillera maintenant le canal source et lancera les prédictions a
             print(f"⏭️ Message privé admin ignoré (pas une commande)")
             return
 
+        # Lancement programmé publié par Telegram dans le canal d'affichage
+        if channel_id == detected_display_channel and getattr(event.message, 'from_scheduled', False):
+            on_scheduled_delivery(event.message)
+            return
+
         # Filtrer silencieusement les messages hors canal stats
         if channel_id != detected_stat_channel:
             return
@@ -1376,36 +2269,70 @@ Le système surveillera maintenant le canal source et lancera les prédictions a
             print("❌ Message vide ignoré")
             return
 
-        print(f"✅ Message accepté du canal stats {event.chat_id}: {message_text}")
+        # Traitement ordonné: un consommateur unique par canal stats (file bornée)
+        await stats_pipeline.submit(channel_id, event.message)
 
-        # EXCEL MONITORING: Vérifier si un numéro proche est dans les prédictions Excel
-        game_number = predictor.extract_game_number(message_text)
-        if game_number:
-            # Déclenchement quand canal source affiche 0-4 parties AVANT le numéro Excel
-            # Ex: Excel #881, Canal #879 → Lance #881 (écart +2)
-            close_pred = excel_manager.find_close_prediction(game_number, tolerance=4)
-            if close_pred and detected_display_channel:
-                pred_key = close_pred["key"]
-                pred_data = close_pred["prediction"]
-                pred_numero = pred_data["numero"]
-                victoire_type = pred_data["victoire"]
+    except Exception as e:
+        print(f"Erreur dans handle_messages: {e}")
 
-                v_format = excel_manager.get_prediction_format(victoire_type)
-                prediction_text = f"🔵{pred_numero} {v_format}: statut :⏳"
+async def process_stats_message(message, replay: bool = False):
+    """
+    Traite un message du canal stats (appelé séquentiellement par le pipeline du canal).
+    replay=True pendant un rattrapage: les parties sont déjà passées, on vérifie sans lancer.
+    """
+    try:
+        message_text = message.message or ""
+        channel_id = message.chat_id
+        maintenance.activity()
+
+        # SUIVI DES ÉDITIONS: seule la première apparition et le passage au résultat final comptent
+        # Rejoué: jamais de lancement, et une partie encore en cours n'est pas mémorisée (la copie en direct la lancera)
+        run_launch, run_verification = message_tracker.observe(channel_id, message.id, message_text, replay=replay)
+        # Partie en cours (⏰/🕐): le point de reprise reste avant elle jusqu'à son résultat final
+        catchup_state.advance(channel_id, message.id, final=not message_tracker.is_in_progress(message_text))
+        # Résultat final déjà traité avant un redémarrage (journal segmenté des messages): pas de double vérification
+        if run_verification and database and database.is_message_processed(message_text, channel_id):
+            print(f"⏭️ Résultat déjà traité: message {message.id}")
+            run_verification = False
+        if not run_launch and not run_verification:
+            print(f"⏭️ Édition ignorée (inchangée ou partie en cours): message {message.id}")
+            return
 
-                try:
-                    sent_message = await client.send_message(detected_display_channel, prediction_text)
-                    excel_manager.mark_as_launched(pred_key, sent_message.id, detected_display_channel)
+        print(f"✅ Message accepté du canal stats {channel_id}: {message_text}")
 
-                    ecart = pred_numero - game_number
-                    print(f"✅ Prédiction Excel lancée: 🔵{pred_numero} {v_format} | Canal source: #{game_number} (écart: +{ecart} parties)")
-                except Exception as e:
-                    print(f"❌ Erreur envoi prédiction Excel: {e}")
+        # Changement de jour: partitions de prédictions chargées/déchargées, planning horaire à refaire
+        if excel_manager.roll_window():
+            rebuild_launch_schedule()
 
-            # Vérification SÉQUENTIELLE des prédictions Excel lancées
-            await verify_excel_predictions(game_number, message_text)
+        # EXCEL MONITORING: Vérifier si un numéro proche est dans les prédictions Excel
+        game_number = predictor.extract_game_number(message_text)
+        if game_number:
+            # Déclenchement quand canal source affiche 0-N parties AVANT le numéro Excel (N adaptatif, 4 par défaut)
+            # Ex: Excel #881, Canal #879 → Lance #881 (écart +2)
+            if run_launch:
+                lead = game_cadence.observe(game_number, message.date)
+                if lead is not None:
+                    print(f"⏱️ Avance observée #{game_number}: {lead:.0f}s (cible {launch_target_lead or '-'}s)")
+                # Fenêtre fixe, ou calculée pour tenir l'avance visée (/avance) à la cadence actuelle de la table
+                tolerance = game_cadence.tolerance_for(launch_target_lead)
+                close_pred = excel_manager.find_close_prediction(game_number, tolerance=tolerance, exclude=launches_in_progress)
+                if close_pred and detected_display_channel:
+                    await launch_excel_prediction(close_pred["key"], "numéro", game_number, message.date)
+                request_scheduled_sync()
+
+            # Vérification SÉQUENTIELLE des prédictions Excel lancées (résultat final uniquement)
+            if run_verification:
+                results_archive.append(game_number, message_text, message.date)
+                lead = launch_slo.record_result(game_number, message.date)
+                if lead is not None and lead < launch_slo.slo_seconds:
+                    print(f"⚠️ SLO: prédiction #{game_number} publiée {lead:.0f}s avant son résultat (objectif {launch_slo.slo_seconds:.0f}s)")
+                await verify_excel_predictions(game_number, message_text)
+
+        if not run_verification:
+            return
 
         # Check for prediction verification
+        published = True
         verified, number = predictor.verify_prediction(message_text)
         if verified is not None and number is not None:
             statut = predictor.prediction_status.get(number, 'Inconnu')
@@ -1416,11 +2343,13 @@ Le système surveillera maintenant le canal source et lancera les prédictions a
             else:
                 print(f"⚠️ Impossible de mettre à jour le message #{number}, envoi d'un nouveau message")
                 status_text = f"🔵{number} statut :{statut}"
-                await broadcast(status_text)
+                published = bool(await broadcast(status_text))
+        # Résultat marqué traité une fois vérifié et publié: en cas d'échec, un rattrapage le retraitera
+        if database and published:
+            database.mark_message_processed(message_text, channel_id)
 
         # Check for expired predictions on every valid result message
-        game_number = predictor.extract_game_number(message_text)
-        if game_number and not ("⏰" in message_text or "🕐" in message_text):
+        if game_number:
             expired = predictor.check_expired_predictions(game_number)
             for expired_num in expired:
                 # Edit expired prediction messages
@@ -1437,7 +2366,7 @@ Le système surveillera maintenant le canal source et lancera les prédictions a
         # Bilan automatique supprimé sur demande utilisateur
 
     except Exception as e:
-        print(f"Erreur dans handle_messages: {e}")
+        print(f"Erreur dans process_stats_message: {e}")
 
 async def broadcast(message):
     """Broadcast message to display channel"""
@@ -1446,7 +2375,7 @@ async def broadcast(message):
     sent_messages = []
     if detected_display_channel:
         try:
-            sent_message = await client.send_message(detected_display_channel, message)
+            sent_message = await client.send_message(display_target(), message)
             sent_messages.append((detected_display_channel, sent_message.id))
             print(f"Message diffusé: {message}")
         except Exception as e:
@@ -1465,7 +2394,7 @@ async def edit_prediction_message(game_number: int, new_status: str):
             message_id = message_info['message_id']
             # Update format to use 👗
             new_text = f"🔵{game_number} statut :{new_status}"
-            await client.edit_message(chat_id, message_id, new_text)
+            await edit_coalescer.edit(client, chat_id, message_id, new_text)
             print(f"Message de prédiction #{game_number} mis à jour avec statut: {new_status}")
             return True
     except Exception as e:
@@ -1477,16 +2406,62 @@ async def edit_prediction_message(game_number: int, new_status: str):
 # --- ENVOI VERS LES CANAUX ---
 # (Function moved above to handle message editing)
 
+# --- RATTRAPAGE APRÈS COUPURE ---
+async def catch_up_stats_channel(reason: str) -> int:
+    """
+    Rejoue dans l'ordre les messages du canal stats postés pendant une coupure.
+    Le pipeline du canal est suspendu (les messages en direct attendent en file) et
+    les éditions sortantes sont regroupées puis envoyées à rythme limité.
+    """
+    channel_id = detected_stat_channel
+    if not channel_id:
+        return 0
+
+    last_id = catchup_state.get(channel_id)
+    if last_id is None:
+        print(f"ℹ️ Rattrapage ({reason}): aucun message traité connu pour le canal {channel_id}")
+        return 0
+
+    replayed = 0
+    await stats_pipeline.pause(channel_id)
+    edit_coalescer.hold()
+    try:
+        missed = await fetch_missed_messages(client, channel_id, last_id)
+        print(f"🔁 Rattrapage ({reason}) canal {channel_id}: {len(missed)} message(s) après #{last_id}")
+        for message in missed:
+            if message.message and not catchup_state.is_done(channel_id, message.id):
+                await process_stats_message(message, replay=True)
+                replayed += 1
+        catchup_state.flush()
+    except Exception as e:
+        print(f"❌ Erreur rattrapage: {e}")
+    finally:
+        stats_pipeline.resume(channel_id)
+        sent = await edit_coalescer.release(client)
+
+    print(f"✅ Rattrapage terminé: {replayed} message(s) rejoué(s), {sent} édition(s) envoyée(s) ({edit_coalescer.coalesced} fusionnée(s))")
+    return replayed
+
+def start_catch_up(reason: str):
+    """Lance le rattrapage en arrière-plan (un seul à la fois)"""
+    global catchup_task
+    if catchup_task and not catchup_task.done():
+        return
+    catchup_task = asyncio.create_task(catch_up_stats_channel(reason))
+
 # --- GESTION D'ERREURS ET RECONNEXION ---
-async def handle_connection_error():
-    """Handle connection errors and attempt reconnection"""
+async def handle_connection_error() -> bool:
+    """Handle connection errors, attempt reconnection and catch up missed messages"""
     print("Tentative de reconnexion...")
     await asyncio.sleep(5)
     try:
         await client.connect()
         print("Reconnexion réussie")
+        start_catch_up("reconnexion")
+        return True
     except Exception as e:
         print(f"Échec de la reconnexion: {e}")
+        return False
 
 # --- SERVEUR WEB POUR MONITORING ---
 async def health_check(request):
@@ -1500,18 +2475,82 @@ async def bot_status(request):
         "stat_channel": detected_stat_channel,
         "display_channel": detected_display_channel,
         "predictions_active": len(predictor.prediction_status),
-        "total_predictions": len(predictor.status_log)
+        "total_predictions": len(predictor.status_log),
+        "message_tracking": message_tracker.get_stats(),
+        "pipelines": {str(channel_id): metrics for channel_id, metrics in stats_pipeline.get_metrics().items()},
+        "catchup": {"last_ids": catchup_state.last_ids, "edits": edit_coalescer.get_stats()},
+        "live_events": live_events.get_stats(),
+        "results_archive": results_archive.get_stats(),
+        "scheduled_sends": {"mode": scheduled_sends_mode, **scheduled_sends.get_status()},
+        "cadence": game_cadence.get_status(launch_target_lead),
+        "launch_slo": {key: value for key, value in launch_slo.get_report().items() if key != "recent"},
+        "event_loop": loop_monitor.get_report(stacks=False),
+        "maintenance": maintenance.get_status(),
+        "excel_stats": prediction_stats.get_summary()
     }
     return web.json_response(status)
 
-async def create_web_server():
-    """Create and start web server"""
+def build_live_snapshot() -> dict:
+    """Instantané envoyé à chaque nouvel abonné du flux /events (remplace le polling de /status)"""
+    in_flight = [
+        {
+            "numero": pred["numero"],
+            "victoire": pred["victoire"],
+            "current_offset": pred.get("current_offset", 0),
+            "message_id": pred.get("message_id")
+        }
+        for pred in excel_manager.predictions.values()
+        if pred["launched"] and not pred.get("verified") and not pred.get("skipped_consecutive")
+    ]
+    return {
+        "stat_channel": detected_stat_channel,
+        "display_channel": detected_display_channel,
+        "stats": excel_manager.get_stats(),
+        "pending": excel_manager.get_pending_predictions()[:20],
+        "in_flight": sorted(in_flight, key=lambda p: p["numero"]),
+        "schedule": launch_scheduler.get_status()
+    }
+
+async def slo_status(request):
+    """Histogrammes de latence de lancement et dépassements du SLO d'avance"""
+    return web.json_response(launch_slo.get_report())
+
+async def loop_status(request):
+    """Retard de la boucle asyncio et derniers blocages avec leur pile"""
+    return web.json_response(loop_monitor.get_report())
+
+async def memory_status(request):
+    """
+    Rapport mémoire (lecture seule: le traçage s'active avec /memoire start).
+    Protégé par MEMORY_TOKEN (?token= ou en-tête X-Memory-Token); l'instantané tracemalloc
+    est calculé hors de la boucle et réutilisé pendant MEMORY_REPORT_MAX_AGE secondes.
+    """
+    token = request.headers.get("X-Memory-Token") or request.query.get("token", "")
+    if not MEMORY_TOKEN or not hmac.compare_digest(token.encode(), MEMORY_TOKEN.encode()):
+        raise web.HTTPNotFound()
+    top = int(request.query.get("top", "10")) if request.query.get("top", "10").isdigit() else 10
+    loop = asyncio.get_running_loop()
+    report = await loop.run_in_executor(None, memory_tracker.cached_report, min(top, 50), MEMORY_REPORT_MAX_AGE)
+    return web.json_response(report)
+
+MEMORY_REPORT_MAX_AGE = 30  # secondes entre deux instantanés servis par /memory
+
+def create_web_app() -> web.Application:
+    """Application de monitoring (partagée par le serveur et par loadtest.py)"""
     app = web.Application()
     app.router.add_get('/', health_check)
     app.router.add_get('/health', health_check)
     app.router.add_get('/status', bot_status)
+    app.router.add_get('/events', live_events.handle_sse)
+    app.router.add_get('/memory', memory_status)
+    app.router.add_get('/slo', slo_status)
+    app.router.add_get('/loop', loop_status)
+    live_events.snapshot_provider = build_live_snapshot
+    return app
 
-    runner = web.AppRunner(app)
+async def create_web_server():
+    """Create and start web server"""
+    runner = web.AppRunner(create_web_app())
     await runner.setup()
     site = web.TCPSite(runner, '0.0.0.0', PORT)
     await site.start()
@@ -1534,12 +2573,24 @@ async def main():
     try:
         # Start web server first
         web_runner = await create_web_server()
+        loop_monitor.start()
 
         # Start the bot
         if await start_bot():
+            launch_scheduler.start()
+            rebuild_launch_schedule()
+            maintenance.start()
+            start_catch_up("démarrage")
             print("✅ Bot en ligne et en attente de messages...")
             print(f"🌐 Accès web: http://0.0.0.0:{PORT}")
-            await client.run_until_disconnected()
+            while True:
+                try:
+                    await client.run_until_disconnected()
+                    break
+                except (ConnectionError, OSError) as e:
+                    print(f"⚠️ Connexion perdue: {e}")
+                    if not await handle_connection_error():
+                        break
         else:
             print("❌ Échec du démarrage du bot")
 
@@ -1549,6 +2600,10 @@ async def main():
         print(f"❌ Erreur critique: {e}")
         await handle_connection_error()
     finally:
+        loop_monitor.stop()
+        maintenance.stop()
+        prediction_stats.flush()
+        await import_workers.close()
         try:
             await client.disconnect()
             print("Bot déconnecté proprement")
@@ -0,0 +1,258 @@
+"""
+Tâches de maintenance en arrière-plan (nettoyage, compaction, rotation)
+Une tâche asyncio vérifie périodiquement les tâches échues (intervalle façon cron) et ne les
+lance que pendant les périodes calmes du canal stats: aucun message depuis quiet_seconds et
+aucune activité signalée par busy_check (file du pipeline, rattrapage, lancement imminent).
+Les tâches s'exécutent dans un thread dédié, de priorité basse, avec un budget de temps et
+d'octets lus/écrits: elles s'interrompent d'elles-mêmes au dépassement ou dès que le canal
+redevient actif, et reprennent au passage suivant.
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, List
+from pathlib import Path
+
+MAINTENANCE_NICE = 10  # priorité CPU du thread de maintenance (Linux: priorité par thread)
+
+
+def _lower_thread_priority():
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), MAINTENANCE_NICE)
+    except (AttributeError, OSError):
+        pass  # plateforme sans priorité par thread: le budget de temps reste la seule limite
+
+
+class JobBudget:
+    """Budget d'une exécution: durée maximale, octets maximum et débit d'E/S (pause entre deux lots)"""
+
+    def __init__(self, seconds: float, io_bytes: int, io_rate: int, interrupted: threading.Event):
+        self.deadline = time.monotonic() + seconds
+        self.io_left = io_bytes
+        self.io_rate = io_rate  # octets/s
+        self.io_used = 0
+        self.cut_short = False  # la tâche a constaté l'épuisement et s'est arrêtée avant la fin
+        self._interrupted = interrupted
+
+    @property
+    def exhausted(self) -> bool:
+        """
+        À vérifier entre deux unités de travail: budget épuisé ou canal stats redevenu actif.
+        Un True constaté par la tâche marque l'exécution comme partielle (elle reste échue).
+        """
+        exhausted = self._interrupted.is_set() or self.io_left <= 0 or time.monotonic() >= self.deadline
+        if exhausted:
+            self.cut_short = True
+        return exhausted
+
+    def spend(self, nbytes: int):
+        """Comptabilise des octets lus ou écrits et ralentit pour respecter le débit"""
+        self.io_used += nbytes
+        self.io_left -= nbytes
+        if self.io_rate and nbytes:
+            self._interrupted.wait(min(nbytes / self.io_rate, max(0.0, self.deadline - time.monotonic())))
+
+
+class MaintenanceJob:
+    """Tâche périodique: func(budget) s'exécute dans le thread de maintenance et retourne un résumé"""
+
+    def __init__(self, name: str, func: Callable[[JobBudget], Any], interval_hours: float,
+                 budget_seconds: float = 5.0, io_budget_mb: float = 20.0):
+        self.name = name
+        self.func = func
+        self.interval = interval_hours * 3600
+        self.budget_seconds = budget_seconds
+        self.io_budget = int(io_budget_mb * 1024 * 1024)
+        self.last_run: Optional[float] = None  # epoch de la dernière exécution terminée
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self.last_duration: Optional[float] = None
+        self.runs = 0
+        self.interrupted = 0
+
+    def is_due(self, now: float) -> bool:
+        return self.last_run is None or now - self.last_run >= self.interval
+
+
+class MaintenanceScheduler:
+    """Tâches de maintenance échues, exécutées une à une hors de la boucle pendant les périodes calmes"""
+
+    def __init__(self, state_file: str = "data/maintenance.json", quiet_seconds: float = 20.0,
+                 check_interval: float = 15.0, io_rate_mb: float = 4.0,
+                 busy_check: Optional[Callable[[], Optional[str]]] = None):
+        self.state_file = Path(state_file)
+        self.quiet_seconds = quiet_seconds
+        self.check_interval = check_interval
+        self.io_rate = int(io_rate_mb * 1024 * 1024)
+        self.busy_check = busy_check  # raison d'attendre (texte) ou None si rien ne s'y oppose
+        self.jobs: Dict[str, MaintenanceJob] = {}
+        self.last_activity = 0.0
+        self.current_job: Optional[str] = None
+        self.deferred = 0  # passages sans exécution: canal actif
+        self._interrupt = threading.Event()
+        # Un seul thread: les tâches ne se concurrencent pas et restent derrière la boucle
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="maintenance",
+                                            initializer=_lower_thread_priority)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def add_job(self, job: MaintenanceJob):
+        self.jobs[job.name] = job
+
+    def _load_state(self):
+        try:
+            if self.state_file.exists():
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                for name, last_run in state.get("last_run", {}).items():
+                    if name in self.jobs:
+                        self.jobs[name].last_run = last_run
+        except Exception as e:
+            print(f"❌ Erreur chargement état de maintenance: {e}")
+
+    def _save_state(self):
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_file.with_name(self.state_file.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"last_run": {name: job.last_run for name, job in self.jobs.items() if job.last_run}}, f)
+            os.replace(tmp_path, self.state_file)
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde état de maintenance: {e}")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._load_state()
+        self.last_activity = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        print(f"🧹 Maintenance planifiée: {', '.join(self.jobs)} (calme requis: {self.quiet_seconds:.0f}s)")
+
+    def stop(self):
+        self._interrupt.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def activity(self):
+        """Message du canal stats: la période calme repart de zéro et la tâche en cours s'interrompt"""
+        self.last_activity = time.monotonic()
+        if self.current_job:
+            self._interrupt.set()
+
+    def quiet_reason(self) -> Optional[str]:
+        """Pourquoi la maintenance doit attendre (None: période calme)"""
+        idle = time.monotonic() - self.last_activity
+        if idle < self.quiet_seconds:
+            return f"canal stats actif ({idle:.0f}s)"
+        return self.busy_check() if self.busy_check else None
+
+    def due_jobs(self) -> List[MaintenanceJob]:
+        now = time.time()
+        return sorted((job for job in self.jobs.values() if job.is_due(now)), key=lambda job: job.last_run or 0)
+
+    async def run_job(self, job: MaintenanceJob) -> Any:
+        """Exécute une tâche dans le thread de maintenance avec son budget"""
+        self._interrupt.clear()
+        budget = JobBudget(job.budget_seconds, job.io_budget, self.io_rate, self._interrupt)
+        self.current_job = job.name
+        started = time.monotonic()
+        try:
+            job.last_result = await asyncio.get_running_loop().run_in_executor(self._executor, job.func, budget)
+            job.last_error = None
+        except Exception as e:
+            job.last_error = f"{type(e).__name__}: {e}"
+            print(f"❌ Maintenance {job.name}: {job.last_error}")
+        finally:
+            self.current_job = None
+        job.last_duration = time.monotonic() - started
+        job.runs += 1
+        if budget.cut_short:
+            # Travail partiel: la tâche reste échue et reprendra à la prochaine période calme
+            # (une tâche terminée après l'échéance, sans s'être arrêtée, compte comme terminée)
+            job.interrupted += 1
+            print(f"⏸️ Maintenance {job.name} interrompue après {job.last_duration:.1f}s ({budget.io_used / 1024:.0f} KB)")
+        else:
+            job.last_run = time.time()
+            self._save_state()
+            print(f"🧹 Maintenance {job.name} terminée en {job.last_duration:.1f}s: {job.last_result}")
+        return job.last_result
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                for job in self.due_jobs():
+                    if self.quiet_reason():
+                        self.deferred += 1
+                        break
+                    await self.run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Erreur planificateur de maintenance: {e}")
+
+    def run_now(self):
+        """Force une vérification immédiate (les tâches échues attendent toujours le calme)"""
+        for job in self.jobs.values():
+            job.last_run = None
+        if self._wakeup:
+            self._wakeup.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "running": self.running,
+            "current_job": self.current_job,
+            "quiet": self.quiet_reason() is None,
+            "waiting_for": self.quiet_reason(),
+            "deferred": self.deferred,
+            "jobs": {
+                name: {
+                    "interval_hours": job.interval / 3600,
+                    "last_run": datetime.fromtimestamp(job.last_run).strftime("%Y-%m-%d %H:%M:%S") if job.last_run else None,
+                    "due": job.is_due(now),
+                    "runs": job.runs,
+                    "interrupted": job.interrupted,
+                    "last_duration_s": round(job.last_duration, 2) if job.last_duration is not None else None,
+                    "last_result": job.last_result,
+                    "last_error": job.last_error
+                }
+                for name, job in self.jobs.items()
+            }
+        }
+
+
+def prune_session_files(directory: str, current_session: str, max_age_hours: float = 24.0,
+                        budget: Optional[JobBudget] = None) -> int:
+    """Supprime les anciens fichiers bot_session_*.session (et journaux SQLite) sauf la session courante"""
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if budget and budget.exhausted:
+                break
+            if not entry.name.startswith("bot_session_") or entry.name.split(".")[0] == current_session:
+                continue
+            if not entry.name.endswith((".session", ".session-journal")) or entry.stat().st_mtime > cutoff:
+                continue
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError as e:
+                print(f"⚠️ Session non supprimée {entry.name}: {e}")
+    return removed
@@ -0,0 +1,174 @@
+"""
+Suivi mémoire à la demande (tracemalloc) pour repérer ce qui grossit dans une instance longue
+Le traçage n'est actif qu'entre start() et stop(): hors diagnostic, aucun surcoût.
+Rapport: écart par rapport à la référence, principaux sites d'allocation et taille
+des structures du bot (dictionnaires de prédictions, caches, fichiers de session...)
+"""
+import os
+import json
+import time
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional, List
+from pathlib import Path
+
+# Frames sans intérêt pour le diagnostic (le traçage lui-même, le chargement de modules)
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _rss_bytes() -> Optional[int]:
+    """Mémoire résidente du processus (Linux), None si indisponible"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class MemoryTracker:
+    """Instantanés tracemalloc comparés à une référence + tailles des structures du bot"""
+
+    def __init__(self, structures: Optional[Dict[str, Callable[[], int]]] = None, export_dir: str = "data/memory"):
+        self.structures = structures or {}
+        self.export_dir = Path(export_dir)
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._baseline_at: Optional[datetime] = None
+        self._baseline_structures: Dict[str, int] = {}
+        self._started_here = False
+        self._cache_lock = threading.Lock()
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_top = 0
+        self._cached_at = 0.0
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def structure_sizes(self) -> Dict[str, Optional[int]]:
+        sizes = {}
+        for name, provider in self.structures.items():
+            try:
+                sizes[name] = provider()
+            except Exception:
+                sizes[name] = None
+        return sizes
+
+    def start(self, frames: int = 10) -> Dict[str, Any]:
+        """Active le traçage et prend la référence"""
+        if not self.tracing:
+            tracemalloc.start(frames)
+            self._started_here = True
+        self.reset_baseline()
+        print(f"🧠 Traçage mémoire activé ({tracemalloc.get_traceback_limit()} frames)")
+        return {"success": True, "frames": tracemalloc.get_traceback_limit()}
+
+    def reset_baseline(self):
+        self._baseline = self._snapshot()
+        self._baseline_at = datetime.now()
+        self._baseline_structures = self.structure_sizes()
+        self._cached = None
+
+    def stop(self) -> Dict[str, Any]:
+        """Désactive le traçage (seulement s'il a été activé ici) et libère les instantanés"""
+        if self._started_here and self.tracing:
+            tracemalloc.stop()
+        self._started_here = False
+        self._baseline = None
+        self._baseline_at = None
+        self._baseline_structures = {}
+        self._cached = None
+        print("🧠 Traçage mémoire désactivé")
+        return {"success": True}
+
+    def report(self, top: int = 10, key_type: str = "lineno") -> Dict[str, Any]:
+        """État courant; avec le traçage actif: diff depuis la référence et principaux sites d'allocation"""
+        structures = self.structure_sizes()
+        report: Dict[str, Any] = {
+            "tracing": self.tracing,
+            "rss_bytes": _rss_bytes(),
+            "structures": {
+                name: {"size": size, "delta": (size - self._baseline_structures[name])
+                       if size is not None and self._baseline_structures.get(name) is not None else None}
+                for name, size in structures.items()
+            }
+        }
+        if not self.tracing:
+            return report
+
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._snapshot()
+        report.update({
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "baseline_at": self._baseline_at.isoformat() if self._baseline_at else None,
+            "top_sites": [self._stat_to_dict(stat) for stat in snapshot.statistics(key_type)[:top]]
+        })
+        if self._baseline is not None:
+            diff = snapshot.compare_to(self._baseline, key_type)
+            report["growth"] = [self._stat_to_dict(stat) for stat in diff[:top] if stat.size_diff > 0]
+        return report
+
+    def cached_report(self, top: int = 10, max_age: float = 30.0) -> Dict[str, Any]:
+        """
+        Rapport réutilisé tant qu'il a moins de max_age secondes (appelable depuis un thread):
+        les requêtes simultanées attendent le calcul en cours au lieu d'en lancer un autre
+        """
+        with self._cache_lock:
+            age = time.monotonic() - self._cached_at
+            if self._cached is None or age >= max_age or top > self._cached_top:
+                self._cached = self.report(top=top)
+                self._cached_top = top
+                self._cached_at = time.monotonic()
+                age = 0.0
+            report = dict(self._cached, cached_age=round(age, 1))
+            for key in ("top_sites", "growth"):
+                if key in report:
+                    report[key] = report[key][:top]
+            return report
+
+    @staticmethod
+    def _stat_to_dict(stat) -> Dict[str, Any]:
+        frame = stat.traceback[0]
+        entry = {
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size": stat.size,
+            "count": stat.count
+        }
+        if hasattr(stat, "size_diff"):
+            entry["size_diff"] = stat.size_diff
+            entry["count_diff"] = stat.count_diff
+        return entry
+
+    def export(self, top: int = 50) -> Dict[str, Any]:
+        """Écrit le rapport JSON et, si le traçage est actif, l'instantané brut (tracemalloc.Snapshot.load)"""
+        try:
+            self.export_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            files: List[str] = []
+
+            report_path = self.export_dir / f"memory_{stamp}.json"
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(self.report(top=top), f, ensure_ascii=False, indent=2)
+            files.append(str(report_path))
+
+            if self.tracing:
+                snapshot_path = self.export_dir / f"memory_{stamp}.tracemalloc"
+                self._snapshot().dump(str(snapshot_path))
+                files.append(str(snapshot_path))
+
+            return {"success": True, "files": files,
+                    "size": sum(os.path.getsize(path) for path in files)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
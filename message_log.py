@@ -0,0 +1,142 @@
+"""
+Journal des messages traités, segmenté et en ajout seul
+Chaque segment contient au plus segment_size entrées (une ligne JSON par message):
+l'ajout est en O(1) et la rétention supprime des segments entiers (unlink, sans réécriture).
+Le contenu du message est optionnel et stocké compressé (zlib + base64).
+"""
+import os
+import json
+import zlib
+import base64
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator, List
+from pathlib import Path
+
+
+class SegmentedMessageLog:
+    """Segments data/message_log/segment_<premier id>.jsonl, les plus anciens supprimés en bloc"""
+
+    def __init__(self, log_dir: str = "data/message_log", segment_size: int = 250, max_segments: int = 4,
+                 store_content: bool = True):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.store_content = store_content
+        # (chemin, empreintes du segment) du plus ancien au segment courant
+        self._segments: deque = deque()
+        self._hashes: Dict[str, Path] = {}  # empreinte → segment le plus récent qui la contient
+        self._file = None
+        self._last_id = 0
+        self._load()
+
+    @staticmethod
+    def _repair(path: Path):
+        """Tronque une dernière ligne incomplète (écriture interrompue)"""
+        size = path.stat().st_size
+        if not size:
+            return
+        with open(path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b"\n") + 1)
+        print(f"🔧 Journal des messages: segment {path.name} réparé")
+
+    @staticmethod
+    def _read_segment(path: Path) -> Iterator[Dict[str, Any]]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def _load(self):
+        for path in sorted(self.log_dir.glob("segment_*.jsonl")):
+            self._repair(path)
+            hashes = []
+            for entry in self._read_segment(path):
+                hashes.append(entry["message_hash"])
+                self._last_id = max(self._last_id, entry["id"])
+            self._segments.append((path, hashes))
+            self._hashes.update(dict.fromkeys(hashes, path))
+        self._prune()
+
+    def _rotate(self):
+        """Ouvre un nouveau segment et supprime les plus anciens au-delà de la rétention"""
+        if self._file:
+            self._file.close()
+        path = self.log_dir / f"segment_{self._last_id + 1:09d}.jsonl"
+        self._segments.append((path, []))
+        self._file = open(path, "a", encoding="utf-8")
+        self._prune()
+
+    def _prune(self):
+        while len(self._segments) > self.max_segments:
+            path, hashes = self._segments.popleft()
+            # Une empreinte réécrite dans un segment plus récent reste connue
+            for message_hash in hashes:
+                if self._hashes.get(message_hash) == path:
+                    del self._hashes[message_hash]
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"⚠️ Segment du journal non supprimé {path}: {e}")
+
+    def contains(self, message_hash: str) -> bool:
+        return message_hash in self._hashes
+
+    def append(self, message_hash: str, channel_id: int, content: Optional[str] = None,
+               processed_at: Optional[str] = None) -> int:
+        """Ajoute une entrée au segment courant (rotation quand il est plein); retourne son id"""
+        if not self._segments or len(self._segments[-1][1]) >= self.segment_size:
+            self._rotate()
+        elif self._file is None:
+            self._file = open(self._segments[-1][0], "a", encoding="utf-8")
+
+        self._last_id += 1
+        entry = {
+            "id": self._last_id,
+            "message_hash": message_hash,
+            "channel_id": channel_id,
+            "processed_at": processed_at or datetime.now().isoformat()
+        }
+        if self.store_content and content is not None:
+            entry["content_z"] = base64.b64encode(zlib.compress(content.encode("utf-8"))).decode("ascii")
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._segments[-1][1].append(message_hash)
+        self._hashes[message_hash] = self._segments[-1][0]
+        return self._last_id
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Entrées conservées, de la plus ancienne à la plus récente (contenu décompressé)"""
+        if self._file:
+            self._file.flush()
+        for path, _ in list(self._segments):
+            if not path.exists():
+                continue
+            for entry in self._read_segment(path):
+                packed = entry.pop("content_z", None)
+                entry["content"] = zlib.decompress(base64.b64decode(packed)).decode("utf-8") if packed else None
+                yield entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        sizes: List[int] = [path.stat().st_size for path, _ in self._segments if path.exists()]
+        return {
+            "entries": len(self._hashes),
+            "segments": len(self._segments),
+            "segment_size": self.segment_size,
+            "max_segments": self.max_segments,
+            "store_content": self.store_content,
+            "size": sum(sizes)
+        }
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,80 @@
+"""
+Suivi des messages édités du canal de statistiques
+Le canal modifie chaque partie en direct (⏰/🕐 puis cartes finales): on mémorise
+le dernier état traité par (chat, message_id) pour ne refaire que le travail utile
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+
+class MessageStateTracker:
+    """Dernier état traité par message, borné en mémoire (LRU)"""
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._states: "OrderedDict[Tuple[int, int], Tuple[bytes, bool]]" = OrderedDict()
+        self.counters = {
+            "new": 0,
+            "unchanged": 0,
+            "in_progress": 0,
+            "final": 0,
+            "final_edit": 0,
+            "replayed_open": 0
+        }
+
+    @staticmethod
+    def is_in_progress(message_text: str) -> bool:
+        """⏰/🕐 = partie en cours, le résultat n'est pas encore définitif"""
+        return "⏰" in message_text or "🕐" in message_text
+
+    @staticmethod
+    def _fingerprint(message_text: str) -> bytes:
+        return hashlib.blake2b(message_text.encode("utf-8"), digest_size=8).digest()
+
+    def observe(self, chat_id: int, message_id: int, message_text: str, replay: bool = False) -> Tuple[bool, bool]:
+        """
+        Enregistre le nouvel état du message et indique le travail à faire.
+        replay=True (rattrapage): jamais de lancement; une partie encore en cours n'est pas
+        mémorisée, pour que sa copie en direct soit vue comme nouvelle (lancement et cadence).
+
+        Returns:
+            tuple: (launch, verify)
+                - launch: première apparition du message → recherche de prédiction à lancer
+                - verify: passage à un résultat final → vérification des prédictions
+                (False, False) = édition sans intérêt, à ignorer
+        """
+        key = (chat_id, message_id)
+        fingerprint = self._fingerprint(message_text)
+        is_final = not self.is_in_progress(message_text)
+        previous = self._states.get(key)
+        if replay and not is_final:
+            self.counters["replayed_open"] += 1
+            return False, False
+
+        self._states[key] = (fingerprint, is_final)
+        self._states.move_to_end(key)
+        if len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+
+        if previous is None:
+            self.counters["new"] += 1
+            return not replay, is_final
+
+        previous_fingerprint, was_final = previous
+        if previous_fingerprint == fingerprint:
+            self.counters["unchanged"] += 1
+            return False, False
+        if was_final:
+            # Résultat déjà vérifié: une correction ultérieure ne relance pas la vérification
+            self.counters["final_edit"] += 1
+            return False, False
+        if not is_final:
+            self.counters["in_progress"] += 1
+            return False, False
+
+        self.counters["final"] += 1
+        return False, True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"tracked": len(self._states), **self.counters}
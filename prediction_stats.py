@@ -0,0 +1,195 @@
+"""
+Statistiques glissantes des prédictions Excel
+Compteurs mis à jour à chaque vérification (taux de réussite par offset, par type V1/V2
+et par heure) sur les 50/200/1000 dernières prédictions, aujourd'hui et 7 jours.
+Lecture en temps constant, persistance légère en JSON.
+"""
+import json
+from collections import deque, OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+from pathlib import Path
+
+from excel_importer import OFFSET_STATUSES, FAILED_STATUS, expected_side, parse_date_heure
+
+OUTCOMES = OFFSET_STATUSES + (FAILED_STATUS,)
+SIDES = ("V1", "V2")
+
+# (indice dans OUTCOMES, V1/V2, heure de la partie, jour AAAA-MM-JJ)
+Event = Tuple[int, str, int, str]
+
+
+def _rate(wins: int, total: int) -> float:
+    return round(wins / total * 100, 1) if total else 0.0
+
+
+class _Counters:
+    """Compteurs additifs d'une fenêtre (ajout et retrait en O(1))"""
+
+    __slots__ = ("outcomes", "by_side", "by_hour")
+
+    def __init__(self):
+        self.outcomes = [0] * len(OUTCOMES)
+        self.by_side = {side: [0, 0] for side in SIDES}  # [réussites, total]
+        self.by_hour = [[0, 0] for _ in range(24)]
+
+    def add(self, event: Event, sign: int = 1):
+        outcome, side, hour, _ = event
+        win = sign if outcome < len(OFFSET_STATUSES) else 0
+        self.outcomes[outcome] += sign
+        self.by_side[side][0] += win
+        self.by_side[side][1] += sign
+        self.by_hour[hour][0] += win
+        self.by_hour[hour][1] += sign
+
+    def merge(self, other: "_Counters", sign: int = 1):
+        for i, count in enumerate(other.outcomes):
+            self.outcomes[i] += sign * count
+        for side in SIDES:
+            self.by_side[side][0] += sign * other.by_side[side][0]
+            self.by_side[side][1] += sign * other.by_side[side][1]
+        for hour in range(24):
+            self.by_hour[hour][0] += sign * other.by_hour[hour][0]
+            self.by_hour[hour][1] += sign * other.by_hour[hour][1]
+
+    def summary(self) -> Dict[str, Any]:
+        total = sum(self.outcomes)
+        wins = total - self.outcomes[-1]
+        return {
+            "total": total,
+            "wins": wins,
+            "win_rate": _rate(wins, total),
+            "by_offset": {offset: count for offset, count in enumerate(self.outcomes[:-1])},
+            "failed": self.outcomes[-1],
+            "by_side": {side: {"wins": w, "total": t, "win_rate": _rate(w, t)} for side, (w, t) in self.by_side.items()},
+            "by_hour": {hour: {"wins": w, "total": t, "win_rate": _rate(w, t)} for hour, (w, t) in enumerate(self.by_hour) if t}
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"outcomes": self.outcomes, "by_side": self.by_side, "by_hour": self.by_hour}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_Counters":
+        counters = cls()
+        counters.outcomes = list(data["outcomes"])
+        counters.by_side = {side: list(data["by_side"][side]) for side in SIDES}
+        counters.by_hour = [list(pair) for pair in data["by_hour"]]
+        return counters
+
+
+class PredictionStats:
+    """Fenêtres glissantes (par nombre de prédictions et par jour) maintenues à chaque vérification"""
+
+    def __init__(self, stats_file: str = "data/prediction_stats.json", windows=(50, 200, 1000),
+                 days: int = 7, flush_interval: float = 30.0):
+        self.stats_file = Path(stats_file)
+        self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+        self.windows = tuple(sorted(windows))
+        self.days = days
+        self.flush_interval = flush_interval
+        self._recent: deque = deque(maxlen=self.windows[-1])
+        self._window_counters = {size: _Counters() for size in self.windows}
+        self._day_counters: "OrderedDict[str, _Counters]" = OrderedDict()
+        self._period = _Counters()  # somme des journées conservées (7 jours)
+        self._total = _Counters()
+        self._dirty = False
+        self._last_flush = 0.0
+        self._load()
+
+    def _roll(self, today: str):
+        """Retire de la période les journées sorties de la fenêtre de N jours"""
+        cutoff = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=self.days - 1)).strftime("%Y-%m-%d")
+        while self._day_counters:
+            day = next(iter(self._day_counters))
+            if day >= cutoff:
+                break
+            self._period.merge(self._day_counters.pop(day), sign=-1)
+
+    def _add_recent(self, event: Event):
+        # Fenêtres par nombre: l'élément qui sort de chaque fenêtre est retiré avant l'ajout
+        for size, counters in self._window_counters.items():
+            if len(self._recent) >= size:
+                counters.add(self._recent[-size], sign=-1)
+            counters.add(event)
+        self._recent.append(event)
+
+    def _add(self, event: Event):
+        self._add_recent(event)
+        day = event[3]
+        if day not in self._day_counters:
+            self._day_counters[day] = _Counters()
+        self._day_counters[day].add(event)
+        self._period.add(event)
+        self._total.add(event)
+
+    def record(self, status: str, victoire: str, date_heure: Optional[str] = None,
+               verified_at: Optional[datetime] = None) -> bool:
+        """Enregistre le statut final d'une prédiction (✅0️⃣/✅1️⃣/✅2️⃣/⭕✍🏻)"""
+        if status not in OUTCOMES:
+            return False
+        verified_at = verified_at or datetime.now()
+        game_time = parse_date_heure(date_heure) or verified_at
+        side = "V2" if expected_side(victoire) == "banquier" else "V1"
+        today = verified_at.strftime("%Y-%m-%d")
+
+        self._roll(today)
+        self._add((OUTCOMES.index(status), side, game_time.hour, today))
+        self._dirty = True
+        if datetime.now().timestamp() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return True
+
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Toutes les fenêtres: '50', '200', '1000', 'today', '7d', 'total'"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        self._roll(today)
+        summary = {str(size): counters.summary() for size, counters in self._window_counters.items()}
+        summary["today"] = self._day_counters.get(today, _Counters()).summary()
+        summary[f"{self.days}d"] = self._period.summary()
+        summary["total"] = self._total.summary()
+        return summary
+
+    def clear(self):
+        self._recent.clear()
+        self._window_counters = {size: _Counters() for size in self.windows}
+        self._day_counters.clear()
+        self._period = _Counters()
+        self._total = _Counters()
+        self._dirty = True
+        self.flush()
+
+    def _load(self):
+        try:
+            if not self.stats_file.exists():
+                return
+            with open(self.stats_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for event in data.get("recent", []):
+                self._add_recent(tuple(event))
+            for day, counters in sorted(data.get("days", {}).items()):
+                self._day_counters[day] = _Counters.from_dict(counters)
+                self._period.merge(self._day_counters[day])
+            if data.get("total"):
+                self._total = _Counters.from_dict(data["total"])
+            self._roll(datetime.now().strftime("%Y-%m-%d"))
+            print(f"📈 Statistiques Excel chargées: {sum(self._total.outcomes)} vérification(s)")
+        except Exception as e:
+            print(f"❌ Erreur chargement statistiques Excel: {e}")
+
+    def flush(self):
+        if not self._dirty:
+            return
+        try:
+            data = {
+                "recent": list(self._recent),
+                "days": {day: counters.to_dict() for day, counters in self._day_counters.items()},
+                "total": self._total.to_dict()
+            }
+            tmp_path = self.stats_file.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            tmp_path.replace(self.stats_file)
+            self._dirty = False
+            self._last_flush = datetime.now().timestamp()
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde statistiques Excel: {e}")
@@ -0,0 +1,293 @@
+"""
+Archive des résultats du canal de statistiques
+Une ligne de taille fixe par partie, stockée en colonnes (un fichier par colonne)
+dans un segment par jour: data/results/AAAA-MM-JJ/<colonne>.bin
+Écriture en ajout seul; lecture par mmap sans copie pour les requêtes
+"""
+import os
+import re
+import sys
+import mmap
+import struct
+from array import array
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from pathlib import Path
+
+from excel_importer import extract_points, winner_from_points
+
+# Colonnes: (nom, format struct, nombre de valeurs par partie)
+_COLUMNS = (
+    ("numero", "I", 1),    # numéro de jeu
+    ("ts", "q", 1),        # horodatage (epoch secondes)
+    ("joueur", "b", 1),    # points joueur (-1 = inconnu)
+    ("banquier", "b", 1),  # points banquier (-1 = inconnu)
+    ("winner", "B", 1),    # voir WINNERS
+    ("cards", "B", 6),     # 3 cartes joueur + 3 cartes banquier (0 = pas de carte)
+)
+RECORD_SIZE = sum(struct.calcsize(f"<{fmt}") * count for _, fmt, count in _COLUMNS)
+
+WINNERS = ("joueur", "banquier", "nul", "inconnu")
+_UNKNOWN = WINNERS.index("inconnu")
+
+_RANKS = ("A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
+_SUITS = ("♠", "♥", "♦", "♣")
+_CARD_PATTERN = re.compile(r"(10|[2-9AJQK])(♠|♥|❤|♦|♣)")
+_GROUP_PATTERN = re.compile(r"\d+\(([^)]+)\)")
+
+
+def _column_view(mapped: mmap.mmap, fmt: str, length: int) -> memoryview:
+    """
+    Colonne lue selon le format d'écriture (petit-boutiste "<"): vue sans copie sur l'hôte
+    petit-boutiste, copie retournée octet à octet sur un hôte gros-boutiste
+    """
+    if sys.byteorder == "little" or struct.calcsize(fmt) == 1:
+        return memoryview(mapped)[:length].cast(fmt)
+    values = array(fmt, mapped[:length])
+    values.byteswap()
+    return memoryview(values)
+
+
+def encode_cards(message_text: str) -> List[int]:
+    """Deux premiers groupes de cartes → 6 octets (rang 1-13 << 2 | couleur, 0 = vide)"""
+    encoded = []
+    groups = _GROUP_PATTERN.findall(message_text)[:2]
+    groups += [""] * (2 - len(groups))
+    for group in groups:
+        cards = []
+        for rank, suit in _CARD_PATTERN.findall(group)[:3]:
+            suit = "♥" if suit == "❤" else suit
+            cards.append((_RANKS.index(rank) + 1) << 2 | _SUITS.index(suit))
+        encoded.extend(cards + [0] * (3 - len(cards)))
+    return encoded
+
+
+def decode_cards(encoded) -> Tuple[List[str], List[str]]:
+    def decode(values):
+        return [f"{_RANKS[(v >> 2) - 1]}{_SUITS[v & 3]}" for v in values if v]
+    return decode(encoded[:3]), decode(encoded[3:6])
+
+
+class _Segment:
+    """Colonnes d'une journée ouvertes en lecture via mmap"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._maps = []
+        self.columns: Dict[str, memoryview] = {}
+        sizes = {}
+        for name, fmt, count in _COLUMNS:
+            file_path = path / f"{name}.bin"
+            size = file_path.stat().st_size if file_path.exists() else 0
+            sizes[name] = size // (struct.calcsize(f"<{fmt}") * count)
+        # Une écriture interrompue peut laisser des colonnes inégales: on lit le minimum commun
+        self.count = min(sizes.values())
+        if not self.count:
+            return
+        for name, fmt, count in _COLUMNS:
+            length = self.count * struct.calcsize(f"<{fmt}") * count
+            with open(path / f"{name}.bin", "rb") as f:
+                mapped = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            self.columns[name] = _column_view(mapped, fmt, length)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        cards = self.columns["cards"][index * 6:index * 6 + 6]
+        joueur_cards, banquier_cards = decode_cards(list(cards))
+        joueur, banquier = self.columns["joueur"][index], self.columns["banquier"][index]
+        return {
+            "numero": self.columns["numero"][index],
+            "timestamp": datetime.fromtimestamp(self.columns["ts"][index]),
+            "joueur": joueur if joueur >= 0 else None,
+            "banquier": banquier if banquier >= 0 else None,
+            "winner": WINNERS[self.columns["winner"][index]],
+            "joueur_cards": joueur_cards,
+            "banquier_cards": banquier_cards
+        }
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        self.columns.clear()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+
+class ResultsArchive:
+    """Archive en colonnes, segmentée par jour, des résultats de parties"""
+
+    def __init__(self, archive_dir: str = "data/results"):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._day: Optional[str] = None
+        self._files: Dict[str, Any] = {}
+        self.appended = 0
+
+    def _open_day(self, day: str):
+        if day == self._day:
+            return
+        self.close()
+        segment_dir = self.archive_dir / day
+        segment_dir.mkdir(parents=True, exist_ok=True)
+        self._repair(segment_dir)
+        self._files = {name: open(segment_dir / f"{name}.bin", "ab") for name, _, _ in _COLUMNS}
+        self._day = day
+
+    @staticmethod
+    def _repair(segment_dir: Path):
+        """Tronque les colonnes à la dernière partie complète (écriture interrompue)"""
+        counts = {}
+        for name, fmt, count in _COLUMNS:
+            file_path = segment_dir / f"{name}.bin"
+            width = struct.calcsize(f"<{fmt}") * count
+            counts[name] = (file_path.stat().st_size if file_path.exists() else 0) // width
+        complete = min(counts.values())
+        for name, fmt, count in _COLUMNS:
+            file_path = segment_dir / f"{name}.bin"
+            expected = complete * struct.calcsize(f"<{fmt}") * count
+            if file_path.exists() and file_path.stat().st_size != expected:
+                os.truncate(file_path, expected)
+                print(f"🔧 Archive résultats: colonne {name} réparée ({segment_dir.name})")
+
+    def append(self, game_number: int, message_text: str, timestamp: Optional[datetime] = None) -> bool:
+        """Ajoute le résultat final d'une partie au segment du jour"""
+        try:
+            timestamp = timestamp or datetime.now()
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            joueur, banquier = extract_points(message_text)
+            if joueur is None or banquier is None:
+                joueur, banquier, winner = -1, -1, _UNKNOWN
+            else:
+                winner = WINNERS.index(winner_from_points(joueur, banquier) or "nul")
+
+            values = {
+                "numero": (game_number,),
+                "ts": (int(timestamp.timestamp()),),
+                "joueur": (joueur,),
+                "banquier": (banquier,),
+                "winner": (winner,),
+                "cards": encode_cards(message_text)
+            }
+            self._open_day(timestamp.strftime("%Y-%m-%d"))
+            for name, fmt, count in _COLUMNS:
+                self._files[name].write(struct.pack(f"<{count}{fmt}", *values[name]))
+            for f in self._files.values():
+                f.flush()
+            self.appended += 1
+            return True
+        except Exception as e:
+            print(f"❌ Erreur archive résultats #{game_number}: {e}")
+            return False
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        self._day = None
+
+    def days(self) -> List[str]:
+        """Journées archivées, dans l'ordre chronologique"""
+        return sorted(entry.name for entry in os.scandir(self.archive_dir)
+                      if entry.is_dir() and re.fullmatch(r"\d{4}-\d{2}-\d{2}", entry.name))
+
+    def _select_days(self, start: Optional[date], end: Optional[date]) -> List[str]:
+        selected = []
+        for day in self.days():
+            day_date = date.fromisoformat(day)
+            if (start is None or day_date >= start) and (end is None or day_date <= end):
+                selected.append(day)
+        return selected
+
+    def scan(self, start: Optional[date] = None, end: Optional[date] = None,
+             numero_min: Optional[int] = None, numero_max: Optional[int] = None,
+             winner: Optional[str] = None) -> Iterator[Tuple[str, _Segment, int]]:
+        """
+        Parcourt les parties correspondant aux filtres: (jour, segment, index).
+        Les filtres portent directement sur les colonnes mmap, sans décoder les parties.
+        """
+        winner_code = WINNERS.index(winner) if winner else None
+        for day in self._select_days(start, end):
+            segment = _Segment(self.archive_dir / day)
+            try:
+                numeros = segment.columns.get("numero")
+                winners = segment.columns.get("winner")
+                for index in range(segment.count):
+                    numero = numeros[index]
+                    if numero_min is not None and numero < numero_min:
+                        continue
+                    if numero_max is not None and numero > numero_max:
+                        continue
+                    if winner_code is not None and winners[index] != winner_code:
+                        continue
+                    yield day, segment, index
+            finally:
+                segment.close()
+
+    def query(self, start: Optional[date] = None, end: Optional[date] = None,
+              numero_min: Optional[int] = None, numero_max: Optional[int] = None,
+              winner: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Parties archivées (dict décodés) par plage de dates, de numéros et/ou gagnant"""
+        results = []
+        for day, segment, index in self.scan(start, end, numero_min, numero_max, winner):
+            results.append({"day": day, **segment.record(index)})
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def last(self, count: int = 10) -> List[Dict[str, Any]]:
+        """Dernières parties archivées (plus récente en dernier)"""
+        results = []
+        for day in reversed(self.days()):
+            segment = _Segment(self.archive_dir / day)
+            try:
+                start = max(0, segment.count - (count - len(results)))
+                results = [{"day": day, **segment.record(i)} for i in range(start, segment.count)] + results
+            finally:
+                segment.close()
+            if len(results) >= count:
+                break
+        return results
+
+    def winner_counts(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, int]:
+        counts = {name: 0 for name in WINNERS}
+        for day in self._select_days(start, end):
+            segment = _Segment(self.archive_dir / day)
+            try:
+                if segment.count:
+                    winners = segment.columns["winner"].tobytes()
+                    for code, name in enumerate(WINNERS):
+                        counts[name] += winners.count(code)
+            finally:
+                segment.close()
+        return counts
+
+    def sessions(self, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[Tuple[str, List[Tuple[int, str]]]]:
+        """Par journée: [(numero, gagnant)] dans l'ordre d'arrivée, pour le backtest"""
+        for day in self._select_days(start, end):
+            segment = _Segment(self.archive_dir / day)
+            try:
+                if segment.count:
+                    yield day, [(numero, WINNERS[code]) for numero, code in
+                                zip(segment.columns["numero"], segment.columns["winner"])]
+            finally:
+                segment.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        days = self.days()
+        total_bytes = 0
+        games = 0
+        for day in days:
+            segment_dir = self.archive_dir / day
+            sizes = {name: (segment_dir / f"{name}.bin").stat().st_size
+                     for name, _, _ in _COLUMNS if (segment_dir / f"{name}.bin").exists()}
+            total_bytes += sum(sizes.values())
+            games += sizes.get("numero", 0) // struct.calcsize("<I")
+        return {
+            "days": len(days),
+            "games": games,
+            "total_bytes": total_bytes,
+            "record_size": RECORD_SIZE,
+            "appended": self.appended
+        }
@@ -0,0 +1,179 @@
+"""
+Envois programmés côté serveur (send_message(schedule=...)) des prédictions à venir
+Le message de lancement est déposé à l'avance chez Telegram, qui le publie à l'heure prévue:
+aucune dépendance à la boucle du bot au moment critique. Les heures sont recalculées quand la
+cadence mesurée dérive (report ou annulation), et le lancement réactif reste le filet de sécurité.
+
+Les comptes bot ne peuvent pas programmer de messages (SCHEDULE_BOT_NOT_ALLOWED): le mode se
+désactive alors de lui-même et seul le chemin réactif s'applique.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+from telethon import errors, functions
+
+# Erreurs définitives: le compte ne peut pas programmer dans ce canal (code RPC affiché)
+_FATAL_ERRORS = {
+    errors.ScheduleBotNotAllowedError: "SCHEDULE_BOT_NOT_ALLOWED",
+    errors.ChatWriteForbiddenError: "CHAT_WRITE_FORBIDDEN",
+    errors.ChatAdminRequiredError: "CHAT_ADMIN_REQUIRED",
+}
+
+
+class ScheduledSendManager:
+    """Messages programmés en attente par clé de prédiction: dépôt, report, annulation"""
+
+    def __init__(self, min_delay: float = 30.0, drift_tolerance: float = 60.0,
+                 horizon: timedelta = timedelta(hours=2), max_pending: int = 90, sync_interval: float = 30.0):
+        self.min_delay = min_delay              # Telegram refuse une programmation trop proche
+        self.drift_tolerance = drift_tolerance  # écart (s) qui justifie un report
+        self.horizon = horizon
+        self.max_pending = max_pending          # limite Telegram: 100 messages programmés par chat
+        self.sync_interval = sync_interval
+        self.pending: Dict[str, Dict[str, Any]] = {}  # clé → {message_id, channel_id, send_at, text}
+        self.disabled_reason: Optional[str] = None
+        self.counters = {"submitted": 0, "rescheduled": 0, "cancelled": 0, "delivered": 0, "errors": 0}
+        self._lock = asyncio.Lock()
+        self._last_sync = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.disabled_reason is None
+
+    def is_pending(self, key: str) -> bool:
+        return key in self.pending
+
+    def disable(self, reason: str):
+        """Mode indisponible pour ce compte (code Telegram): lancement réactif uniquement"""
+        self.disabled_reason = reason
+        print(f"⚠️ Envois programmés désactivés ({reason}): lancement réactif uniquement")
+
+    def _handle_error(self, action: str, key: str, error: Exception):
+        self.counters["errors"] += 1
+        name = type(error).__name__
+        code = next((code for error_type, code in _FATAL_ERRORS.items() if isinstance(error, error_type)), None)
+        if code:
+            self.disable(code)
+        else:
+            print(f"❌ Envoi programmé {action} {key}: {name}: {error}")
+
+    async def submit(self, client, peer, channel_id: int, key: str, text: str, send_at: datetime) -> bool:
+        """Dépose le message de lancement chez Telegram pour publication à send_at"""
+        try:
+            message = await client.send_message(peer, text, schedule=send_at)
+        except Exception as e:
+            self._handle_error("dépôt", key, e)
+            return False
+        self.pending[key] = {"message_id": message.id, "channel_id": channel_id, "send_at": send_at, "text": text}
+        self.counters["submitted"] += 1
+        print(f"🗓️ Lancement programmé {key} à {send_at.strftime('%H:%M:%S')} (message {message.id})")
+        return True
+
+    async def reschedule(self, client, peer, key: str, send_at: datetime) -> bool:
+        entry = self.pending.get(key)
+        if entry is None:
+            return False
+        try:
+            await client.edit_message(peer, entry["message_id"], entry["text"], schedule=send_at)
+        except Exception as e:
+            self._handle_error("report", key, e)
+            return False
+        print(f"🗓️ Lancement {key} reporté: {entry['send_at'].strftime('%H:%M:%S')} → {send_at.strftime('%H:%M:%S')}")
+        entry["send_at"] = send_at
+        self.counters["rescheduled"] += 1
+        return True
+
+    async def cancel(self, client, peer, key: str) -> bool:
+        """
+        Supprime le message programmé (prédiction lancée autrement, retirée ou hors planning).
+        En cas d'échec le message reste attendu: sa publication sera reconnue (resolve_delivered).
+        """
+        entry = self.pending.pop(key, None)
+        if entry is None:
+            return False
+        try:
+            await client(functions.messages.DeleteScheduledMessagesRequest(peer=peer, id=[entry["message_id"]]))
+        except Exception as e:
+            self.pending[key] = entry
+            self._handle_error("annulation", key, e)
+            return False
+        self.counters["cancelled"] += 1
+        return True
+
+    async def cancel_all(self, client, peer) -> int:
+        cancelled = 0
+        for key in list(self.pending):
+            cancelled += await self.cancel(client, peer, key)
+        return cancelled
+
+    def resolve_delivered(self, text: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Message publié par Telegram (from_scheduled): (clé, entrée) correspondante, retirée des attentes"""
+        for key, entry in self.pending.items():
+            if entry["text"] == text:
+                self.counters["delivered"] += 1
+                return key, self.pending.pop(key)
+        return None
+
+    def plan(self, launches: Dict[str, Tuple[datetime, str]], now: Optional[datetime] = None):
+        """
+        Compare les lancements prévus {clé: (heure d'envoi, texte)} aux messages programmés.
+        Returns:
+            tuple: (à déposer, à reporter, à annuler) - listes de clés
+        """
+        now = now or datetime.now()
+        earliest = now + timedelta(seconds=self.min_delay)
+        to_submit, to_reschedule, to_cancel = [], [], []
+
+        for key, entry in self.pending.items():
+            launch = launches.get(key)
+            if launch is None or launch[1] != entry["text"]:
+                to_cancel.append(key)
+            elif abs((launch[0] - entry["send_at"]).total_seconds()) > self.drift_tolerance:
+                if launch[0] >= earliest:
+                    to_reschedule.append(key)
+                elif entry["send_at"] > launch[0]:
+                    to_cancel.append(key)  # trop tard pour reporter en avance: le chemin réactif prend le relais
+
+        slots = self.max_pending - len(self.pending) + len(to_cancel)
+        for key, (send_at, _) in sorted(launches.items(), key=lambda item: item[1][0]):
+            if slots <= 0:
+                break
+            if key not in self.pending and earliest <= send_at <= now + self.horizon:
+                to_submit.append(key)
+                slots -= 1
+        return to_submit, to_reschedule, to_cancel
+
+    async def sync(self, client, peer, channel_id: int, launches: Dict[str, Tuple[datetime, str]],
+                   force: bool = False) -> Dict[str, int]:
+        """Aligne les messages programmés sur les lancements prévus (au plus une fois par sync_interval)"""
+        loop = asyncio.get_running_loop()
+        if not self.available or self._lock.locked():
+            return {}
+        if not force and loop.time() - self._last_sync < self.sync_interval:
+            return {}
+        async with self._lock:
+            self._last_sync = loop.time()
+            to_submit, to_reschedule, to_cancel = self.plan(launches)
+            summary = {"submitted": 0, "rescheduled": 0, "cancelled": 0}
+            for key in to_cancel:
+                summary["cancelled"] += await self.cancel(client, peer, key)
+            for key in to_reschedule:
+                summary["rescheduled"] += await self.reschedule(client, peer, key, launches[key][0])
+            for key in to_submit:
+                if not self.available:
+                    break
+                send_at, text = launches[key]
+                summary["submitted"] += await self.submit(client, peer, channel_id, key, text, send_at)
+            return summary
+
+    def get_status(self) -> Dict[str, Any]:
+        next_entry = min(self.pending.items(), key=lambda item: item[1]["send_at"], default=None)
+        return {
+            "available": self.available,
+            "disabled_reason": self.disabled_reason,
+            "pending": len(self.pending),
+            "next_key": next_entry[0] if next_entry else None,
+            "next_at": next_entry[1]["send_at"].strftime("%Y-%m-%d %H:%M:%S") if next_entry else None,
+            **self.counters
+        }
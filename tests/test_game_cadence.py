@@ -0,0 +1,48 @@
+"""
+Fenêtre de lancement par numéro (game_cadence.py): fenêtre fixe par défaut,
+dimensionnement sur les parties rapides quand une avance est visée, bornes
+"""
+import unittest
+from datetime import datetime, timedelta
+
+from game_cadence import CadenceEstimator
+
+START = datetime(2026, 10, 19, 10, 0, 0)
+
+
+def estimator_at(seconds_per_game: float, games: int = 10) -> CadenceEstimator:
+    cadence = CadenceEstimator()
+    for index in range(games):
+        cadence.observe(100 + index, START + timedelta(seconds=index * seconds_per_game))
+    return cadence
+
+
+class ToleranceForTest(unittest.TestCase):
+
+    def test_default_window_without_target(self):
+        cadence = estimator_at(20)
+        self.assertTrue(cadence.ready)
+        self.assertEqual(cadence.tolerance_for(None), 4)
+        self.assertEqual(cadence.tolerance_for(0), 4)
+
+    def test_default_window_until_cadence_known(self):
+        cadence = estimator_at(20, games=2)
+        self.assertFalse(cadence.ready)
+        self.assertEqual(cadence.tolerance_for(150), 4)
+
+    def test_window_sized_on_fast_games(self):
+        self.assertEqual(estimator_at(50).tolerance_for(150), 3)
+        self.assertEqual(estimator_at(40).tolerance_for(150), 4)
+
+    def test_window_clamped(self):
+        self.assertEqual(estimator_at(300).tolerance_for(30), 1)
+        self.assertEqual(estimator_at(5).tolerance_for(150), 10)
+        self.assertEqual(estimator_at(5).tolerance_for(150, maximum=6), 6)
+
+    def test_status_reports_window_in_use(self):
+        self.assertEqual(estimator_at(20).get_status(None)["tolerance"], 4)
+        self.assertEqual(estimator_at(50).get_status(150)["tolerance"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Analyse des fichiers importés (import_worker.py) à travers les vrais processus d'analyse:
+CSV, classeur XLSX à plusieurs feuilles, erreur relancée, arrêt des processus
+"""
+import io
+import unittest
+
+from openpyxl import Workbook
+
+from import_worker import ImportWorkerPool
+
+CSV_BYTES = "Date,Numéro,Victoire\n2026-10-19 10:00,881,1\n2026-10-19 10:05,885,2\n".encode("utf-8")
+
+
+def xlsx_bytes() -> bytes:
+    workbook = Workbook()
+    first = workbook.active
+    first.title = "Matin"
+    first.append(["Date", "Numéro", "Victoire"])
+    first.append(["2026-10-19 08:00", 101, "1"])
+    second = workbook.create_sheet("Soir")
+    second.append(["Date", "Numéro", "Victoire"])
+    second.append(["2026-10-19 20:00", 901, "2"])
+    second.append(["2026-10-19 20:10", 905, "1"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class ImportWorkerPoolTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.pool = ImportWorkerPool(max_workers=2, idle_seconds=60)
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_csv_parsed_in_worker_process(self):
+        rows, sheet_count = await self.pool.parse_uploads([("predictions.csv", CSV_BYTES)])
+        self.assertEqual(sheet_count, 1)
+        self.assertEqual(rows, [["2026-10-19 10:00", "881", "1"], ["2026-10-19 10:05", "885", "2"]])
+        self.assertEqual(self.pool.get_status()["started"], 1)
+
+    async def test_all_sheets_merged_in_workbook_order(self):
+        files = [("planning.xlsx", xlsx_bytes()), ("predictions.csv", CSV_BYTES)]
+        rows, sheet_count = await self.pool.parse_uploads(files, all_sheets=True)
+        self.assertEqual(sheet_count, 3)
+        self.assertEqual([row[1] for row in rows], [101, 901, 905, "881", "885"])
+        self.assertLessEqual(self.pool.get_status()["started"], 2)
+
+    async def test_workers_reused_between_imports(self):
+        await self.pool.parse_uploads([("predictions.csv", CSV_BYTES)])
+        await self.pool.parse_uploads([("predictions.csv", CSV_BYTES)])
+        status = self.pool.get_status()
+        self.assertEqual(status["started"], 1)
+        self.assertEqual(status["tasks"], 2)
+
+    async def test_worker_error_raised_in_caller(self):
+        with self.assertRaises(Exception):
+            await self.pool.parse_uploads([("broken.xlsx", b"not a workbook")])
+        # Le processus a répondu (erreur sérialisée): il reste utilisable
+        rows, _ = await self.pool.parse_uploads([("predictions.csv", CSV_BYTES)])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(self.pool.get_status()["started"], 1)
+
+    async def test_close_stops_workers(self):
+        await self.pool.parse_uploads([("predictions.csv", CSV_BYTES)])
+        workers = list(self.pool._workers)
+        await self.pool.close()
+        self.assertTrue(all(worker.returncode is not None for worker in workers))
+        self.assertEqual(self.pool.get_status()["workers"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
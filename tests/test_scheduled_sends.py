@@ -0,0 +1,115 @@
+"""
+Envois programmés (scheduled_sends.py) contre un client Telegram factice:
+planification, dépôt, report, annulation, refus SCHEDULE_BOT_NOT_ALLOWED
+et publication from_scheduled
+"""
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from telethon import errors, functions
+
+from scheduled_sends import ScheduledSendManager
+
+PEER = "display"
+CHANNEL_ID = -100123
+
+
+class FakeClient:
+    """Enregistre les appels send_message/edit_message/DeleteScheduledMessagesRequest; erreurs injectables"""
+
+    def __init__(self):
+        self.scheduled = {}  # message_id → (texte, heure)
+        self.deleted = []
+        self.next_id = 1
+        self.send_error = None
+        self.delete_error = None
+
+    async def send_message(self, peer, text, schedule=None):
+        if self.send_error:
+            raise self.send_error
+        message_id = self.next_id
+        self.next_id += 1
+        self.scheduled[message_id] = (text, schedule)
+        return SimpleNamespace(id=message_id)
+
+    async def edit_message(self, peer, message_id, text, schedule=None):
+        self.scheduled[message_id] = (text, schedule)
+
+    async def __call__(self, request):
+        assert isinstance(request, functions.messages.DeleteScheduledMessagesRequest)
+        if self.delete_error:
+            raise self.delete_error
+        for message_id in request.id:
+            self.scheduled.pop(message_id, None)
+            self.deleted.append(message_id)
+
+    def deliver(self, message_id):
+        """Publication par Telegram: message reçu avec from_scheduled"""
+        text, _ = self.scheduled.pop(message_id)
+        return SimpleNamespace(id=1000 + message_id, message=text, from_scheduled=True)
+
+
+class ScheduledSendsTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.manager = ScheduledSendManager(min_delay=30, drift_tolerance=60, horizon=timedelta(hours=2))
+        self.now = datetime.now()
+
+    def launches(self, *offsets):
+        return {f"2026-10-19:{100 + i}": (self.now + timedelta(minutes=minutes), f"🔵{100 + i} 👗𝐕1👗statut :⏳")
+                for i, minutes in enumerate(offsets)}
+
+    def test_plan_respects_min_delay_and_horizon(self):
+        launches = self.launches(0.1, 10, 200)
+        to_submit, to_reschedule, to_cancel = self.manager.plan(launches, self.now)
+        self.assertEqual(to_submit, ["2026-10-19:101"])
+        self.assertEqual((to_reschedule, to_cancel), ([], []))
+
+    async def test_submit_then_reschedule_on_drift(self):
+        launches = self.launches(10)
+        summary = await self.manager.sync(self.client, PEER, CHANNEL_ID, launches, force=True)
+        self.assertEqual(summary["submitted"], 1)
+        self.assertTrue(self.manager.is_pending("2026-10-19:100"))
+
+        moved = {key: (send_at + timedelta(minutes=3), text) for key, (send_at, text) in launches.items()}
+        summary = await self.manager.sync(self.client, PEER, CHANNEL_ID, moved, force=True)
+        self.assertEqual(summary["rescheduled"], 1)
+        self.assertEqual(self.client.scheduled[1][1], moved["2026-10-19:100"][0])
+
+    async def test_cancel_when_prediction_removed(self):
+        await self.manager.sync(self.client, PEER, CHANNEL_ID, self.launches(10, 20), force=True)
+        summary = await self.manager.sync(self.client, PEER, CHANNEL_ID, self.launches(10), force=True)
+        self.assertEqual(summary["cancelled"], 1)
+        self.assertEqual(self.client.deleted, [2])
+        self.assertFalse(self.manager.is_pending("2026-10-19:101"))
+
+    async def test_failed_cancel_keeps_entry_for_delivery(self):
+        await self.manager.sync(self.client, PEER, CHANNEL_ID, self.launches(10), force=True)
+        self.client.delete_error = ConnectionError("réseau")
+        self.assertFalse(await self.manager.cancel(self.client, PEER, "2026-10-19:100"))
+        self.assertTrue(self.manager.is_pending("2026-10-19:100"))
+
+    async def test_bot_account_disables_mode(self):
+        self.client.send_error = errors.ScheduleBotNotAllowedError(request=None)
+        summary = await self.manager.sync(self.client, PEER, CHANNEL_ID, self.launches(10, 20), force=True)
+        self.assertEqual(summary["submitted"], 0)
+        self.assertFalse(self.manager.available)
+        self.assertEqual(self.manager.disabled_reason, "SCHEDULE_BOT_NOT_ALLOWED")
+        self.assertEqual(self.client.next_id, 1)  # arrêt au premier refus
+        self.assertEqual(await self.manager.sync(self.client, PEER, CHANNEL_ID, self.launches(10), force=True), {})
+
+    async def test_from_scheduled_delivery_resolves_key(self):
+        await self.manager.sync(self.client, PEER, CHANNEL_ID, self.launches(10, 20), force=True)
+        delivered = self.client.deliver(2)
+        key, entry = self.manager.resolve_delivered(delivered.message)
+        self.assertEqual(key, "2026-10-19:101")
+        self.assertEqual(entry["message_id"], 2)
+        self.assertFalse(self.manager.is_pending(key))
+        self.assertEqual(self.manager.counters["delivered"], 1)
+        self.assertIsNone(self.manager.resolve_delivered("message inconnu"))
+
+
+if __name__ == "__main__":
+    unittest.main()
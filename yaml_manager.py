@@ -10,11 +10,13 @@ from datetime import datetime, date, time, timedelta
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
+from message_log import SegmentedMessageLog
+
 
 class YAMLDataManager:
     """Gestionnaire de données basé sur YAML"""
     
-    def __init__(self):
+    def __init__(self, store_message_content: bool = True):
         # Répertoire pour stocker tous les fichiers YAML
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
@@ -23,10 +25,13 @@ class YAMLDataManager:
         self.config_file = self.data_dir / "bot_config.yaml"
         self.predictions_file = self.data_dir / "predictions.yaml"
         self.auto_predictions_file = self.data_dir / "auto_predictions.yaml"
-        self.message_log_file = self.data_dir / "message_log.yaml"
+        self.message_log_file = self.data_dir / "message_log.yaml"  # ancien journal, migré vers les segments
         
         # Initialiser les fichiers s'ils n'existent pas
         self._init_files()
+        # Journal des messages traités: segments en ajout seul (1000 derniers messages environ)
+        self.message_log = SegmentedMessageLog(self.data_dir / "message_log", store_content=store_message_content)
+        self._migrate_message_log()
         print("✅ Gestionnaire YAML initialisé")
     
     def _init_files(self):
@@ -34,14 +39,26 @@ class YAMLDataManager:
         default_structures = {
             self.config_file: {},
             self.predictions_file: [],
-            self.auto_predictions_file: {},
-            self.message_log_file: []
+            self.auto_predictions_file: {}
         }
         
         for file_path, default_content in default_structures.items():
             if not file_path.exists():
                 self._save_yaml(file_path, default_content)
     
+    def _migrate_message_log(self):
+        """Recopie l'ancien message_log.yaml dans le journal segmenté"""
+        if not self.message_log_file.exists():
+            return
+        message_log = self._load_yaml(self.message_log_file)
+        migrated = 0
+        for msg in message_log if isinstance(message_log, list) else []:
+            if msg.get('message_hash') and not self.message_log.contains(msg['message_hash']):
+                self.message_log.append(msg['message_hash'], msg.get('channel_id'), msg.get('content'), msg.get('processed_at'))
+                migrated += 1
+        self.message_log_file.rename(self.message_log_file.with_suffix(".yaml.migrated"))
+        print(f"📦 Journal des messages migré: {migrated} entrée(s)")
+    
     def _load_yaml(self, file_path: Path) -> Any:
         """Charge un fichier YAML"""
         try:
@@ -197,44 +214,21 @@ class YAMLDataManager:
         """Vérifie si un message a déjà été traité"""
         try:
             message_hash = hashlib.sha256(f"{channel_id}:{message_content}".encode()).hexdigest()
-            message_log = self._load_yaml(self.message_log_file)
-            
-            if not isinstance(message_log, list):
-                return False
-            
-            return any(msg.get('message_hash') == message_hash for msg in message_log)
+            return self.message_log.contains(message_hash)
         except Exception as e:
             print(f"❌ Erreur is_message_processed: {e}")
             return False
     
     def mark_message_processed(self, message_content: str, channel_id: int):
-        """Marque un message comme traité"""
+        """Marque un message comme traité (ajout au segment courant, sans relire le journal)"""
         try:
             message_hash = hashlib.sha256(f"{channel_id}:{message_content}".encode()).hexdigest()
-            message_log = self._load_yaml(self.message_log_file)
-            
-            if not isinstance(message_log, list):
-                message_log = []
             
             # Vérifier si déjà traité
-            if any(msg.get('message_hash') == message_hash for msg in message_log):
+            if self.message_log.contains(message_hash):
                 return
             
-            message_entry = {
-                'id': len(message_log) + 1,
-                'message_hash': message_hash,
-                'channel_id': channel_id,
-                'content': message_content,
-                'processed_at': datetime.now().isoformat()
-            }
-            
-            message_log.append(message_entry)
-            
-            # Garder seulement les 1000 derniers messages pour éviter que le fichier devienne trop gros
-            if len(message_log) > 1000:
-                message_log = message_log[-1000:]
-            
-            self._save_yaml(self.message_log_file, message_log)
+            self.message_log.append(message_hash, channel_id, message_content)
         except Exception as e:
             print(f"❌ Erreur mark_message_processed: {e}")
     
@@ -275,8 +269,9 @@ class YAMLDataManager:
             print(f"❌ Erreur get_stats: {e}")
             return {'manual': {}, 'auto': {}}
     
-    def cleanup_old_data(self, days_to_keep: int = 30):
-        """Nettoie les anciennes données (optionnel)"""
+    def cleanup_old_data(self, days_to_keep: int = 30) -> int:
+        """Nettoie les anciennes données (tâche de maintenance quotidienne); retourne le nombre de jours supprimés"""
+        removed = 0
         try:
             cutoff_date = datetime.now().date() - timedelta(days=days_to_keep)
             
@@ -287,11 +282,13 @@ class YAMLDataManager:
                     date_str: data for date_str, data in auto_predictions.items()
                     if datetime.fromisoformat(date_str).date() >= cutoff_date
                 }
-                if len(cleaned) != len(auto_predictions):
+                removed = len(auto_predictions) - len(cleaned)
+                if removed:
                     self._save_yaml(self.auto_predictions_file, cleaned)
-                    print(f"🧹 Nettoyage: {len(auto_predictions) - len(cleaned)} anciennes planifications supprimées")
+                    print(f"🧹 Nettoyage: {removed} anciennes planifications supprimées")
         except Exception as e:
             print(f"❌ Erreur cleanup_old_data: {e}")
+        return removed
 
 
 # Instance globale